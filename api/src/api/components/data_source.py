@@ -1,9 +1,14 @@
 from abc import abstractmethod
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 
 from api.components.plugin import Plugin
-from api.models.graph import Graph
+from api.models.columnar_graph import AnyGraph
+from api.models.edge import Edge
+from api.models.graph_stream import GraphStream
+from api.models.node import Node
+
+DEFAULT_STREAM_BATCH_SIZE = 1000
 
 
 class DataSourceConfigParam(object):
@@ -140,17 +145,34 @@ class DataSourcePlugin(Plugin):
     """
 
     @abstractmethod
-    def load(self, **kwargs) -> Graph:
+    def load(self, **kwargs) -> AnyGraph:
         """
         Loads graph data from the data source and returns it as a Graph object.
+        Data sources producing large graphs may return a ColumnarGraph instead.
 
         :param kwargs: Arbitrary keyword arguments for customization or filtering of the data loading process.
         :type kwargs: dict
-        :return: A Graph object representing a graph.
-        :rtype: Graph
+        :return: A Graph or ColumnarGraph object representing a graph.
+        :rtype: AnyGraph
         """
         pass
 
+    def stream(self, **kwargs) -> GraphStream:
+        """
+        Loads graph data from the data source as a stream of node batches followed by edge
+        batches, which the platform writes to storage as they arrive.
+
+        By default the graph returned by `load` is streamed, so it is held in memory as a
+        whole. Data sources producing graphs too large for that should extend
+        `StreamingDataSourcePlugin` instead.
+
+        :param kwargs: The same arguments as for `load`.
+        :type kwargs: dict
+        :return: A stream over the loaded graph.
+        :rtype: GraphStream
+        """
+        return GraphStream.from_graph(self.load(**kwargs), DEFAULT_STREAM_BATCH_SIZE)
+
     @abstractmethod
     def get_configuration_parameters(self) -> List[DataSourceConfigParam]:
         """
@@ -160,3 +182,63 @@ class DataSourcePlugin(Plugin):
         :rtype: List[DataSourceConfigParam]
         """
         pass
+
+
+class StreamingDataSourcePlugin(DataSourcePlugin):
+    """
+    A data source plugin that produces its graph incrementally, so that the platform never
+    holds the whole graph in memory while loading it.
+
+    Nodes are yielded by `iter_nodes` and edges by `iter_edges`, which is called once all nodes
+    were consumed. Both endpoints of every edge must have been yielded as nodes, edges between
+    unknown nodes are dropped. Edges only need the IDs of their endpoints, e.g.
+    `Edge(data, Node(src_id, {}), Node(target_id, {}))`.
+    """
+
+    @abstractmethod
+    def iter_nodes(self, **kwargs) -> Iterable[Node]:
+        """
+        Yields the nodes of the graph.
+
+        :param kwargs: Arbitrary keyword arguments for customization or filtering of the data loading process.
+        :type kwargs: dict
+        :return: The nodes, typically produced lazily by a generator.
+        :rtype: Iterable[Node]
+        """
+        pass
+
+    @abstractmethod
+    def iter_edges(self, **kwargs) -> Iterable[Edge]:
+        """
+        Yields the edges of the graph.
+
+        :param kwargs: Arbitrary keyword arguments for customization or filtering of the data loading process.
+        :type kwargs: dict
+        :return: The edges, typically produced lazily by a generator.
+        :rtype: Iterable[Edge]
+        """
+        pass
+
+    def is_directed(self, **kwargs) -> bool:
+        """
+        Returns whether the streamed graph is directed. Defaults to True.
+        """
+        return True
+
+    def root_id(self, **kwargs) -> Optional[str]:
+        """
+        Returns the ID of the root node of the streamed graph, if any. Defaults to None.
+        """
+        return None
+
+    def stream(self, **kwargs) -> GraphStream:
+        def edges() -> Iterator[Edge]:
+            # edges are requested only once the nodes were consumed
+            yield from self.iter_edges(**kwargs)
+
+        return GraphStream.from_iterables(self.iter_nodes(**kwargs), edges(), DEFAULT_STREAM_BATCH_SIZE,
+                                          directed=self.is_directed(**kwargs),
+                                          root_id=self.root_id(**kwargs))
+
+    def load(self, **kwargs) -> AnyGraph:
+        return self.stream(**kwargs).to_columnar_graph()
@@ -0,0 +1,108 @@
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+_local = threading.local()
+
+
+class LoadCancelled(Exception):
+    """
+    Raised by `report_progress` when the load it is called from was cancelled.
+    Data sources should let it propagate.
+    """
+    pass
+
+
+class ProgressListener(ABC):
+    """
+    Receives the progress of a long-running load, e.g. `DataSourcePlugin.load`, and tells
+    whether it was cancelled.
+    """
+
+    @abstractmethod
+    def update(self, done: int, total: Optional[int] = None, message: str = "") -> None:
+        """
+        Records the progress of the load.
+
+        :param done: Amount of work done, e.g. the number of rows or requests.
+        :type done: int
+        :param total: Total amount of work, if known.
+        :type total: Optional[int]
+        :param message: Description of the current step.
+        :type message: str
+        """
+        pass
+
+    @abstractmethod
+    def is_cancelled(self) -> bool:
+        """
+        Returns whether the load was cancelled.
+        """
+        pass
+
+    def record_stats(self, name: str, stats: Dict[str, Any]) -> None:
+        """
+        Records statistics of the load, e.g. of a cache it used. Ignored by default.
+
+        :param name: Name of the statistics, e.g. "http_cache".
+        :type name: str
+        :param stats: The statistics.
+        :type stats: Dict[str, Any]
+        """
+        pass
+
+
+def report_progress(done: int, total: Optional[int] = None, message: str = "") -> None:
+    """
+    Reports the progress of the load running in the current thread.
+
+    Does nothing when no listener is attached, so data sources can report progress
+    whether they run in a background job or not.
+
+    :param done: Amount of work done, e.g. the number of rows or requests.
+    :type done: int
+    :param total: Total amount of work, if known.
+    :type total: Optional[int]
+    :param message: Description of the current step.
+    :type message: str
+    :raises LoadCancelled: If the load was cancelled.
+    """
+    listener: Optional[ProgressListener] = getattr(_local, "listener", None)
+    if listener is None:
+        return
+    listener.update(done, total, message)
+    if listener.is_cancelled():
+        raise LoadCancelled()
+
+
+def report_stats(name: str, stats: Dict[str, Any]) -> None:
+    """
+    Reports statistics of the load running in the current thread, kept with its result.
+    Does nothing when no listener is attached.
+
+    :param name: Name of the statistics, e.g. "http_cache".
+    :type name: str
+    :param stats: The statistics.
+    :type stats: Dict[str, Any]
+    """
+    listener: Optional[ProgressListener] = getattr(_local, "listener", None)
+    if listener is not None:
+        listener.record_stats(name, stats)
+
+
+@contextmanager
+def listening(listener: ProgressListener) -> Iterator[ProgressListener]:
+    """
+    Attaches a listener to the current thread: `report_progress` calls made inside the
+    `with` block reach it.
+
+    :param listener: The listener.
+    :type listener: ProgressListener
+    """
+    previous = getattr(_local, "listener", None)
+    _local.listener = listener
+    try:
+        yield listener
+    finally:
+        _local.listener = previous
@@ -1,7 +1,9 @@
 from abc import abstractmethod
+from typing import Iterator
 
 from api.components.plugin import Plugin
-from api.models.graph import Graph
+from api.models.columnar_graph import AnyGraph
+from api.models.graph_stream import GraphStream
 
 
 class VisualizerPlugin(Plugin):
@@ -24,14 +26,42 @@ class VisualizerPlugin(Plugin):
     - All elements must be renderable in a single HTML string.
     """
 
+    def supports_columnar_graph(self) -> bool:
+        """
+        Tells whether `display` accepts a ColumnarGraph. Visualizers that only read the graph
+        through `get_nodes`, `get_edges`, `directed` and `root_id` can opt in, which spares
+        building the mutable object graph before rendering.
+
+        :return: True if `display` may receive a ColumnarGraph, otherwise False.
+        :rtype: bool
+        """
+        return False
+
     @abstractmethod
-    def display(self, graph: Graph, **kwargs) -> str:
+    def display(self, graph: AnyGraph, **kwargs) -> str:
         """
         Converts the graph into an HTML string representation.
 
-        :param graph: A Graph object representing a graph to be visualized.
-        :type graph: Graph
+        :param graph: A graph to be visualized. It is a ColumnarGraph only if
+                      `supports_columnar_graph` returns True.
+        :type graph: AnyGraph
         :return: An HTML string representation of the given graph.
         :rtype: str
         """
         pass
+
+    def display_stream(self, stream: GraphStream, **kwargs) -> Iterator[str]:
+        """
+        Renders a streamed graph into HTML fragments. Visualizers that can render while
+        iterating over the stream should override this, which by default collects the
+        stream into a graph and yields the result of `display`.
+
+        :param stream: A stream of node batches followed by edge batches.
+        :type stream: GraphStream
+        :return: An iterator of HTML fragments which concatenate into the graph representation.
+        :rtype: Iterator[str]
+        """
+        if self.supports_columnar_graph():
+            yield self.display(stream.to_columnar_graph(), **kwargs)
+        else:
+            yield self.display(stream.to_graph(), **kwargs)
@@ -0,0 +1,386 @@
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from api.models.data import DataDict, Value, intern_keys
+from api.models.edge import Edge
+from api.models.graph import Graph
+from api.models.node import Node
+
+
+class DataColumns():
+    """
+    The data of the rows (nodes or edges) of a columnar graph, grouped by key set.
+
+    Rows with the same keys in the same order share a schema, and every schema has one column
+    per key holding the values of its own rows only. Memory therefore grows with the values
+    present rather than with rows times all keys ever seen, which matters for sources mixing
+    differently shaped records, e.g. rows of many database tables.
+    """
+
+    def __init__(self):
+        self.schemas: List[Tuple[str, ...]] = []
+        self.columns: List[List[List[Optional[Value]]]] = []
+        self.row_schema = array('q')
+        self.row_position = array('q')
+        self._schema_index: Dict[Tuple[str, ...], int] = {}
+        self._sizes: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.row_schema)
+
+    def append(self, data: DataDict) -> None:
+        """
+        Adds a row.
+        """
+        keys = intern_keys(data)
+        schema = self._schema_index.get(keys)
+        if schema is None:
+            schema = self._schema_index[keys] = len(self.schemas)
+            self.schemas.append(keys)
+            self.columns.append([[] for _ in keys])
+            self._sizes.append(0)
+        self.row_schema.append(schema)
+        self.row_position.append(self._sizes[schema])
+        self._sizes[schema] += 1
+        for column, value in zip(self.columns[schema], data.values()):
+            column.append(value)
+
+    def row(self, index: int) -> DataDict:
+        """
+        Returns the data of the row at the given index.
+        """
+        schema = self.row_schema[index]
+        position = self.row_position[index]
+        return dict(zip(self.schemas[schema], [column[position] for column in self.columns[schema]]))
+
+    def reordered(self, order: Iterable[int]) -> "DataColumns":
+        """
+        Returns the rows in the given order of their indexes. The values are shared, not copied.
+        """
+        result = DataColumns()
+        result.schemas = self.schemas
+        result.columns = self.columns
+        result._schema_index = self._schema_index
+        result._sizes = self._sizes
+        order = list(order)
+        result.row_schema = array('q', (self.row_schema[i] for i in order))
+        result.row_position = array('q', (self.row_position[i] for i in order))
+        return result
+
+    def memory_size(self) -> int:
+        """
+        Estimates the memory held by the rows and the values they reference.
+        """
+        size = sys.getsizeof(self.row_schema) + sys.getsizeof(self.row_position)
+        for keys, columns in zip(self.schemas, self.columns):
+            size += sys.getsizeof(keys) + sum(sys.getsizeof(key) for key in keys)
+            for column in columns:
+                size += sys.getsizeof(column)
+                size += sum(sys.getsizeof(value) for value in column if value is not None)
+        return size
+
+
+class ColumnarGraph():
+    """
+    An immutable, array-backed graph for large read-only graphs.
+
+    Nodes are addressed by integer indexes. Adjacency is stored in CSR (compressed sparse row)
+    form: the targets of node `i` are `targets[offsets[i]:offsets[i + 1]]`. Node and edge data
+    is stored in `DataColumns`, grouped by key set, so rows read back exactly as they were added,
+    including `None` values.
+
+    `offsets` and `targets` are `array('q')` buffers and can be wrapped without copying,
+    e.g. `numpy.frombuffer(graph.targets, dtype=numpy.int64)`.
+
+    `get_nodes` and `get_edges` materialize `Node` and `Edge` objects, so code written for
+    `Graph` can read a `ColumnarGraph` as well.
+
+    :param directed: A boolean indicating whether the graph is directed.
+    :type directed: bool
+    :param root_id: Identifier for the root node in the graph.
+    :type root_id: str
+    """
+
+    def __init__(self,
+                 node_ids: List[str],
+                 node_columns: "DataColumns",
+                 offsets: array,
+                 targets: array,
+                 edge_columns: "DataColumns",
+                 directed: Optional[bool] = True,
+                 root_id: Optional[str] = None):
+        """
+        Initializes a ColumnarGraph. Use `ColumnarGraphBuilder` or `from_graph` instead
+        of calling this directly.
+
+        :param node_ids: Node IDs, ordered by node index.
+        :type node_ids: List[str]
+        :param node_columns: Node data, one row per node.
+        :type node_columns: DataColumns
+        :param offsets: CSR row offsets, `len(node_ids) + 1` entries.
+        :type offsets: array
+        :param targets: CSR target node indexes, one per edge.
+        :type targets: array
+        :param edge_columns: Edge data, one row per edge in CSR order.
+        :type edge_columns: DataColumns
+        :param directed: Indicates whether the graph is directed. Defaults to True.
+        :type directed: (bool, optional)
+        :param root_id: Identifier for the root node in the graph. Defaults to None.
+        :type root_id: (str, optional)
+        """
+        if len(offsets) != len(node_ids) + 1:
+            raise ValueError("CSR offsets must have one entry per node plus one")
+        self.node_ids = node_ids
+        self.node_columns = node_columns
+        self.offsets = offsets
+        self.targets = targets
+        self.edge_columns = edge_columns
+        self.directed = directed
+        self.root_id = root_id
+        self._index = {node_id: i for i, node_id in enumerate(node_ids)}
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def index_of(self, node_id: str) -> Optional[int]:
+        """
+        Returns the index of a node, or None if the graph has no node with the given ID.
+        """
+        return self._index.get(node_id)
+
+    def node_data(self, index: int) -> DataDict:
+        """
+        Returns the data of the node at the given index.
+        """
+        return self.node_columns.row(index)
+
+    def edge_data(self, position: int) -> DataDict:
+        """
+        Returns the data of the edge at the given CSR position.
+        """
+        return self.edge_columns.row(position)
+
+    def neighbours(self, index: int) -> array:
+        """
+        Returns the indexes of the targets of outgoing edges of the node at the given index.
+        """
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
+
+    def iter_edges(self) -> Iterator[Tuple[int, int, int]]:
+        """
+        Iterates over edges as (source index, target index, CSR position) tuples.
+        """
+        for src in range(self.node_count):
+            for position in range(self.offsets[src], self.offsets[src + 1]):
+                yield src, self.targets[position], position
+
+    def neighborhood(self,
+                     node_id: str,
+                     depth: int = 1,
+                     limit: int = 100,
+                     outgoing_only: bool = False) -> "ColumnarGraph":
+        """
+        Extracts the neighborhood of a node: the nodes reachable from it in at most `depth` steps,
+        closest first, and all edges between them.
+
+        :param node_id: ID of the node in the centre of the neighborhood.
+        :type node_id: str
+        :param depth: Maximum number of steps from the node.
+        :type depth: int
+        :param limit: Maximum number of nodes besides the node itself.
+        :type limit: int
+        :param outgoing_only: Follow only outgoing edges instead of edges in both directions.
+        :type outgoing_only: bool
+        :return: The neighborhood, empty if the graph has no node with the given ID.
+        :rtype: ColumnarGraph
+        """
+        builder = ColumnarGraphBuilder(directed=self.directed, root_id=self.root_id)
+        start = self._index.get(node_id)
+        if start is None:
+            return builder.build()
+
+        incoming: Optional[List[List[int]]] = None
+        if not outgoing_only:
+            incoming = [[] for _ in range(self.node_count)]
+            for src, target, _ in self.iter_edges():
+                incoming[target].append(src)
+
+        order = [start]
+        seen = {start}
+        frontier = [start]
+        for _ in range(depth):
+            next_frontier = []
+            for index in frontier:
+                adjacent = list(self.neighbours(index))
+                if incoming is not None:
+                    adjacent.extend(incoming[index])
+                for neighbour in adjacent:
+                    if neighbour in seen or len(order) > limit:
+                        continue
+                    seen.add(neighbour)
+                    order.append(neighbour)
+                    next_frontier.append(neighbour)
+            frontier = next_frontier
+
+        for index in order:
+            builder.add_node(self.node_ids[index], self.node_data(index))
+        for index in order:
+            for position in range(self.offsets[index], self.offsets[index + 1]):
+                target = self.targets[position]
+                if target in seen:
+                    builder.add_edge(self.node_ids[index], self.node_ids[target], self.edge_data(position))
+        return builder.build()
+
+    def get_node(self, node_id: str) -> Optional[Node]:
+        """
+        Materializes a single node, or returns None if it does not exist.
+        """
+        index = self._index.get(node_id)
+        if index is None:
+            return None
+        return Node(self.node_ids[index], self.node_data(index))
+
+    def get_nodes(self) -> List[Node]:
+        """
+        Materializes all nodes of the graph as `Node` objects, ordered by index.
+
+        :return: A list of nodes without their edge lists.
+        :rtype: list[`Node`]
+        """
+        return [Node(node_id, self.node_data(i)) for i, node_id in enumerate(self.node_ids)]
+
+    def get_edges(self) -> List[Edge]:
+        """
+        Materializes all edges of the graph as `Edge` objects, in CSR order.
+
+        :return: A list of edges.
+        :rtype: list[`Edge`]
+        """
+        nodes = self.get_nodes()
+        return [Edge(self.edge_data(position), nodes[src], nodes[target])
+                for src, target, position in self.iter_edges()]
+
+    def memory_size(self) -> int:
+        """
+        Estimates the memory held by the graph: its buffers, IDs, data columns and the values
+        they reference. A value shared between rows is counted once per row.
+
+        :return: The estimated size in bytes.
+        :rtype: int
+        """
+        size = sys.getsizeof(self.offsets) + sys.getsizeof(self.targets) + sys.getsizeof(self._index)
+        size += sys.getsizeof(self.node_ids) + sum(sys.getsizeof(node_id) for node_id in self.node_ids)
+        size += self.node_columns.memory_size() + self.edge_columns.memory_size()
+        return size
+
+    def to_graph(self) -> Graph:
+        """
+        Converts the columnar graph into a mutable object `Graph`.
+
+        :return: An equivalent `Graph`.
+        :rtype: Graph
+        """
+        nodes = self.get_nodes()
+        edges = {Edge(self.edge_data(position), nodes[src], nodes[target])
+                 for src, target, position in self.iter_edges()}
+        return Graph(edges=edges, nodes=set(nodes), directed=self.directed, root_id=self.root_id)
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> "ColumnarGraph":
+        """
+        Builds a columnar graph from an object `Graph`.
+
+        :param graph: The graph to convert.
+        :type graph: Graph
+        :return: An equivalent `ColumnarGraph`.
+        :rtype: ColumnarGraph
+        """
+        builder = ColumnarGraphBuilder(directed=graph.directed, root_id=graph.root_id)
+        for node in graph.get_nodes():
+            builder.add_node(node.id, node.data)
+        for edge in graph.get_edges():
+            builder.add_edge(edge.src.id, edge.target.id, edge.data)
+        return builder.build()
+
+    def __str__(self) -> str:
+        return f"ColumnarGraph(root_id: {self.root_id}, directed: {self.directed}, nodes_count: {self.node_count}, edges_count: {self.edge_count})"
+
+
+class ColumnarGraphBuilder():
+    """
+    Accumulates nodes and edges and produces a `ColumnarGraph`.
+
+    Adding a node with an ID that was already added does nothing, and adding an edge
+    adds its missing nodes with empty data, mirroring `Graph.add_node` and `Graph.add_edge`.
+    """
+
+    def __init__(self, directed: Optional[bool] = True, root_id: Optional[str] = None):
+        self.directed = directed
+        self.root_id = root_id
+        self._node_ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._node_columns = DataColumns()
+        self._sources = array('q')
+        self._targets = array('q')
+        self._edge_columns = DataColumns()
+
+    def has_node(self, node_id: str) -> bool:
+        return node_id in self._index
+
+    def add_node(self, node_id: str, data: DataDict) -> int:
+        """
+        Adds a node and returns its index.
+        """
+        index = self._index.get(node_id)
+        if index is not None:
+            return index
+        index = len(self._node_ids)
+        self._index[node_id] = index
+        self._node_ids.append(node_id)
+        self._node_columns.append(data)
+        return index
+
+    def add_edge(self, src_id: str, target_id: str, data: DataDict) -> None:
+        """
+        Adds an edge between two nodes.
+        """
+        src = self.add_node(src_id, {})
+        target = self.add_node(target_id, {})
+        self._edge_columns.append(data)
+        self._sources.append(src)
+        self._targets.append(target)
+
+    def build(self) -> ColumnarGraph:
+        """
+        Sorts the edges by source node into CSR form and returns the graph.
+        """
+        node_count = len(self._node_ids)
+        offsets = array('q', [0]) * (node_count + 1)
+        for src in self._sources:
+            offsets[src + 1] += 1
+        for i in range(node_count):
+            offsets[i + 1] += offsets[i]
+
+        # counting sort of edges by source, keeping insertion order within a source
+        order = array('q', [0]) * len(self._sources)
+        next_position = array('q', offsets[:-1]) if node_count else array('q')
+        for edge, src in enumerate(self._sources):
+            order[next_position[src]] = edge
+            next_position[src] += 1
+
+        targets = array('q', (self._targets[edge] for edge in order))
+        edge_columns = self._edge_columns.reordered(order)
+        return ColumnarGraph(self._node_ids, self._node_columns, offsets, targets, edge_columns,
+                             directed=self.directed, root_id=self.root_id)
+
+
+AnyGraph = Union[Graph, ColumnarGraph]
+"""
+Either graph representation. Both provide `get_nodes`, `get_edges`, `directed` and `root_id`.
+"""
@@ -1,5 +1,6 @@
+import sys
 from datetime import datetime
-from typing import Dict, Union
+from typing import Dict, Iterable, Tuple, Union
 
 Value = Union[str, int, float, datetime]
 """
@@ -15,3 +16,127 @@ Dictionary containing arbitrary data to be saved inside a Node or Edge.
 Supported data types are string, integer, float and datetime.
 """
 
+
+MAX_KEY_TUPLES = 4096
+"""Number of distinct key tuples shared before the table of shared tuples is cleared."""
+
+_KEY_TUPLES: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def intern_keys(keys: Iterable[str]) -> Tuple[str, ...]:
+    """
+    Returns a shared tuple of interned data keys.
+
+    Records with the same keys in the same order (e.g. rows of one database table)
+    reference a single tuple instead of each storing its own copy of the keys. The table of
+    shared tuples is cleared once it holds `MAX_KEY_TUPLES` of them, so data whose keys are
+    all distinct does not grow it without bound; records keep the tuples they were given.
+
+    :param keys: Keys of a data dictionary, in order.
+    :type keys: Iterable[str]
+    :return: The canonical tuple for these keys.
+    :rtype: Tuple[str, ...]
+    """
+    key_tuple = tuple(sys.intern(key) if type(key) is str else key for key in keys)
+    shared = _KEY_TUPLES.get(key_tuple)
+    if shared is not None:
+        return shared
+    if len(_KEY_TUPLES) >= MAX_KEY_TUPLES:
+        _KEY_TUPLES.clear()
+    _KEY_TUPLES[key_tuple] = key_tuple
+    return key_tuple
+
+
+class RecordData(dict):
+    """
+    The data of a `DataRecord` as returned by `DataRecord.data`.
+
+    It is a plain dictionary to readers (and serializers), and changes made to it in place
+    are written back to the record it was read from. Copies made with `copy()`, `dict()`,
+    `copy.copy` or pickling are detached plain dictionaries.
+    """
+
+    __slots__ = ("_record",)
+
+    def __init__(self, record: "DataRecord", items: Iterable[Tuple[str, Value]]):
+        super().__init__(items)
+        self._record = record
+
+    def _write_back(self) -> None:
+        self._record._keys = intern_keys(self)
+        self._record._values = tuple(self.values())
+
+    def __setitem__(self, key: str, value: Value) -> None:
+        super().__setitem__(key, value)
+        self._write_back()
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self._write_back()
+
+    def __ior__(self, other):
+        super().__ior__(other)
+        self._write_back()
+        return self
+
+    def update(self, *args, **kwargs) -> None:
+        super().update(*args, **kwargs)
+        self._write_back()
+
+    def setdefault(self, key: str, default: Value = None) -> Value:
+        value = super().setdefault(key, default)
+        self._write_back()
+        return value
+
+    def pop(self, key: str, *default):
+        value = super().pop(key, *default)
+        self._write_back()
+        return value
+
+    def popitem(self) -> Tuple[str, Value]:
+        item = super().popitem()
+        self._write_back()
+        return item
+
+    def clear(self) -> None:
+        super().clear()
+        self._write_back()
+
+    def __copy__(self) -> DataDict:
+        return dict(self)
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class DataRecord:
+    """
+    Base class for graph elements that carry a `DataDict`.
+
+    The data is stored compactly as a shared key tuple and a tuple of values. Reading
+    `data` returns a `RecordData` dictionary built from them, which writes changes made
+    to it in place back to the element, so `element.data["key"] = value` keeps working.
+    """
+
+    __slots__ = ("_keys", "_values")
+
+    @property
+    def data(self) -> DataDict:
+        """
+        Data stored in the element. Changes to the returned dictionary are written back.
+        """
+        return RecordData(self, zip(self._keys, self._values))
+
+    @data.setter
+    def data(self, data: DataDict) -> None:
+        self._keys = intern_keys(data)
+        self._values = tuple(data.values())
+
+    def _same_data(self, other: "DataRecord") -> bool:
+        """
+        Compares the data of two elements without building their dictionaries.
+        """
+        if self._keys is other._keys or self._keys == other._keys:
+            return self._values == other._values
+        # the same items in another order
+        return dict(zip(self._keys, self._values)) == dict(zip(other._keys, other._values))
@@ -1,14 +1,20 @@
 from typing import Dict
 
-from api.models.data import DataDict
+from api.models.data import DataDict, DataRecord
 
 from .node import Node
 
 
-class Edge:
+class Edge(DataRecord):
     """
     Class representing an edge in a graph.
 
+    Edges use `__slots__` and share key tuples between edges with the same data keys.
+    `data` is rebuilt from the compact storage on every read; in-place changes to it are
+    written back to the edge, but are not seen by other dictionaries read from the edge
+    before the change. Since the hash of an edge depends on its data keys, the keys of an
+    edge stored in a set must not be changed.
+
     :param src: Source node of the edge.
     :type src: Node
     :param target: Target node of the edge.
@@ -17,6 +23,8 @@ class Edge:
     :type data: DataDict
     """
 
+    __slots__ = ("src", "target")
+
     def __init__(self, data: DataDict, src: Node, target: Node):
         """
         Initializes Edge object.
@@ -45,7 +53,7 @@ class Edge:
         """
         if isinstance(__value, Edge):
             return (
-                self.data == __value.data and
+                self._same_data(__value) and
                 self.src == __value.src and
                 self.target == __value.target
             )
@@ -59,7 +67,7 @@ class Edge:
         :return: Hash of the node.
         :rtype: int
         """
-        return hash((self.src, self.target, frozenset(self.data)))
+        return hash((self.src, self.target, frozenset(self._keys)))
 
     def __str__(self) -> str:
         """
@@ -1,11 +1,15 @@
 from api.models.edge import Edge
 from api.models.node import Node
-from typing import Optional, Set
+from typing import Dict, Optional, Set
 
 class Graph():
     """
     A class representing a graph structure composed of nodes and edges.
 
+    Besides the `nodes` and `edges` sets, the graph keeps an index of nodes by ID and
+    outgoing/incoming edge indexes per node, so lookups and mutations cost O(1) or O(degree).
+    The sets should therefore only be modified through the graph's methods.
+
     :param edges: A set of edges in the graph.
     :type edges: set[Edge]
     :param nodes: A set of nodes in the graph.
@@ -36,12 +40,17 @@ class Graph():
         self.nodes = nodes if nodes else set()
         self.directed = directed
         self.root_id = root_id
-        
-        
+
+        self._node_index: Dict[str, Node] = {node.id: node for node in self.nodes}
+        self._out_edges: Dict[str, Set[Edge]] = {}
+        self._in_edges: Dict[str, Set[Edge]] = {}
+        for edge in self.edges:
+            self._out_edges.setdefault(edge.src.id, set()).add(edge)
+            self._in_edges.setdefault(edge.target.id, set()).add(edge)
 
     def add_node(self, node: Node) -> None:
         """
-        Adds a `Node` to the graph.
+        Adds a `Node` to the graph. Does nothing if a node with the same ID already exists.
 
         :param node:  The node to be added to the graph.
         :type node: `Node`
@@ -49,7 +58,7 @@ class Graph():
         if not isinstance(node, Node):
             raise TypeError(
                 f"Expected a Node instance, got {type(node).__name__}")
-        self.nodes.add(node)
+        self._add_endpoint(node)
 
     def remove_node(self, target_node: Node) -> None:
         """
@@ -58,22 +67,29 @@ class Graph():
         :param node:  The node to be added to the graph.
         :type node: `Node`
         """
-        try:
-            self.nodes.remove(target_node)
-        except KeyError:
+        node = self._node_index.pop(target_node.id, None)
+        if node is None:
             raise ValueError(f"{target_node} not found in graph!")
-
-        self.edges = set([edge for edge in self.edges if edge.src !=
-                         target_node and edge.target != target_node])
-        # remove edges from each node
-        for node in self.nodes:
-            node.edges = [
-                edge for edge in node.edges if edge.src != target_node and edge.target != target_node
+        self.nodes.discard(node)
+
+        incident = self._out_edges.pop(node.id, set()) | self._in_edges.pop(node.id, set())
+        owners = {}
+        for edge in incident:
+            self.edges.discard(edge)
+            self._out_edges.get(edge.src.id, set()).discard(edge)
+            self._in_edges.get(edge.target.id, set()).discard(edge)
+            owner = self._node_index.get(edge.src.id)
+            if owner is not None:
+                owners[owner.id] = owner
+        # remove edges from each adjacent node
+        for owner in owners.values():
+            owner.edges = [
+                edge for edge in owner.edges if edge.src != node and edge.target != node
             ]
 
     def add_edge(self, edge: Edge) -> None:
         """
-        Adds an `Edge` to the graph.
+        Adds an `Edge` to the graph, together with its nodes if they are not in the graph yet.
 
         :param node:  The node to be added to the graph.
         :type node: `Edge`
@@ -81,20 +97,18 @@ class Graph():
         if not isinstance(edge, Edge):
             raise TypeError(
                 f"Expected a Edge instance, got {type(edge).__name__}")
-        self.nodes.add(edge.src)
-        self.nodes.add(edge.target)
-        if edge not in self.edges:
-            self.edges.add(edge)
+        src = self._add_endpoint(edge.src)
+        target = self._add_endpoint(edge.target)
+        if edge in self.edges:
+            return
 
-            if not self.directed:
-                reversed_edge = Edge(edge.data, edge.target, edge.src)
-                self.edges.add(reversed_edge)
+        self._index_edge(edge)
+        src.edges.append(edge)
 
-            for node in self.nodes:
-                if node == edge.src:
-                    node.edges.append(edge)
-                if not self.directed and node == edge.target:
-                    node.edges.append(reversed_edge)
+        if not self.directed:
+            reversed_edge = Edge(edge.data, edge.target, edge.src)
+            self._index_edge(reversed_edge)
+            target.edges.append(reversed_edge)
 
     def update_node(self, node: Node, data: dict) -> None:
         """
@@ -103,11 +117,10 @@ class Graph():
         if not isinstance(node, Node):
             raise TypeError(
                 f"Expected a Node instance, got {type(node).__name__}")
-        for n in self.nodes:
-            if n.id == node.id:
-                n.data = data
-                break
-            
+        existing = self._node_index.get(node.id)
+        if existing is not None:
+            existing.data = data
+
     def update_edge(self, edge: Edge, data: dict) -> None:
         """
         Updates an `Edge` in the graph.
@@ -115,11 +128,13 @@ class Graph():
         if not isinstance(edge, Edge):
             raise TypeError(
                 f"Expected a Edge instance, got {type(edge).__name__}")
-        
-        for e in self.edges:
-            if e.src == edge.src and e.target == edge.target:
-                e.data = data
-                break
+
+        existing = self.get_edge(edge.src.id, edge.target.id)
+        if existing is not None:
+            # the edge hash depends on its data, so it has to be re-indexed
+            self._unindex_edge(existing)
+            existing.data = data
+            self._index_edge(existing)
 
     def remove_edge(self, target_edge: Edge) -> None:
         """
@@ -128,24 +143,68 @@ class Graph():
         :param node:  The node to be removed from the graph.
         :type node: `Edge`
         """
-        
+        if target_edge not in self.edges:
+            return
 
-        if target_edge in self.edges:
-            self.edges.remove(target_edge)
+        self._unindex_edge(target_edge)
+        self._detach_edge(target_edge)
 
-            if not self.directed:
-                reversed_edge = Edge(
-                    target_edge.data, target_edge.target, target_edge.src)
-                self.edges.remove(reversed_edge)
+        if not self.directed:
+            reversed_edge = Edge(
+                target_edge.data, target_edge.target, target_edge.src)
+            if reversed_edge in self.edges:
+                self._unindex_edge(reversed_edge)
+                self._detach_edge(reversed_edge)
+
+    def get_node(self, node_id: str) -> Optional[Node]:
+        """
+        Retrieves a node by its ID.
+
+        :param node_id: ID of the node.
+        :type node_id: str
+        :return: The node, or None if the graph has no node with the given ID.
+        :rtype: Optional[`Node`]
+        """
+        return self._node_index.get(node_id)
+
+    def get_edge(self, src_id: str, target_id: str) -> Optional[Edge]:
+        """
+        Retrieves an edge between two nodes in O(degree) time.
+
+        :param src_id: ID of the source node.
+        :type src_id: str
+        :param target_id: ID of the target node.
+        :type target_id: str
+        :return: The edge, or None if the nodes are not connected.
+        :rtype: Optional[`Edge`]
+        """
+        for edge in self._out_edges.get(src_id, ()):
+            if edge.target.id == target_id:
+                return edge
+        return None
+
+    def get_out_edges(self, node_id: str) -> Set[Edge]:
+        """
+        Retrieves the edges starting in the given node.
+
+        :param node_id: ID of the node.
+        :type node_id: str
+        :return: A set of outgoing edges. Empty if the node has none.
+        :rtype: set[`Edge`]
+        """
+        return set(self._out_edges.get(node_id, ()))
+
+    def get_in_edges(self, node_id: str) -> Set[Edge]:
+        """
+        Retrieves the edges ending in the given node.
+
+        :param node_id: ID of the node.
+        :type node_id: str
+        :return: A set of incoming edges. Empty if the node has none.
+        :rtype: set[`Edge`]
+        """
+        return set(self._in_edges.get(node_id, ()))
 
-            for node in self.nodes:
-                if node == target_edge.src:
-                    node.edges = [
-                        edge for edge in node.edges if node != target_edge.src]
-                if not self.directed and node == target_edge.target:
-                    node.edges = [
-                        edge for edge in node.edges if node != target_edge.target]
-                    
     def get_nodes(self) -> Set["Node"]:
         """
         Retrieves all nodes in the graph.
@@ -164,6 +223,29 @@ class Graph():
         """
         return self.edges
 
+    def _add_endpoint(self, node: Node) -> Node:
+        existing = self._node_index.get(node.id)
+        if existing is not None:
+            return existing
+        self.nodes.add(node)
+        self._node_index[node.id] = node
+        return node
+
+    def _index_edge(self, edge: Edge) -> None:
+        self.edges.add(edge)
+        self._out_edges.setdefault(edge.src.id, set()).add(edge)
+        self._in_edges.setdefault(edge.target.id, set()).add(edge)
+
+    def _unindex_edge(self, edge: Edge) -> None:
+        self.edges.discard(edge)
+        self._out_edges.get(edge.src.id, set()).discard(edge)
+        self._in_edges.get(edge.target.id, set()).discard(edge)
+
+    def _detach_edge(self, edge: Edge) -> None:
+        owner = self._node_index.get(edge.src.id)
+        if owner is not None:
+            owner.edges = [e for e in owner.edges if e != edge]
+
     def __str__(self) -> str:
         graph = f"Graph(root_id: {self.root_id}, directed: {self.directed}, nodes_count: {len(self.nodes)}, edges_count: {len(self.edges)})"
         for node in self.nodes:
@@ -0,0 +1,138 @@
+from typing import Iterable, Iterator, List, Optional
+
+from api.models.columnar_graph import (AnyGraph, ColumnarGraph,
+                                       ColumnarGraphBuilder)
+from api.models.edge import Edge
+from api.models.graph import Graph
+from api.models.node import Node
+
+
+class GraphStream():
+    """
+    A graph delivered as bounded batches of nodes followed by bounded batches of edges,
+    so that consumers never need the whole graph in memory at once.
+
+    The endpoints of streamed edges are ID-only nodes (their data is empty); node data is
+    delivered only in the node batches. A stream can be consumed once, nodes first.
+
+    :param directed: A boolean indicating whether the graph is directed.
+    :type directed: bool
+    :param root_id: Identifier for the root node in the graph.
+    :type root_id: str
+    """
+
+    def __init__(self,
+                 node_batches: Iterable[List[Node]],
+                 edge_batches: Iterable[List[Edge]],
+                 directed: Optional[bool] = True,
+                 root_id: Optional[str] = None):
+        """
+        Initializes a GraphStream.
+
+        :param node_batches: Batches of nodes, typically produced lazily by a generator.
+        :type node_batches: Iterable[List[Node]]
+        :param edge_batches: Batches of edges, typically produced lazily by a generator.
+        :type edge_batches: Iterable[List[Edge]]
+        :param directed: Indicates whether the graph is directed. Defaults to True.
+        :type directed: (bool, optional)
+        :param root_id: Identifier for the root node in the graph. Defaults to None.
+        :type root_id: (str, optional)
+        """
+        self.node_batches = node_batches
+        self.edge_batches = edge_batches
+        self.directed = directed
+        self.root_id = root_id
+
+    def __iter__(self) -> Iterator[List]:
+        """
+        Yields all node batches and then all edge batches.
+        """
+        yield from self.node_batches
+        yield from self.edge_batches
+
+    def iter_nodes(self) -> Iterator[Node]:
+        for batch in self.node_batches:
+            yield from batch
+
+    def iter_edges(self) -> Iterator[Edge]:
+        for batch in self.edge_batches:
+            yield from batch
+
+    def to_columnar_graph(self) -> ColumnarGraph:
+        """
+        Consumes the stream into a ColumnarGraph.
+
+        :return: The streamed graph.
+        :rtype: ColumnarGraph
+        """
+        builder = ColumnarGraphBuilder(directed=self.directed, root_id=self.root_id)
+        for node in self.iter_nodes():
+            builder.add_node(node.id, node.data)
+        for edge in self.iter_edges():
+            builder.add_edge(edge.src.id, edge.target.id, edge.data)
+        return builder.build()
+
+    def to_graph(self) -> Graph:
+        """
+        Consumes the stream into a Graph.
+
+        :return: The streamed graph.
+        :rtype: Graph
+        """
+        return self.to_columnar_graph().to_graph()
+
+    @classmethod
+    def from_graph(cls, graph: AnyGraph, batch_size: int) -> "GraphStream":
+        """
+        Streams an in-memory graph in batches of at most `batch_size` elements.
+
+        :param graph: The graph to stream.
+        :type graph: AnyGraph
+        :param batch_size: Maximum number of nodes or edges in a batch.
+        :type batch_size: int
+        :return: A stream over the graph.
+        :rtype: GraphStream
+        """
+        return cls(_batched(graph.get_nodes(), batch_size),
+                   _batched(graph.get_edges(), batch_size),
+                   directed=graph.directed, root_id=graph.root_id)
+
+    @classmethod
+    def from_iterables(cls,
+                       nodes: Iterable[Node],
+                       edges: Iterable[Edge],
+                       batch_size: int,
+                       directed: Optional[bool] = True,
+                       root_id: Optional[str] = None) -> "GraphStream":
+        """
+        Streams nodes and edges produced one by one in batches of at most `batch_size` elements.
+
+        :param nodes: The nodes, typically produced lazily by a generator.
+        :type nodes: Iterable[Node]
+        :param edges: The edges, typically produced lazily by a generator.
+        :type edges: Iterable[Edge]
+        :param batch_size: Maximum number of nodes or edges in a batch.
+        :type batch_size: int
+        :param directed: Indicates whether the graph is directed. Defaults to True.
+        :type directed: (bool, optional)
+        :param root_id: Identifier for the root node in the graph. Defaults to None.
+        :type root_id: (str, optional)
+        :return: A stream over the nodes and edges.
+        :rtype: GraphStream
+        """
+        return cls(_batched(nodes, batch_size), _batched(edges, batch_size),
+                   directed=directed, root_id=root_id)
+
+    def __str__(self) -> str:
+        return f"GraphStream(root_id: {self.root_id}, directed: {self.directed})"
+
+
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -1,18 +1,25 @@
 from typing import Dict, List, Optional
 
-from api.models.data import DataDict
+from api.models.data import DataDict, DataRecord
 
 
-class Node:
+class Node(DataRecord):
     """
     Class representing `Node` in a graph.
 
+    Nodes use `__slots__` and share key tuples between nodes with the same data keys.
+    The edge list is only allocated once it is first accessed. `data` is rebuilt from
+    the compact storage on every read; in-place changes to it are written back to the node,
+    but are not seen by other dictionaries read from the node before the change.
+
     Attributes:
         id: str - Node unique identifier 
         data: DataDict - Additional data of a node
         edges: list[Edge] - List of adjecent edges
     """
 
+    __slots__ = ("id", "_edges")
+
     def __init__(self, id: str, data: DataDict, edges: Optional[List] = None):
         """
         Initializes node object.
@@ -28,7 +35,20 @@ class Node:
         """
         self.id = id
         self.data = data
-        self.edges = edges if edges else []
+        self._edges = edges if edges else None
+
+    @property
+    def edges(self) -> List:
+        """
+        List of adjecent edges of a node.
+        """
+        if self._edges is None:
+            self._edges = []
+        return self._edges
+
+    @edges.setter
+    def edges(self, edges: Optional[List]) -> None:
+        self._edges = edges if edges else None
 
     def __eq__(self, __value) -> bool:
         """
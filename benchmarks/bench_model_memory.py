@@ -0,0 +1,81 @@
+"""
+Reports the memory used per node and per edge by the `api` graph models, compared with
+plain `__dict__`-based objects that store a dictionary and an edge list per node.
+
+The graph imitates rows loaded from a single database table, where every node has the same keys.
+
+Usage:
+    python benchmarks/bench_model_memory.py [--nodes 200000] [--degree 2]
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+
+from api.models.edge import Edge
+from api.models.node import Node
+
+COLUMNS = ["id", "name", "email", "created_at", "score", "country"]
+
+
+class DictNode:
+    def __init__(self, id, data, edges=None):
+        self.id = id
+        self.data = data
+        self.edges = edges if edges else []
+
+
+class DictEdge:
+    def __init__(self, data, src, target):
+        self.data = data
+        self.src = src
+        self.target = target
+
+
+def make_rows(count: int):
+    rng = random.Random(42)
+    countries = ["RS", "BA", "HR", "ME", "MK", "SI"]
+    return [(i, f"user {i}", f"user{i}@example.com", "2024-01-01", rng.randrange(100), countries[i % 6])
+            for i in range(count)]
+
+
+def measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=200000)
+    parser.add_argument("--degree", type=int, default=2)
+    args = parser.parse_args()
+
+    rows = make_rows(args.nodes)
+    rng = random.Random(7)
+    pairs = [(i, rng.randrange(args.nodes)) for i in range(args.nodes) for _ in range(args.degree)]
+    edge_data = {"relation": "orders.user_id -> users.id"}
+
+    for label, node_cls, edge_cls in (("__dict__", DictNode, DictEdge), ("slots", Node, Edge)):
+        nodes = []
+
+        def build_nodes():
+            nodes.extend(node_cls(f"users:{row[0]}", dict(zip(COLUMNS, row))) for row in rows)
+            return nodes
+
+        def build_edges():
+            return [edge_cls(dict(edge_data), nodes[src], nodes[tgt]) for src, tgt in pairs]
+
+        node_bytes = measure(build_nodes)
+        edge_bytes = measure(build_edges)
+        print(f"{label:>9}: {node_bytes / len(rows):8.1f} bytes/node  "
+              f"{edge_bytes / len(pairs):8.1f} bytes/edge")
+
+
+if __name__ == "__main__":
+    main()
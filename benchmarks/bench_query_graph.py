@@ -0,0 +1,131 @@
+"""
+Compares the previous single (n, r, m) read query with the split node query and
+id-only edge query used by `Neo4JGraphRepository.query_columnar_graph`, on a graph
+whose hub nodes have a high degree and large properties.
+
+For each read path it reports the payload received (the JSON-encoded size of the record
+values, an approximation of the bytes on the wire), the time spent fetching records
+and the time spent parsing them.
+
+Requires a running Neo4j instance configured the same way as the application
+(see `core/src/core/.example.env`).
+
+Usage:
+    python benchmarks/bench_query_graph.py [--hubs 20] [--degree 1000] [--payload 200]
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Tuple
+
+from api.models.columnar_graph import ColumnarGraphBuilder
+from api.models.edge import Edge
+from api.models.graph import Graph
+from api.models.node import Node
+from core.config.application_config import load_app_config
+from core.repositories.graph_repository.implementations.neo4j_graph_repository import (
+    Neo4JGraphRepository, _parse_edge_data, _parse_node_data)
+
+GRAPH_ID = "benchmark-query"
+
+LEGACY_QUERY = """
+MATCH (n:Node {graph_id: $graph_id})
+OPTIONAL MATCH (n)-[r:inRelationTo {graph_id: $graph_id}]->(m:Node {graph_id: $graph_id})
+RETURN n, r, m
+"""
+
+
+def make_graph(hubs: int, degree: int, payload: int) -> Graph:
+    """
+    Every hub is connected to `degree` leaves, in both directions, and every node
+    carries a text property of `payload` characters.
+    """
+    text = "x" * payload
+    hub_nodes = [Node(f"hub{i}", {"name": f"hub {i}", "description": text}) for i in range(hubs)]
+    leaf_nodes = [Node(f"leaf{i}", {"name": f"leaf {i}", "description": text}) for i in range(degree)]
+    edges = set()
+    for hub in hub_nodes:
+        for leaf in leaf_nodes:
+            edges.add(Edge({"kind": "member"}, hub, leaf))
+            edges.add(Edge({"kind": "member"}, leaf, hub))
+    return Graph(nodes=set(hub_nodes + leaf_nodes), edges=edges, directed=True)
+
+
+def payload_size(records: List[Dict[str, Any]]) -> int:
+    return sum(len(json.dumps(record, default=str)) for record in records)
+
+
+def fetch(session, query: str, **params) -> Tuple[List[Dict[str, Any]], float]:
+    start = time.perf_counter()
+    records = [record.data() for record in session.run(query, **params)]
+    return records, time.perf_counter() - start
+
+
+def parse_legacy(records: List[Dict[str, Any]]) -> ColumnarGraphBuilder:
+    builder = ColumnarGraphBuilder()
+    for record in records:
+        n_data, r_data, m_data = record["n"], record["r"], record["m"]
+        if not builder.has_node(n_data["id"]):
+            builder.add_node(n_data["id"], _parse_node_data(n_data))
+        if m_data and not builder.has_node(m_data["id"]):
+            builder.add_node(m_data["id"], _parse_node_data(m_data))
+        if r_data:
+            builder.add_edge(n_data["id"], m_data["id"], _parse_edge_data(r_data))
+    return builder
+
+
+def parse_split(node_records: List[Dict[str, Any]], edge_records: List[Dict[str, Any]]) -> ColumnarGraphBuilder:
+    builder = ColumnarGraphBuilder()
+    for record in node_records:
+        builder.add_node(record["n"]["id"], _parse_node_data(record["n"]))
+    for record in edge_records:
+        builder.add_edge(record["src"], record["tgt"], _parse_edge_data(record["r"]))
+    return builder
+
+
+def report(label: str, rows: int, size: int, fetch_seconds: float, parse_seconds: float):
+    print(f"{label:>6}: {rows:9d} rows  {size / 1024 / 1024:9.2f} MiB  "
+          f"fetch {fetch_seconds:7.2f}s  parse {parse_seconds:7.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hubs", type=int, default=20)
+    parser.add_argument("--degree", type=int, default=1000)
+    parser.add_argument("--payload", type=int, default=200)
+    args = parser.parse_args()
+
+    config = load_app_config()
+    repository = Neo4JGraphRepository(
+        uri=config.graph_db_uri,
+        user=config.graph_db_user,
+        password=config.graph_db_password,
+        batch_size=config.graph_db_batch_size,
+    )
+    graph = make_graph(args.hubs, args.degree, args.payload)
+    print(f"Graph: {len(graph.nodes)} nodes, {len(graph.edges)} edges, hub degree {2 * args.degree}")
+
+    try:
+        repository.save_graph(GRAPH_ID, graph)
+        node_query, edge_query, params = repository._build_graph_queries(GRAPH_ID, [], "")
+
+        with repository.driver.session() as session:
+            records, fetch_seconds = fetch(session, LEGACY_QUERY, graph_id=GRAPH_ID)
+            start = time.perf_counter()
+            parse_legacy(records).build()
+            report("n-r-m", len(records), payload_size(records), fetch_seconds, time.perf_counter() - start)
+
+            node_records, node_seconds = fetch(session, node_query, **params)
+            edge_records, edge_seconds = fetch(session, edge_query, **params)
+            start = time.perf_counter()
+            parse_split(node_records, edge_records).build()
+            report("split", len(node_records) + len(edge_records),
+                   payload_size(node_records) + payload_size(edge_records),
+                   node_seconds + edge_seconds, time.perf_counter() - start)
+    finally:
+        repository.delete_graph(GRAPH_ID)
+        repository.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Compares the throughput of the batched UNWIND write path in `Neo4JGraphRepository`
+with the previous one-statement-per-row loop.
+
+Requires a running Neo4j instance configured the same way as the application
+(see `core/src/core/.example.env`).
+
+Usage:
+    python benchmarks/bench_save_graph.py [--nodes 20000] [--degree 3] [--batch-size 1000]
+"""
+import argparse
+import random
+import time
+
+from neo4j import ManagedTransaction
+
+from api.models.edge import Edge
+from api.models.graph import Graph
+from api.models.node import Node
+from core.config.application_config import load_app_config
+from core.repositories.graph_repository.implementations.neo4j_graph_repository import \
+    Neo4JGraphRepository
+
+PER_ROW_GRAPH_ID = "benchmark-per-row"
+BATCHED_GRAPH_ID = "benchmark-batched"
+
+
+def make_graph(node_count: int, degree: int) -> Graph:
+    rng = random.Random(42)
+    nodes = [Node(f"n{i}", {"name": f"node {i}", "weight": rng.random(), "group": i % 17})
+             for i in range(node_count)]
+    edges = set()
+    for node in nodes:
+        for _ in range(degree):
+            target = nodes[rng.randrange(node_count)]
+            if target is not node:
+                edges.add(Edge({"kind": "link"}, node, target))
+    return Graph(nodes=set(nodes), edges=edges, directed=True)
+
+
+def save_graph_per_row(tx: ManagedTransaction, graph_id: str, graph: Graph):
+    """
+    The write path used before batching: one round-trip per node and per edge.
+    """
+    tx.run("""
+        MERGE (meta:GraphMeta {graph_id: $graph_id})
+        SET meta.directed = $directed, meta.root_id = $root_id, meta.updated_at = datetime()
+    """, graph_id=graph_id, directed=graph.directed, root_id=graph.root_id)
+    tx.run("""
+        MATCH (n:Node {graph_id: $graph_id})
+        WHERE NOT n.id IN $node_ids
+        DETACH DELETE n
+    """, graph_id=graph_id, node_ids=[node.id for node in graph.nodes])
+    for node in graph.nodes:
+        tx.run("""
+            MERGE (n:Node {id: $id, graph_id: $graph_id})
+            SET n = $props
+        """, id=node.id, graph_id=graph_id, props={**node.data, "id": node.id, "graph_id": graph_id})
+    tx.run("""
+        MATCH (:Node {graph_id: $graph_id})-[r]->(:Node {graph_id: $graph_id})
+        DELETE r
+    """, graph_id=graph_id)
+    for edge in graph.edges:
+        tx.run("""
+            MATCH (a:Node {id: $from_id, graph_id: $graph_id}),
+                  (b:Node {id: $to_id, graph_id: $graph_id})
+            MERGE (a)-[r:inRelationTo {graph_id: $graph_id}]->(b)
+            SET r += $data
+        """, from_id=edge.src.id, to_id=edge.target.id, graph_id=graph_id, data=edge.data)
+
+
+def report(label: str, graph: Graph, seconds: float):
+    print(f"{label:>10}: {seconds:8.2f}s  "
+          f"{len(graph.nodes) / seconds:10.0f} nodes/s  "
+          f"{len(graph.edges) / seconds:10.0f} edges/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=20000)
+    parser.add_argument("--degree", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    config = load_app_config()
+    repository = Neo4JGraphRepository(
+        uri=config.graph_db_uri,
+        user=config.graph_db_user,
+        password=config.graph_db_password,
+        batch_size=args.batch_size or config.graph_db_batch_size,
+    )
+    graph = make_graph(args.nodes, args.degree)
+    print(f"Graph: {len(graph.nodes)} nodes, {len(graph.edges)} edges, "
+          f"batch size {repository.batch_size}")
+
+    try:
+        start = time.perf_counter()
+        with repository.driver.session() as session:
+            session.execute_write(save_graph_per_row, PER_ROW_GRAPH_ID, graph)
+        report("per-row", graph, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        repository.save_graph(BATCHED_GRAPH_ID, graph)
+        report("batched", graph, time.perf_counter() - start)
+    finally:
+        repository.delete_graph(PER_ROW_GRAPH_ID)
+        repository.delete_graph(BATCHED_GRAPH_ID)
+        repository.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,34 @@
-from typing import Any, Dict, List, Optional
+import hashlib
+import time
+from typing import Any, ContextManager, Dict, List, Optional
 
 from api.components.data_source import DataSourceConfigParam
+from core.cache.sized_lru_cache import SizedLRUCache
 from core.commands.command_names import CommandNames
+from core.commands.cluster_commands import *
 from core.commands.command_processor import CommandProcessor
 from core.commands.filter_commands import *
 from core.commands.graph_commands import *
+from core.commands.job_commands import *
 from core.commands.workspace_commands import *
 from core.config.application_config import ApplicationConfig, load_app_config
 from core.models.filterOperator import FilterOperator
+from core.models.job import Job
 from core.models.workspace import Workspace
+from core.repositories.graph_repository.implementations.caching_graph_repository import \
+    CachingGraphRepository
 from core.repositories.graph_repository.implementations.neo4j_graph_repository import \
     Neo4JGraphRepository
 from core.repositories.workspace_repository.implementations.tiny_db_workspace_repository import \
     WorkspaceRepository
+from core.tree.forest_store import ForestStore
+from core.use_cases.cluster_service import ClusterService
 from core.use_cases.graph_context_factory import GraphContextFactory
+from core.use_cases.job_service import JobService
+from core.use_cases.layout_service import LayoutService
 from core.use_cases.plugin_recognition import load_plugins
+from core.use_cases.tree_service import TreeService
+from core.use_cases.viewport_service import ViewportService
 from core.use_cases.workspace_context import WorkspaceContext
 from core.use_cases.workspaces import WorkspaceService
 
@@ -46,17 +60,33 @@ class Application(object):
 
 
         # Initializer graph storage
-        self.graph_repository = Neo4JGraphRepository(
-            uri=app_config.graph_db_uri,
-            user=app_config.graph_db_user,
-            password=app_config.graph_db_password
+        self.graph_repository = CachingGraphRepository(
+            Neo4JGraphRepository(
+                uri=app_config.graph_db_uri,
+                user=app_config.graph_db_user,
+                password=app_config.graph_db_password,
+                batch_size=app_config.graph_db_batch_size
+            ),
+            max_bytes=app_config.graph_cache_max_bytes
         )
 
+        self.render_cache: SizedLRUCache[str] = SizedLRUCache(app_config.render_cache_max_bytes)
+
+        self.job_service = JobService(max_workers=app_config.job_workers)
+
         self.graph_context_factory = GraphContextFactory(
             self.workspace_service,
             self.graph_repository,
             self.data_source_plugins,
-            self.visualizer_plugins
+            self.visualizer_plugins,
+            self.render_cache,
+            LayoutService(self.graph_repository, self.job_service),
+            ViewportService(node_threshold=app_config.viewport_node_threshold,
+                            max_nodes=app_config.viewport_max_nodes),
+            ClusterService(self.graph_repository),
+            TreeService(self.graph_repository,
+                        ForestStore(app_config.forest_dir) if app_config.forest_dir else None),
+            self.job_service
         )
 
         self.workspace_context = WorkspaceContext(
@@ -64,6 +94,9 @@ class Application(object):
 
         self.command_processor = AppCommandProcessor(self)
 
+        # distinguishes graph versions of this process from those of earlier runs
+        self._started_at = time.time_ns()
+
     @property
     def graph_context(self) -> GraphContext:
         return self.workspace_context.graph_context
@@ -88,6 +121,61 @@ class Application(object):
             **self.workspace_context.get_context()
         }
 
+    def get_state_tag(self) -> Optional[str]:
+        """
+        Get a tag that changes whenever the state returned by `get_context` may have changed.
+        Suitable as an HTTP entity tag.
+
+        :return: The tag, or None if the graph repository does not track graph versions.
+        :rtype: Optional[str]
+        """
+        render_key = self.graph_context.render_key()
+        if render_key is None:
+            return None
+        refresh_job = self.graph_context.get_refresh_job()
+        state = (
+            self._started_at,
+            self.workspace_context.current_workspace_id,
+            render_key,
+            (refresh_job.id, refresh_job.state) if refresh_job else None,
+            self.graph_context.layout_pending(),
+            [w.to_dict() for w in self.workspace_service.get_workspaces()],
+        )
+        return hashlib.sha1(repr(state).encode("utf-8")).hexdigest()
+
+    def request_scope(self) -> ContextManager[None]:
+        """
+        Get a context manager for handling a single request: the version of each graph is read
+        from the database at most once while it is active.
+
+        :return: The context manager.
+        :rtype: ContextManager[None]
+        """
+        return self.graph_repository.pinned_versions()
+
+    def get_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get the counters of the graph query cache and the rendered graph cache.
+
+        :return: hits, misses, evictions, number of entries, size in bytes and size bound of each cache
+        :rtype: Dict[str, Dict[str, int]]
+        """
+        return {
+            "query": self.graph_repository.stats(),
+            "render": self.render_cache.stats(),
+        }
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """
+        Get a background job, e.g. a data source refresh, by its ID.
+
+        :param job_id: The ID of the job.
+        :type job_id: str
+        :return: The job, or None if it does not exist or finished long ago.
+        :rtype: Optional[Job]
+        """
+        return self.job_service.get(job_id)
+
     def get_data_source_config_params(self, data_source_id: str) -> List[DataSourceConfigParam]:
         """
         Get the available configuration options for a given data source plugin.
@@ -122,6 +210,9 @@ class AppCommandProcessor(CommandProcessor):
             CommandNames.FILTER: lambda args: FilterCommand(app.graph_context, args),
             CommandNames.CLEAR_SEARCH: lambda _: ClearSearchCommand(app.graph_context),
             CommandNames.REMOVE_FILTER: lambda args: RemoveFilterCommand(app.graph_context, args),
+            CommandNames.SUMMARIZE: lambda args: SummarizeCommand(app.graph_context, args),
+            CommandNames.EXPAND_CLUSTER: lambda args: ExpandClusterCommand(app.graph_context, args),
+            CommandNames.COLLAPSE_CLUSTER: lambda args: CollapseClusterCommand(app.graph_context, args),
             CommandNames.SELECT_WORKSPACE: lambda args: SelectWorkspaceCommand(app.workspace_context, args),
             CommandNames.CREATE_WORKSPACE: lambda args: CreateWorkspaceCommand(
                 app.workspace_service,
@@ -145,4 +236,5 @@ class AppCommandProcessor(CommandProcessor):
                 args=args,
             ),
             CommandNames.REFRESH_DATA_SOURCE: lambda args: RefreshDataSourceCommand(app.graph_context),
+            CommandNames.CANCEL_JOB: lambda args: CancelJobCommand(app.job_service, args),
         })
@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class SizedLRUCache(Generic[V]):
+    """
+    A thread-safe least recently used cache bounded by the total size of its values.
+
+    Sizes are supplied by the caller when a value is stored, so the cache works with any
+    size estimate (bytes of a rendered page, estimated memory of a graph, ...).
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Initializes an empty cache.
+
+        :param max_bytes: Upper bound of the total size of cached values, 0 disables caching
+        :type max_bytes: int
+        """
+        if max_bytes < 0:
+            raise ValueError("Cache size must not be negative")
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[V, int]]" = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """
+        Returns the cached value and marks it as recently used, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: V, size: int) -> bool:
+        """
+        Stores a value, evicting the least recently used values while the bound is exceeded.
+
+        :return: False if the value alone exceeds the bound and was not stored, otherwise True
+        :rtype: bool
+        """
+        with self._lock:
+            if size > self.max_bytes:
+                return False
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self._evictions += 1
+            return True
+
+    def remove_where(self, predicate: Callable[[Hashable], bool]):
+        """
+        Removes every value whose key satisfies the predicate. Removals are not counted as evictions.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                _, size = self._entries.pop(key)
+                self._size -= size
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the cache counters.
+
+        :return: hits, misses, evictions, number of entries, total size and size bound
+        :rtype: Dict[str, int]
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
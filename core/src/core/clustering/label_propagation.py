@@ -0,0 +1,125 @@
+from typing import List, Optional
+
+import numpy as np
+
+DEFAULT_MAX_ITERATIONS = 100
+
+
+def label_propagation(node_count: int,
+                      sources: np.ndarray,
+                      targets: np.ndarray,
+                      weights: Optional[np.ndarray] = None,
+                      max_iterations: int = DEFAULT_MAX_ITERATIONS,
+                      seed: int = 0) -> np.ndarray:
+    """
+    Detects communities by label propagation: every node starts in its own community and
+    repeatedly joins the community with the largest total edge weight among its neighbours.
+
+    Edges are treated as undirected and loops pull a node towards its current community, so the
+    function also merges communities when run over a graph of communities whose loops carry
+    their internal edge counts. Updates are asynchronous, every node sees the moves made before
+    it in the same iteration: nodes are colored so that no two neighbours share a color, and the
+    color classes, whose members cannot influence each other, move one after another in a random
+    order. Ties are broken at random by the seeded generator, so a seed always gives the same
+    result. Iterations stop once every node is in one of the communities with the largest
+    weight among its neighbours.
+
+    :param node_count: Number of nodes, nodes are identified by indexes below it.
+    :type node_count: int
+    :param sources: Source node index of every edge.
+    :type sources: np.ndarray
+    :param targets: Target node index of every edge.
+    :type targets: np.ndarray
+    :param weights: Weight of every edge, 1 for all edges if omitted.
+    :type weights: Optional[np.ndarray]
+    :param max_iterations: Upper bound of the number of iterations.
+    :type max_iterations: int
+    :param seed: Seed of the coloring and of the update order.
+    :type seed: int
+    :return: Community of every node, numbered from 0 without gaps.
+    :rtype: np.ndarray
+    """
+    labels = np.arange(node_count, dtype=np.int64)
+    if weights is None:
+        weights = np.ones(len(sources))
+
+    # loops count for the community of the node itself, which keeps merged communities together
+    node = np.concatenate((sources, targets)).astype(np.int64)
+    neighbour = np.concatenate((targets, sources)).astype(np.int64)
+    weight = np.concatenate((weights, weights)).astype(float)
+    if len(node) == 0:
+        return labels
+
+    rng = np.random.default_rng(seed)
+    color = _color(node_count, node, neighbour, rng)
+    # incident edges grouped by the color of their node
+    order = np.lexsort((node, color[node]))
+    node, neighbour, weight = node[order], neighbour[order], weight[order]
+    bounds = np.searchsorted(color[node], np.arange(color.max() + 2))
+    classes: List[slice] = [slice(bounds[c], bounds[c + 1]) for c in range(len(bounds) - 1)
+                            if bounds[c + 1] > bounds[c]]
+
+    for _ in range(max_iterations):
+        unsettled = 0
+        for c in rng.permutation(len(classes)):
+            part = classes[c]
+            unsettled += _move(labels, node[part], neighbour[part], weight[part], node_count, rng)
+        if not unsettled:
+            break
+
+    _, labels = np.unique(labels, return_inverse=True)
+    return labels.astype(np.int64)
+
+
+def _color(node_count: int, node: np.ndarray, neighbour: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Colors the nodes so that neighbours never share a color: in every round, the uncolored nodes
+    whose random priority is above that of all their uncolored neighbours take the next color.
+    """
+    color = np.full(node_count, -1, dtype=np.int64)
+    priority = rng.permutation(node_count)
+    distinct = node != neighbour
+    node, neighbour = node[distinct], neighbour[distinct]
+    uncolored = np.ones(node_count, dtype=bool)
+    round_ = 0
+    while uncolored.any():
+        highest = np.full(node_count, -1, dtype=np.int64)
+        np.maximum.at(highest, node, priority[neighbour])
+        chosen = uncolored & (priority > highest)
+        color[chosen] = round_
+        uncolored &= ~chosen
+        round_ += 1
+        # only edges between uncolored nodes constrain the next rounds
+        open_ = uncolored[node] & uncolored[neighbour]
+        node, neighbour = node[open_], neighbour[open_]
+    return color
+
+
+def _move(labels: np.ndarray, node: np.ndarray, neighbour: np.ndarray, weight: np.ndarray,
+          node_count: int, rng: np.random.Generator) -> int:
+    """
+    Moves nodes of one color class, given their incident edges sorted by node, to their best
+    community. Returns the number of nodes that changed their community.
+    """
+    # total weight of every (node, neighbouring label) pair, pairs sorted by node
+    keys = node * node_count + labels[neighbour]
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    pairs = keys[starts]
+    pair_node = pairs // node_count
+    pair_label = pairs % node_count
+    score = np.add.reduceat(weight[order], starts)
+
+    # a random one of the best scoring pairs of every node
+    node_starts = np.flatnonzero(np.r_[True, pair_node[1:] != pair_node[:-1]])
+    counts = np.diff(np.r_[node_starts, len(pairs)])
+    top = score == np.repeat(np.maximum.reduceat(score, node_starts), counts)
+    rank = np.where(top, rng.random(len(pairs)), -1.0)
+    best = np.flatnonzero(rank == np.repeat(np.maximum.reduceat(rank, node_starts), counts))
+    best = best[np.r_[True, pair_node[best[1:]] != pair_node[best[:-1]]]]
+    nodes = pair_node[best]
+    # nodes outside of all their best communities, the others may move between tied ones
+    unsettled = len(node_starts) - np.count_nonzero(top & (pair_label == labels[pair_node]))
+    labels[nodes] = pair_label[best]
+    return int(unsettled)
@@ -0,0 +1,64 @@
+from typing import Any, Dict, Tuple
+
+from core.commands.command import Command
+from core.use_cases.cluster_service import CLUSTER_NODE_PREFIX
+from core.use_cases.graph_context import GraphContext
+
+
+class SummarizeCommand(Command):
+    def __init__(self, graph_context: GraphContext, args: Dict[str, Any]) -> None:
+        self.graph_context = graph_context
+        self.args = args
+
+    def execute(self) -> Tuple[bool, str]:
+        state = str(self.args.get('state', 'on')).lower()
+        if state not in ('on', 'off'):
+            return False, "State must be 'on' or 'off'."
+
+        try:
+            self.graph_context.set_summary_mode(state == 'on')
+        except ValueError as e:
+            return False, str(e)
+
+        if state == 'on':
+            return True, 'Showing graph summary'
+        return True, 'Showing whole graph'
+
+
+class ExpandClusterCommand(Command):
+    def __init__(self, graph_context: GraphContext, args: Dict[str, Any]) -> None:
+        self.graph_context = graph_context
+        self.args = args
+
+    def execute(self) -> Tuple[bool, str]:
+        cluster_id = _cluster_id(self.args)
+        if not cluster_id:
+            return False, 'Cluster ID is required.'
+        if not self.graph_context.summary_mode:
+            return False, 'Graph summary is not shown.'
+
+        self.graph_context.expand_cluster(cluster_id)
+        return True, f'Cluster {cluster_id} expanded.'
+
+
+class CollapseClusterCommand(Command):
+    def __init__(self, graph_context: GraphContext, args: Dict[str, Any]) -> None:
+        self.graph_context = graph_context
+        self.args = args
+
+    def execute(self) -> Tuple[bool, str]:
+        cluster_id = _cluster_id(self.args)
+        if not cluster_id:
+            return False, 'Cluster ID is required.'
+
+        if not self.graph_context.collapse_cluster(cluster_id):
+            return False, f'Cluster {cluster_id} is not expanded.'
+        return True, f'Cluster {cluster_id} collapsed.'
+
+
+def _cluster_id(args: Dict[str, Any]) -> str:
+    # accepts the ID of the summary node as well
+    cluster_id = str(args.get('id') or '')
+    if cluster_id.startswith(CLUSTER_NODE_PREFIX):
+        cluster_id = cluster_id[len(CLUSTER_NODE_PREFIX):]
+    return cluster_id
@@ -17,6 +17,11 @@ class CommandNames(str, Enum):
     CLEAR_SEARCH = "clear-search"
     REMOVE_FILTER = "remove-filter"
 
+    # Community summary
+    SUMMARIZE = "summarize"
+    EXPAND_CLUSTER = "expand-cluster"
+    COLLAPSE_CLUSTER = "collapse-cluster"
+
     # Workspaces
     SELECT_WORKSPACE = "select-workspace"
     CREATE_WORKSPACE = "create-workspace"
@@ -25,3 +30,6 @@ class CommandNames(str, Enum):
 
     SELECT_VISUALIZER = "select-visualizer"
     REFRESH_DATA_SOURCE = "refresh-data-source"
+
+    # Background jobs
+    CANCEL_JOB = "cancel-job"
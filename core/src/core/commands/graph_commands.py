@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Tuple
 
+from api.models.edge import Edge
 from api.models.node import Node
 from core.commands.command import Command
 from core.use_cases.graph_context import GraphContext
@@ -28,12 +29,10 @@ class CreateNodeCommand(Command):
             return False, 'Node ID is required.'
 
         try:
-            graph = self.graph_context.get_graph()
+            existing_node = self.graph_context.get_node(str(node_id))
         except KeyError:
             return False, "No graph context available"
 
-        existing_node = next((n for n in graph.get_nodes()
-                             if n.id == str(node_id)), None)
         if existing_node:
             return False, f'Node {node_id} already exists.'
 
@@ -42,9 +41,7 @@ class CreateNodeCommand(Command):
         except Exception:
             return False, f'Invalid JSON format: {data_arg}'
 
-        node = Node(str(node_id), node_data)
-        graph.add_node(node)
-        self.graph_context.save_graph(graph)
+        self.graph_context.save_node(Node(str(node_id), node_data))
         return True, f'Node {node_id} created.'
 
 
@@ -60,9 +57,7 @@ class UpdateNodeCommand(Command):
         if not node_id:
             return False, 'Node ID is required.'
 
-        graph = self.graph_context.get_graph()
-        node = next((n for n in graph.get_nodes()
-                    if n.id == str(node_id)), None)
+        node = self.graph_context.get_node(str(node_id))
         if not node:
             return False, f'Node {node_id} not found.'
 
@@ -71,8 +66,7 @@ class UpdateNodeCommand(Command):
         except Exception:
             return False, f'Invalid JSON format: {data_arg}'
 
-        graph.update_node(node, node_data)
-        self.graph_context.save_graph(graph)
+        self.graph_context.save_node(Node(node.id, node_data))
         return True, f'Node {node_id} updated.'
 
 
@@ -89,15 +83,13 @@ class UpdateEdgeCommand(Command):
         if not src_id or not tgt_id:
             return False, 'Both source and target node IDs are required.'
 
-        graph = self.graph_context.get_graph()
-        src = next((n for n in graph.get_nodes() if n.id == str(src_id)), None)
-        tgt = next((n for n in graph.get_nodes() if n.id == str(tgt_id)), None)
+        src = self.graph_context.get_node(str(src_id))
+        tgt = self.graph_context.get_node(str(tgt_id))
 
         if not src or not tgt:
             return False, 'Both nodes must exist.'
 
-        edge = next((e for e in graph.get_edges() if e.src.id ==
-                    str(src_id) and e.target.id == str(tgt_id)), None)
+        edge = self.graph_context.get_edge(str(src_id), str(tgt_id))
         if not edge:
             return False, f'Edge {src_id} -> {tgt_id} not found.'
 
@@ -106,8 +98,7 @@ class UpdateEdgeCommand(Command):
         except Exception:
             return False, f'Invalid JSON format: {data_arg}'
 
-        graph.update_edge(edge, edge_data)
-        self.graph_context.save_graph(graph)
+        self.graph_context.save_edge(Edge(edge_data, src, tgt))
         return True, f'Edge {src_id} -> {tgt_id} updated.'
 
 
@@ -121,14 +112,9 @@ class DeleteNodeCommand(Command):
         if not node_id:
             return False, 'Node ID is required.'
 
-        graph = self.graph_context.get_graph()
-        node = next((n for n in graph.get_nodes()
-                    if n.id == str(node_id)), None)
-        if not node:
+        if not self.graph_context.delete_node(str(node_id)):
             return False, f'Node {node_id} not found.'
 
-        graph.remove_node(node)
-        self.graph_context.save_graph(graph)
         return True, f'Node {node_id} deleted.'
 
 
@@ -147,14 +133,13 @@ class CreateEdgeCommand(Command):
         if src_id == tgt_id:
             return False, 'Recursive edges are not possible'
 
-        graph = self.graph_context.get_graph()
-        src = next((n for n in graph.get_nodes() if n.id == str(src_id)), None)
-        tgt = next((n for n in graph.get_nodes() if n.id == str(tgt_id)), None)
+        src = self.graph_context.get_node(str(src_id))
+        tgt = self.graph_context.get_node(str(tgt_id))
 
         if not src or not tgt:
             return False, 'Both nodes must exist.'
 
-        if any(e.src.id == str(src_id) and e.target.id == str(tgt_id) for e in graph.get_edges()):
+        if self.graph_context.get_edge(str(src_id), str(tgt_id)):
             return False, 'Edge already exists.'
 
         try:
@@ -162,11 +147,7 @@ class CreateEdgeCommand(Command):
         except Exception:
             return False, f'Invalid JSON format: {data_arg}'
 
-        from api.models.edge import Edge
-        edge = Edge(edge_data, src, tgt)
-        graph.add_edge(edge)
-
-        self.graph_context.save_graph(graph)
+        self.graph_context.save_edge(Edge(edge_data, src, tgt))
 
         return True, f'Edge {src_id} -> {tgt_id} created.'
 
@@ -183,14 +164,9 @@ class DeleteEdgeCommand(Command):
         if not src_id or not tgt_id:
             return False, 'Both source and target node IDs are required.'
 
-        graph = self.graph_context.get_graph()
-        edge = next((e for e in graph.get_edges() if e.src.id ==
-                    str(src_id) and e.target.id == str(tgt_id)), None)
-        if not edge:
+        if not self.graph_context.delete_edge(str(src_id), str(tgt_id)):
             return False, f'Edge {src_id} -> {tgt_id} not found.'
 
-        graph.remove_edge(edge)
-        self.graph_context.save_graph(graph)
         return True, f'Edge {src_id} -> {tgt_id} deleted.'
 
 
@@ -201,8 +177,5 @@ class ClearGraphCommand(Command):
         self.graph_context = graph_context
 
     def execute(self) -> Tuple[bool, str]:
-        graph = self.graph_context.get_graph()
-        for node in list(graph.get_nodes()):
-            graph.remove_node(node)
-        self.graph_context.save_graph(graph)
+        self.graph_context.clear_graph()
         return True, 'Graph cleared.'
@@ -0,0 +1,22 @@
+from typing import Any, Dict, Tuple
+
+from core.commands.command import Command
+from core.use_cases.job_service import JobService
+
+
+class CancelJobCommand(Command):
+    def __init__(self, job_service: JobService, args: Dict[str, Any]) -> None:
+        self.job_service = job_service
+        self.job_id = args.get('job_id')
+
+    def execute(self) -> Tuple[bool, str]:
+        if not self.job_id:
+            return False, "Missing 'job_id'"
+
+        try:
+            if not self.job_service.cancel(str(self.job_id)):
+                return False, 'The job has already finished.'
+        except KeyError:
+            return False, f'Job not found: {self.job_id}'
+
+        return True, 'Cancelling the job'
@@ -133,8 +133,9 @@ class RefreshDataSourceCommand(Command):
 
     def execute(self) -> Tuple[bool, str]:
         try:
-            self.graph_context.refresh_data_source()
-            return True, "Successfully reloaded the data"
+            if self.graph_context.start_refresh() is None:
+                return True, "Successfully reloaded the data"
+            return True, "Started reloading the data"
         except KeyError:
             return False, "No data source selected"
         except Exception as e:
@@ -1,6 +1,7 @@
 import os
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 import appdirs
 from dotenv import load_dotenv
@@ -18,6 +19,14 @@ class ApplicationConfig:
     graph_db_user: str
     graph_db_password: str
 
+    graph_db_batch_size: int = 1000
+    graph_cache_max_bytes: int = 256 * 1024 * 1024
+    render_cache_max_bytes: int = 64 * 1024 * 1024
+    viewport_node_threshold: int = 5000
+    viewport_max_nodes: int = 2000
+    job_workers: int = 2
+    forest_dir: Optional[Path] = None
+
 
 def load_app_config() -> ApplicationConfig:
     """
@@ -36,5 +45,12 @@ def load_app_config() -> ApplicationConfig:
             "graph_explorer")) / "workspaces.json",
         graph_db_uri=os.getenv('NEO4J_URI', 'bolt://localhost:7687'),
         graph_db_user=os.getenv('NEO4J_USER', 'neo4j'),
-        graph_db_password=os.getenv('NEO4J_PASSWORD', 'password')
+        graph_db_password=os.getenv('NEO4J_PASSWORD', 'password'),
+        graph_db_batch_size=int(os.getenv('NEO4J_BATCH_SIZE', '1000')),
+        graph_cache_max_bytes=int(os.getenv('GRAPH_CACHE_MAX_BYTES', str(256 * 1024 * 1024))),
+        render_cache_max_bytes=int(os.getenv('RENDER_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+        viewport_node_threshold=int(os.getenv('VIEWPORT_NODE_THRESHOLD', '5000')),
+        viewport_max_nodes=int(os.getenv('VIEWPORT_MAX_NODES', '2000')),
+        job_workers=int(os.getenv('JOB_WORKERS', '2')),
+        forest_dir=Path(appdirs.user_cache_dir("graph_explorer")) / "forests"
     )
@@ -0,0 +1,272 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from api.components.progress import report_progress
+from api.models.columnar_graph import ColumnarGraph
+
+DEFAULT_IDEAL_DISTANCE = 200.0
+DEFAULT_ITERATIONS = 150
+LEAF_CAPACITY = 8
+DEPTH = 31
+"""Number of quadtree levels below the root, bits per coordinate of the Morton codes."""
+THETA = 0.8
+"""Barnes-Hut opening angle: cells smaller than THETA times their distance act as one body."""
+
+
+def force_layout(graph: ColumnarGraph,
+                 initial: Optional[np.ndarray] = None,
+                 iterations: int = DEFAULT_ITERATIONS,
+                 ideal_distance: float = DEFAULT_IDEAL_DISTANCE,
+                 gravity: float = 0.1,
+                 seed: int = 0) -> np.ndarray:
+    """
+    Computes a force-directed (Fruchterman-Reingold) layout of a graph.
+
+    Repulsion is approximated Barnes-Hut style on an adaptive quadtree: cells which are small
+    compared to their distance from a node act through their centre of mass, nodes in nearby
+    leaf cells repel it exactly. Cells are split until they hold a few nodes, so the tree
+    follows clusters and an iteration costs O(n log n + e); only nodes closer than 2^-31 of the
+    layout size, i.e. practically coincident ones, share leaves of unbounded size.
+
+    :param graph: The graph to lay out.
+    :type graph: ColumnarGraph
+    :param initial: Starting positions, an (n, 2) array. Rows with NaN are placed randomly next
+                    to an already placed neighbour, or anywhere if there is none.
+    :type initial: Optional[np.ndarray]
+    :param iterations: Number of iterations.
+    :type iterations: int
+    :param ideal_distance: Preferred distance between adjacent nodes, in pixels.
+    :type ideal_distance: float
+    :param gravity: Strength of the pull towards the centre which keeps components together.
+    :type gravity: float
+    :param seed: Seed of the random initial placement.
+    :type seed: int
+    :return: An (n, 2) array of positions, ordered by node index.
+    :rtype: np.ndarray
+    """
+    n = graph.node_count
+    if n == 0:
+        return np.zeros((0, 2))
+
+    rng = np.random.default_rng(seed)
+    k = float(ideal_distance)
+    side = k * np.sqrt(n)
+    sources, targets = _edge_arrays(graph)
+
+    positions = rng.uniform(-side / 2, side / 2, size=(n, 2))
+    temperature = side / 10
+    if initial is not None:
+        known = ~np.isnan(initial).any(axis=1)
+        if known.any():
+            positions = _place_unknown(initial, known, sources, targets, k, rng)
+            # a mostly laid out graph only needs to settle around the new nodes
+            temperature = k if known.mean() > 0.9 else side / 10
+
+    if n == 1:
+        return np.zeros((1, 2))
+
+    cooling = temperature / (iterations + 1)
+    for iteration in range(iterations):
+        report_progress(iteration, iterations, "Computing layout")
+        displacement = _repulsion(positions, k)
+        displacement += _attraction(positions, sources, targets, k)
+        displacement -= gravity * (positions - positions.mean(axis=0))
+
+        length = np.maximum(np.hypot(displacement[:, 0], displacement[:, 1]), 1e-9)
+        positions += displacement * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+
+    return positions - positions.mean(axis=0)
+
+
+def _edge_arrays(graph: ColumnarGraph) -> Tuple[np.ndarray, np.ndarray]:
+    offsets = np.frombuffer(graph.offsets, dtype=np.int64)
+    targets = np.frombuffer(graph.targets, dtype=np.int64)
+    sources = np.repeat(np.arange(graph.node_count), np.diff(offsets))
+    not_loop = sources != targets
+    return sources[not_loop], targets[not_loop]
+
+
+def _place_unknown(initial: np.ndarray, known: np.ndarray, sources: np.ndarray, targets: np.ndarray,
+                   k: float, rng: np.random.Generator) -> np.ndarray:
+    positions = np.where(known[:, None], np.nan_to_num(initial), 0.0)
+    unknown = np.flatnonzero(~known)
+    if len(unknown) == 0:
+        return positions
+
+    # next to any placed neighbour, otherwise around the centre of the placed nodes
+    anchor = np.full(len(known), -1)
+    for a, b in ((sources, targets), (targets, sources)):
+        usable = ~known[a] & known[b]
+        anchor[a[usable]] = b[usable]
+    anchors = anchor[unknown]
+    centre = positions[known].mean(axis=0)
+    spread = np.where(anchors >= 0, k, k * np.sqrt(len(unknown)))
+    base = np.where((anchors >= 0)[:, None], positions[np.maximum(anchors, 0)], centre)
+    positions[unknown] = base + rng.uniform(-1, 1, size=(len(unknown), 2)) * spread[:, None]
+    return positions
+
+
+def _attraction(positions: np.ndarray, sources: np.ndarray, targets: np.ndarray, k: float) -> np.ndarray:
+    n = len(positions)
+    delta = positions[sources] - positions[targets]
+    distance = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 1e-9)
+    # force d^2 / k along the edge, applied to both endpoints
+    force = delta * (distance / k)[:, None]
+    result = np.zeros_like(positions)
+    for axis in (0, 1):
+        result[:, axis] -= np.bincount(sources, weights=force[:, axis], minlength=n)
+        result[:, axis] += np.bincount(targets, weights=force[:, axis], minlength=n)
+    return result
+
+
+def _repulsion(positions: np.ndarray, k: float) -> np.ndarray:
+    tree = _QuadTree(positions)
+    n = len(positions)
+    k2 = k * k
+    result = np.zeros_like(positions)
+
+    # every node walks the tree breadth first, all nodes at once, as (node, cell) pairs
+    nodes = np.arange(n)
+    cells = np.zeros(n, dtype=np.int64)
+    while len(nodes):
+        dx = positions[nodes, 0] - tree.centre[cells, 0]
+        dy = positions[nodes, 1] - tree.centre[cells, 1]
+        d2 = dx * dx + dy * dy
+        # a cell acts through its centre of mass if it is small seen from the node, and does not
+        # contain the node
+        rank = tree.rank[nodes]
+        outside = (rank < tree.start[cells]) | (rank >= tree.end[cells])
+        far = outside & (tree.size[cells] ** 2 < THETA * THETA * d2)
+        if far.any():
+            # force k^2 * m / d along (dx, dy) / d
+            scale = k2 * tree.mass[cells[far]] / d2[far]
+            result[:, 0] += np.bincount(nodes[far], weights=dx[far] * scale, minlength=n)
+            result[:, 1] += np.bincount(nodes[far], weights=dy[far] * scale, minlength=n)
+
+        near = ~far
+        leaf = near & (tree.child_count[cells] == 0)
+        if leaf.any():
+            result += _leaf_repulsion(positions, tree, nodes[leaf], cells[leaf], k2)
+
+        inner = near & ~leaf
+        nodes, cells = nodes[inner], cells[inner]
+        counts = tree.child_count[cells]
+        first = np.repeat(tree.first_child[cells] - np.cumsum(counts) + counts, counts)
+        nodes = np.repeat(nodes, counts)
+        cells = first + np.arange(len(first))
+    return result
+
+
+def _leaf_repulsion(positions: np.ndarray, tree: "_QuadTree", nodes: np.ndarray, cells: np.ndarray,
+                    k2: float) -> np.ndarray:
+    """
+    Exact repulsion of the nodes of leaf cells on the given nodes.
+    """
+    n = len(positions)
+    counts = tree.end[cells] - tree.start[cells]
+    first = np.repeat(tree.start[cells] - np.cumsum(counts) + counts, counts)
+    i = np.repeat(nodes, counts)
+    j = tree.order[first + np.arange(len(first))]
+    distinct = i != j
+    i, j = i[distinct], j[distinct]
+    dx = positions[i, 0] - positions[j, 0]
+    dy = positions[i, 1] - positions[j, 1]
+    d2 = dx * dx + dy * dy
+    # coincident nodes are pushed apart in a direction derived from their indexes
+    coincident = d2 < 1e-9
+    dx = np.where(coincident, np.cos(i - j), dx)
+    dy = np.where(coincident, np.sin(i - j), dy)
+    d2 = np.where(coincident, 1.0, d2)
+    scale = k2 / d2
+    result = np.zeros_like(positions)
+    result[:, 0] = np.bincount(i, weights=dx * scale, minlength=n)
+    result[:, 1] = np.bincount(i, weights=dy * scale, minlength=n)
+    return result
+
+
+class _QuadTree(object):
+    """
+    An adaptive quadtree over node positions, stored as flat arrays of cells.
+
+    Nodes are sorted by the Morton code of their position, so every cell is a contiguous range
+    of the sorted nodes. Cells holding more than `LEAF_CAPACITY` nodes are split until the
+    deepest level, so dense clusters get deep subtrees while sparse regions stay shallow.
+    Children of a cell are consecutive, starting at `first_child`.
+    """
+
+    def __init__(self, positions: np.ndarray):
+        low = positions.min(axis=0)
+        span = max(float((positions.max(axis=0) - low).max()), 1e-9) * (1 + 1e-9)
+        grid = np.minimum(((positions - low) / span * (1 << DEPTH)).astype(np.int64), (1 << DEPTH) - 1)
+        codes = _morton(grid[:, 0], grid[:, 1])
+        self.order = np.argsort(codes, kind="stable")
+        self.rank = np.empty_like(self.order)
+        self.rank[self.order] = np.arange(len(self.order))
+        sorted_codes = codes[self.order]
+        sorted_positions = positions[self.order]
+
+        starts, ends, sizes, firsts, child_counts = [], [], [], [], []
+        level_start = np.zeros(1, dtype=np.int64)
+        level_end = np.array([len(codes)], dtype=np.int64)
+        cell_count = 1
+        for level in range(DEPTH + 1):
+            split = (level_end - level_start > LEAF_CAPACITY) & (level < DEPTH)
+            starts.append(level_start)
+            ends.append(level_end)
+            sizes.append(np.full(len(level_start), span / (1 << level)))
+            if not split.any():
+                firsts.append(np.zeros(len(level_start), dtype=np.int64))
+                child_counts.append(np.zeros(len(level_start), dtype=np.int64))
+                break
+
+            # children are the runs of equal code prefixes one level down within split cells
+            shift = 2 * (DEPTH - level - 1)
+            parent_start, parent_end = level_start[split], level_end[split]
+            lengths = parent_end - parent_start
+            member = np.repeat(np.arange(len(parent_start)), lengths)
+            position = np.repeat(parent_start - np.cumsum(lengths) + lengths, lengths) + np.arange(len(member))
+            prefix = sorted_codes[position] >> shift
+            boundary = np.ones(len(position), dtype=bool)
+            boundary[1:] = (prefix[1:] != prefix[:-1]) | (member[1:] != member[:-1])
+            child_start = position[boundary]
+            child_end = np.append(child_start[1:], 0)
+            last = np.ones(len(child_start), dtype=bool)
+            last[:-1] = member[boundary][1:] != member[boundary][:-1]
+            child_end[last] = parent_end
+            per_parent = np.bincount(member[boundary], minlength=len(parent_start))
+
+            first = np.zeros(len(level_start), dtype=np.int64)
+            count = np.zeros(len(level_start), dtype=np.int64)
+            first[split] = cell_count + np.cumsum(per_parent) - per_parent
+            count[split] = per_parent
+            firsts.append(first)
+            child_counts.append(count)
+            cell_count += len(child_start)
+            level_start, level_end = child_start, child_end
+
+        self.start = np.concatenate(starts)
+        self.end = np.concatenate(ends)
+        self.size = np.concatenate(sizes)
+        self.first_child = np.concatenate(firsts)
+        self.child_count = np.concatenate(child_counts)
+        self.mass = (self.end - self.start).astype(float)
+        cumulative = np.zeros((len(positions) + 1, 2))
+        np.cumsum(sorted_positions, axis=0, out=cumulative[1:])
+        self.centre = (cumulative[self.end] - cumulative[self.start]) / self.mass[:, None]
+
+
+def _morton(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return (_spread(x) << 1) | _spread(y)
+
+
+def _spread(values: np.ndarray) -> np.ndarray:
+    # inserts a zero bit above every bit of a 31 bit value
+    values = values.astype(np.int64) & 0x7FFFFFFF
+    values = (values | (values << 16)) & 0x0000FFFF0000FFFF
+    values = (values | (values << 8)) & 0x00FF00FF00FF00FF
+    values = (values | (values << 4)) & 0x0F0F0F0F0F0F0F0F
+    values = (values | (values << 2)) & 0x3333333333333333
+    values = (values | (values << 1)) & 0x5555555555555555
+    return values
@@ -0,0 +1,129 @@
+from typing import List, Tuple
+
+import numpy as np
+
+BITS = 16
+LEAF_SIZE = 32
+
+
+class SpatialIndex(object):
+    """
+    A linear quadtree over 2D points.
+
+    Points are snapped to a 2^16 x 2^16 grid spanning their bounding square and sorted by the
+    Morton code of their grid cell, so every quadtree cell at every level is a contiguous range
+    of the sorted points. Rectangle queries descend the tree and take whole ranges of cells
+    lying inside the rectangle; cells of a level serve as clusters for aggregated views.
+    """
+
+    def __init__(self, positions: np.ndarray):
+        """
+        Builds the index.
+
+        :param positions: An (n, 2) array of point coordinates
+        :type positions: np.ndarray
+        """
+        self.positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        if len(self.positions):
+            self._low = self.positions.min(axis=0)
+            self.span = max(float((self.positions.max(axis=0) - self._low).max()), 1e-9) * (1 + 1e-9)
+        else:
+            self._low = np.zeros(2)
+            self.span = 1.0
+
+        cells = np.minimum(((self.positions - self._low) / self.span * (1 << BITS)).astype(np.int64),
+                           (1 << BITS) - 1)
+        self._codes = _interleave(cells[:, 0], cells[:, 1])
+        self._order = np.argsort(self._codes, kind="stable")
+        self._sorted_codes = self._codes[self._order]
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def query(self, min_x: float, min_y: float, max_x: float, max_y: float) -> np.ndarray:
+        """
+        Returns the indexes of the points inside a rectangle, borders included.
+
+        :return: Point indexes, in no particular order
+        :rtype: np.ndarray
+        """
+        if len(self) == 0 or min_x > max_x or min_y > max_y:
+            return np.zeros(0, dtype=np.int64)
+
+        ranges: List[Tuple[int, int]] = []
+        partial: List[np.ndarray] = []
+        stack = [(0, 0, 0)]
+        while stack:
+            level, cx, cy = stack.pop()
+            start, end = self._range(level, cx, cy)
+            if start == end:
+                continue
+
+            size = self.span / (1 << level)
+            x0 = self._low[0] + cx * size
+            y0 = self._low[1] + cy * size
+            if x0 > max_x or y0 > max_y or x0 + size < min_x or y0 + size < min_y:
+                continue
+            if min_x <= x0 and x0 + size <= max_x and min_y <= y0 and y0 + size <= max_y:
+                ranges.append((start, end))
+            elif level == BITS or end - start <= LEAF_SIZE:
+                candidates = self._order[start:end]
+                points = self.positions[candidates]
+                inside = ((points[:, 0] >= min_x) & (points[:, 0] <= max_x)
+                          & (points[:, 1] >= min_y) & (points[:, 1] <= max_y))
+                partial.append(candidates[inside])
+            else:
+                for dx in (0, 1):
+                    for dy in (0, 1):
+                        stack.append((level + 1, 2 * cx + dx, 2 * cy + dy))
+
+        parts = [self._order[start:end] for start, end in ranges] + partial
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    def level_for(self, cell_size: float) -> int:
+        """
+        Returns the coarsest level whose cells are not larger than the given size.
+
+        :param cell_size: Cell side length, in the units of the point coordinates
+        :type cell_size: float
+        :return: A level between 0 (one cell) and 16
+        :rtype: int
+        """
+        if cell_size <= 0:
+            return BITS
+        return int(np.clip(np.ceil(np.log2(self.span / cell_size)), 0, BITS))
+
+    def cells(self, indexes: np.ndarray, level: int) -> np.ndarray:
+        """
+        Returns the IDs of the cells containing the given points at a level. IDs are unique per
+        level, and the cells of a level are the clusters of an aggregated view at that level.
+
+        :param indexes: Point indexes
+        :type indexes: np.ndarray
+        :param level: Quadtree level, 0 to 16
+        :type level: int
+        :return: Cell IDs, one per point
+        :rtype: np.ndarray
+        """
+        return self._codes[indexes] >> (2 * (BITS - level))
+
+    def _range(self, level: int, cx: int, cy: int) -> Tuple[int, int]:
+        shift = 2 * (BITS - level)
+        prefix = int(_interleave(np.array([cx]), np.array([cy]))[0])
+        start = np.searchsorted(self._sorted_codes, prefix << shift, side="left")
+        end = np.searchsorted(self._sorted_codes, (prefix + 1) << shift, side="left")
+        return int(start), int(end)
+
+
+def _spread(values: np.ndarray) -> np.ndarray:
+    # inserts a zero bit above every bit of a 16 bit value
+    values = values.astype(np.int64) & 0xFFFF
+    values = (values | (values << 8)) & 0x00FF00FF
+    values = (values | (values << 4)) & 0x0F0F0F0F
+    values = (values | (values << 2)) & 0x33333333
+    values = (values | (values << 1)) & 0x55555555
+    return values
+
+
+def _interleave(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return (_spread(x) << 1) | _spread(y)
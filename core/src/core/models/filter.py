@@ -1,4 +1,5 @@
 from datetime import date, datetime
+from typing import List, Tuple
 
 from core.models.filterOperator import FilterOperator
 
@@ -61,3 +62,13 @@ class Filter():
             operator=FilterOperator(d['operator']),
             value=d['value']
         )
+
+
+def normalize_filters(filters: List[Filter]) -> Tuple[Tuple[str, str, str], ...]:
+    """
+    Turns a filter list into a hashable value that does not depend on the order of the filters,
+    suitable as part of a cache key.
+    """
+    return tuple(sorted(
+        (f.field, str(f.operator), f.value.isoformat() if isinstance(f.value, date) else repr(f.value))
+        for f in filters))
@@ -0,0 +1,102 @@
+import threading
+import time
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from api.components.progress import LoadCancelled, ProgressListener
+
+
+class JobState(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def is_finished(self) -> bool:
+        return self in (JobState.SUCCEEDED, JobState.FAILED, JobState.CANCELLED)
+
+
+class Job(ProgressListener):
+    """
+    A unit of background work on a workspace, e.g. a data source refresh, with its state
+    and progress. Jobs are updated from the thread running them and read from others.
+    """
+
+    def __init__(self, id: str, workspace_id: str, kind: str):
+        self.id = id
+        self.workspace_id = workspace_id
+        self.kind = kind
+        self.state = JobState.PENDING
+        self.done = 0
+        self.total: Optional[int] = None
+        self.message = ""
+        self.error: Optional[str] = None
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    def update(self, done: int, total: Optional[int] = None, message: str = "") -> None:
+        with self._lock:
+            self.done = done
+            self.total = total
+            if message:
+                self.message = message
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def record_stats(self, name: str, stats: Dict[str, Any]) -> None:
+        with self._lock:
+            self.stats[name] = dict(stats)
+
+    def cancel(self) -> bool:
+        """
+        Requests the job to stop. A running job stops at its next progress report.
+
+        :return: False if the job had already finished, otherwise True
+        :rtype: bool
+        """
+        with self._lock:
+            if self.state.is_finished():
+                return False
+            self._cancelled.set()
+            return True
+
+    def raise_if_cancelled(self):
+        """
+        :raises LoadCancelled: If the job was cancelled.
+        """
+        if self.is_cancelled():
+            raise LoadCancelled()
+
+    def start(self):
+        with self._lock:
+            self.state = JobState.RUNNING
+            self.started_at = time.time()
+
+    def finish(self, state: JobState, error: Optional[str] = None):
+        with self._lock:
+            self.state = state
+            self.error = error
+            self.finished_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "id": self.id,
+                "workspace_id": self.workspace_id,
+                "kind": self.kind,
+                "state": self.state.value,
+                "done": self.done,
+                "total": self.total,
+                "message": self.message,
+                "error": self.error,
+                "stats": {name: dict(stats) for name, stats in self.stats.items()},
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
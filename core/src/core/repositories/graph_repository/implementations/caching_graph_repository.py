@@ -0,0 +1,280 @@
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from api.models.columnar_graph import (AnyGraph, ColumnarGraph,
+                                       ColumnarGraphBuilder)
+from api.models.data import DataDict
+from api.models.edge import Edge
+from api.models.graph import Graph
+from api.models.graph_stream import GraphStream
+from api.models.node import Node
+from core.cache.sized_lru_cache import SizedLRUCache
+from core.models.filter import Filter, normalize_filters
+from core.repositories.graph_repository.interfaces.base_graph_repository import \
+    BaseGraphRepository
+
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+DEFAULT_STREAM_BATCH_SIZE = 1000
+
+COUNT_CACHE_MAX_BYTES = 1024 * 1024
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str, str], ...], str, int]
+
+
+class CachingGraphRepository(BaseGraphRepository):
+    """
+    Graph repository decorator that caches query results of another repository.
+
+    Results are cached as immutable ColumnarGraph objects, keyed by graph ID, the normalized
+    filter list, the search term and the version of the graph kept by the wrapped repository,
+    which changes with every write by any process. Graphs of repositories that do not track
+    versions are not cached. Entries are evicted in least recently used order once their
+    estimated size exceeds `max_bytes`. Node counts are cached the same way, in a separate
+    small cache, or taken from a cached graph.
+
+    Versions are read from the wrapped repository on every call, or once per graph inside
+    `pinned_versions`, e.g. for the duration of a web request.
+    """
+
+    def __init__(self, repository: BaseGraphRepository, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        """
+        Initializes the cache around a repository.
+
+        :param repository: Repository whose query results are cached
+        :type repository: BaseGraphRepository
+        :param max_bytes: Upper bound of the estimated size of all cached graphs, 0 disables caching
+        :type max_bytes: int
+        """
+        self.repository = repository
+        self.max_bytes = max_bytes
+
+        self._cache: SizedLRUCache[ColumnarGraph] = SizedLRUCache(max_bytes)
+        self._counts: SizedLRUCache[int] = SizedLRUCache(min(max_bytes, COUNT_CACHE_MAX_BYTES))
+        # versions pinned by the current thread, see `pinned_versions`
+        self._local = threading.local()
+
+    def version(self, id: str) -> Optional[int]:
+        """
+        Returns the version of a graph as kept by the wrapped repository. Inside
+        `pinned_versions` it is read once per graph and then reused.
+
+        :param id: Graph ID
+        :type id: str
+        :return: The current version, or None if the wrapped repository does not track versions
+        :rtype: Optional[int]
+        """
+        pinned: Optional[Dict[str, Optional[int]]] = getattr(self._local, "versions", None)
+        if pinned is None:
+            return self.repository.version(id)
+        if id not in pinned:
+            pinned[id] = self.repository.version(id)
+        return pinned[id]
+
+    @contextmanager
+    def pinned_versions(self) -> Iterator[None]:
+        """
+        Reads the version of each graph at most once in the current thread while the `with`
+        block runs, e.g. once per web request. Writes through this repository are still seen,
+        as they drop the pinned version of the written graph.
+        """
+        previous = getattr(self._local, "versions", None)
+        self._local.versions = {}
+        try:
+            yield
+        finally:
+            self._local.versions = previous
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the cache counters.
+
+        :return: hits, misses, evictions, number of entries, estimated size in bytes and size bound
+        :rtype: Dict[str, int]
+        """
+        return self._cache.stats()
+
+    def save_graph(self, id: str, graph: AnyGraph):
+        self.repository.save_graph(id, graph)
+        self._invalidate(id)
+
+    def save_graph_stream(self, id: str, stream: GraphStream):
+        self.repository.save_graph_stream(id, stream)
+        self._invalidate(id)
+
+    def query_graph(self, id: str, filters: List[Filter], search_term: str = "") -> Graph:
+        # the object graph is mutable, so every caller gets its own copy
+        return self.query_columnar_graph(id, filters, search_term).to_graph()
+
+    def query_columnar_graph(self, id: str, filters: List[Filter], search_term: str = "") -> ColumnarGraph:
+        key = self._key(id, filters, search_term)
+        if key is None:
+            return self.repository.query_columnar_graph(id, filters, search_term)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        graph = self.repository.query_columnar_graph(id, filters, search_term)
+        self._store(key, graph)
+        return graph
+
+    def count_nodes(self, id: str, filters: List[Filter], search_term: str = "") -> int:
+        key = self._key(id, filters, search_term)
+        if key is None:
+            return self.repository.count_nodes(id, filters, search_term)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached.node_count
+        count = self._counts.get(key)
+        if count is not None:
+            return count
+
+        count = self.repository.count_nodes(id, filters, search_term)
+        self._counts.remove_where(lambda counted: counted[0] == key[0] and counted[3] != key[3])
+        self._counts.put(key, count, sys.getsizeof(key) + sys.getsizeof(count))
+        return count
+
+    def stream_graph(self, id: str, filters: List[Filter], search_term: str = "",
+                     batch_size: Optional[int] = None) -> GraphStream:
+        key = self._key(id, filters, search_term)
+        if key is None:
+            return self.repository.stream_graph(id, filters, search_term, batch_size)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return GraphStream.from_graph(cached, batch_size or DEFAULT_STREAM_BATCH_SIZE)
+
+        # a miss is streamed from the repository and collected for the cache on the way,
+        # until it turns out to be too large to be cached
+        stream = self.repository.stream_graph(id, filters, search_term, batch_size)
+        collector = _StreamCollector(stream, self.max_bytes)
+
+        def node_batches() -> Iterator[List[Node]]:
+            for batch in stream.node_batches:
+                collector.add_nodes(batch)
+                yield batch
+
+        def edge_batches() -> Iterator[List[Edge]]:
+            for batch in stream.edge_batches:
+                collector.add_edges(batch)
+                yield batch
+            graph = collector.build()
+            if graph is not None:
+                self._store(key, graph)
+
+        return GraphStream(node_batches(), edge_batches(), directed=stream.directed, root_id=stream.root_id)
+
+    def query_neighborhood(self, id: str, node_id: str, depth: int = 1, limit: int = 100,
+                           outgoing_only: bool = False) -> ColumnarGraph:
+        # neighborhoods are small and many, a bounded query is cheaper than caching them
+        return self.repository.query_neighborhood(id, node_id, depth, limit, outgoing_only)
+
+    def delete_graph(self, id: str):
+        self.repository.delete_graph(id)
+        self._invalidate(id)
+
+    def clear_graph(self, id: str):
+        self.repository.clear_graph(id)
+        self._invalidate(id)
+
+    def get_node(self, id: str, node_id: str) -> Optional[Node]:
+        return self.repository.get_node(id, node_id)
+
+    def upsert_node(self, id: str, node: Node):
+        self.repository.upsert_node(id, node)
+        self._invalidate(id)
+
+    def delete_node(self, id: str, node_id: str) -> bool:
+        deleted = self.repository.delete_node(id, node_id)
+        self._invalidate(id)
+        return deleted
+
+    def get_edge(self, id: str, src_id: str, target_id: str) -> Optional[Edge]:
+        return self.repository.get_edge(id, src_id, target_id)
+
+    def upsert_edge(self, id: str, edge: Edge):
+        self.repository.upsert_edge(id, edge)
+        self._invalidate(id)
+
+    def delete_edge(self, id: str, src_id: str, target_id: str) -> bool:
+        deleted = self.repository.delete_edge(id, src_id, target_id)
+        self._invalidate(id)
+        return deleted
+
+    def get_layout(self, id: str) -> Dict[str, Tuple[float, float]]:
+        return self.repository.get_layout(id)
+
+    def save_layout(self, id: str, positions: Dict[str, Tuple[float, float]]):
+        # positions are not part of query results, so cached graphs stay valid
+        self.repository.save_layout(id, positions)
+
+    def close(self):
+        self.repository.close()
+
+    def _key(self, id: str, filters: List[Filter], search_term: str) -> Optional[CacheKey]:
+        if self.max_bytes == 0:
+            return None
+        version = self.version(id)
+        if version is None:
+            return None
+        return id, normalize_filters(filters), search_term, version
+
+    def _store(self, key: CacheKey, graph: ColumnarGraph):
+        # results of older versions, e.g. written by other processes, are never read again
+        self._cache.remove_where(lambda cached: cached[0] == key[0] and cached[3] != key[3])
+        self._cache.put(key, graph, graph.memory_size())
+
+    def _invalidate(self, id: str):
+        pinned: Optional[Dict[str, Optional[int]]] = getattr(self._local, "versions", None)
+        if pinned is not None:
+            pinned.pop(id, None)
+        self._cache.remove_where(lambda key: key[0] == id)
+        self._counts.remove_where(lambda key: key[0] == id)
+
+
+class _StreamCollector():
+    """
+    Collects a streamed graph into a ColumnarGraph while its estimated size stays within a
+    bound, and gives up once it exceeds it.
+    """
+
+    def __init__(self, stream: GraphStream, max_bytes: int):
+        self._builder: Optional[ColumnarGraphBuilder] = ColumnarGraphBuilder(
+            directed=stream.directed, root_id=stream.root_id)
+        self._max_bytes = max_bytes
+        self._size = 0
+
+    def add_nodes(self, nodes: List[Node]):
+        if self._builder is None:
+            return
+        for node in nodes:
+            data = node.data
+            self._builder.add_node(node.id, data)
+            self._size += sys.getsizeof(node.id) + _data_size(data)
+        self._check_size()
+
+    def add_edges(self, edges: List[Edge]):
+        if self._builder is None:
+            return
+        for edge in edges:
+            data = edge.data
+            self._builder.add_edge(edge.src.id, edge.target.id, data)
+            self._size += _data_size(data)
+        self._check_size()
+
+    def build(self) -> Optional[ColumnarGraph]:
+        """
+        Returns the collected graph, or None if it grew too large.
+        """
+        return self._builder.build() if self._builder is not None else None
+
+    def _check_size(self):
+        if self._size > self._max_bytes:
+            self._builder = None
+
+
+def _data_size(data: DataDict) -> int:
+    # the row index of each element plus the values it references, as in ColumnarGraph.memory_size
+    return 16 + sum(8 + sys.getsizeof(value) for value in data.values() if value is not None)
+
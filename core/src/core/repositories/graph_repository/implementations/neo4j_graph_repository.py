@@ -1,16 +1,56 @@
+import hashlib
+import json
+import re
+import uuid
 from datetime import datetime, time
-from typing import Any, Dict, List, Optional, Tuple, cast
+from typing import (Any, Callable, Dict, Iterator, List, Optional, Sequence,
+                    Tuple, Union, cast)
 
 from neo4j.time import Date as Neo4jDate
 from neo4j.time import DateTime as Neo4jDateTime
 
+from api.components.progress import report_progress
+from api.models.columnar_graph import (AnyGraph, ColumnarGraph,
+                                       ColumnarGraphBuilder)
+from api.models.data import DataDict
 from api.models.edge import Edge
 from api.models.graph import Graph
+from api.models.graph_stream import GraphStream
 from api.models.node import Node
 from core.models.filter import Filter
 from core.repositories.graph_repository.interfaces.base_graph_repository import \
     BaseGraphRepository
-from neo4j import GraphDatabase, ManagedTransaction, Query, Result
+from neo4j import (GraphDatabase, ManagedTransaction, Query, Result, Session,
+                   Transaction)
+
+DEFAULT_BATCH_SIZE = 1000
+
+CONTENT_HASH_KEY = "_content_hash"
+"""Property under which the hash of a node's or edge's data is stored, used to diff saves."""
+
+SEARCH_TEXT_KEY = "_search_text"
+"""Property holding the searchable text of a node, covered by the full-text index."""
+
+FULLTEXT_INDEX_NAME = "node_search_index"
+
+LUCENE_SPECIAL_CHARACTERS = re.compile(r'[+\-&|!(){}\[\]^"~*?:\\/]')
+
+LOAD_TOKEN_KEY = "_load_token"
+"""Property stamped on every element written by a save, elements with another token were not saved and are deleted."""
+
+POSITION_X_KEY = "_x"
+POSITION_Y_KEY = "_y"
+"""Properties holding the precomputed layout position of a node."""
+
+VERSION_KEY = "version"
+"""Property of a graph's GraphMeta node counting the writes to the graph, bumped by every write transaction."""
+
+MAX_NEIGHBORHOOD_DEPTH = 3
+"""Variable-length matches grow quickly with their depth, deeper requests are clamped."""
+
+NODE_INTERNAL_KEYS = ("id", "graph_id", CONTENT_HASH_KEY, SEARCH_TEXT_KEY, POSITION_X_KEY, POSITION_Y_KEY,
+                      LOAD_TOKEN_KEY)
+EDGE_INTERNAL_KEYS = ("graph_id", CONTENT_HASH_KEY, LOAD_TOKEN_KEY)
 
 
 class Neo4JGraphRepository(BaseGraphRepository):
@@ -18,7 +58,7 @@ class Neo4JGraphRepository(BaseGraphRepository):
     Class responsible for storing and retrieving graph data from a Neo4j database.
     """
 
-    def __init__(self, uri: str, user: str, password: str):
+    def __init__(self, uri: str, user: str, password: str, batch_size: int = DEFAULT_BATCH_SIZE):
         """
         Initializes the GraphRepository with database connection parameters.
 
@@ -28,8 +68,13 @@ class Neo4JGraphRepository(BaseGraphRepository):
         :type user: str
         :param password: Database password
         :type password: str
+        :param batch_size: Maximum number of nodes or edges sent in a single write statement
+        :type batch_size: int
         """
+        if batch_size < 1:
+            raise ValueError("Batch size must be a positive integer")
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        self.batch_size = batch_size
         self._initialize_schema()
 
     def _initialize_schema(self):
@@ -47,6 +92,16 @@ class Neo4JGraphRepository(BaseGraphRepository):
             CREATE INDEX rel_graph_index IF NOT EXISTS
             FOR ()-[r:inRelationTo]-() ON (r.graph_id)
             """)
+            # Create metadata index, read on every request for the graph version
+            session.run("""
+            CREATE INDEX graph_meta_index IF NOT EXISTS
+            FOR (meta:GraphMeta) ON (meta.graph_id)
+            """)
+            # Create full-text index used by search
+            session.run(f"""
+            CREATE FULLTEXT INDEX {FULLTEXT_INDEX_NAME} IF NOT EXISTS
+            FOR (n:Node) ON EACH [n.{SEARCH_TEXT_KEY}]
+            """)
 
     def close(self):
         """
@@ -54,17 +109,36 @@ class Neo4JGraphRepository(BaseGraphRepository):
         """
         self.driver.close()
 
-    def save_graph(self, id: str, graph: Graph):
+    def save_graph(self, id: str, graph: AnyGraph):
         """
         Saves a graph to the database with the given ID.
 
         :param id: Unique identifier for the graph
         :type id: str
-        :param graph: Graph object to be saved
-        :type graph: Graph
+        :param graph: Graph or ColumnarGraph object to be saved
+        :type graph: AnyGraph
         """
         with self.driver.session() as session:
-            session.execute_write(self._save_graph, id, graph)
+            session.execute_write(self._save_graph, id, graph, self.batch_size)
+
+    def save_graph_stream(self, id: str, stream: GraphStream):
+        """
+        Saves a graph delivered as a stream to the database with the given ID, writing each
+        batch as it arrives. The graph is replaced in a single transaction, so readers see
+        either the old or the new graph.
+
+        Unlike `save_graph`, the write is not retried on transient errors, as the stream can
+        be consumed only once.
+
+        :param id: Unique identifier for the graph
+        :type id: str
+        :param stream: Stream over the graph to be saved, consumed by the call
+        :type stream: GraphStream
+        """
+        with self.driver.session() as session:
+            with session.begin_transaction() as tx:
+                self._save_stream(tx, id, stream, self.batch_size)
+                tx.commit()
 
     def query_graph(self, id: str, filters: List[Filter], search_term: str = "") -> Graph:
         """
@@ -72,39 +146,249 @@ class Neo4JGraphRepository(BaseGraphRepository):
 
         :param id: Unique identifier of the graph to retrieve
         :type id: str
-        :param filters: List of filters to apply (currently unused)
+        :param filters: List of filters to apply
         :type filters: list
+        :param search_term: Optional search string
+        :type search_term: str
         :return: Retrieved Graph object
         :rtype: Graph
         """
+        return self.query_columnar_graph(id, filters, search_term).to_graph()
 
-        metadata_query = """
-        MATCH (meta:GraphMeta {graph_id: $graph_id})
-        RETURN meta
+    def query_columnar_graph(self, id: str, filters: List[Filter], search_term: str = "") -> ColumnarGraph:
+        """
+        Retrieves a graph from the database by its ID as an immutable columnar graph,
+        optionally applying filters.
+
+        :param id: Unique identifier of the graph to retrieve
+        :type id: str
+        :param filters: List of filters to apply
+        :type filters: list
+        :param search_term: Optional search string
+        :type search_term: str
+        :return: Retrieved ColumnarGraph object
+        :rtype: ColumnarGraph
         """
+        node_query, edge_query, params = self._build_graph_queries(id, filters, search_term)
 
-        graph_query = """
-        MATCH (n:Node {graph_id: $graph_id})
-        {n_where_clause}
-        OPTIONAL MATCH (n)-[r:inRelationTo {graph_id: $graph_id}]->(m:Node {graph_id: $graph_id})
-        {m_where_clause}
-        RETURN n, r, m
+        with self.driver.session() as session:
+            directed, root_id = self._read_metadata(session, id)
+            builder = ColumnarGraphBuilder(directed=directed, root_id=root_id)
+            records = session.run(cast(Query, node_query), **params)
+            if "search_query" in params:
+                # the edge query looks up the edges between the matched nodes by their IDs
+                records = list(records)
+                params["ids"] = [record["n"]["id"] for record in records]
+            self._parse_nodes(builder, records)
+            self._parse_edges(builder, session.run(cast(Query, edge_query), **params))
+            return builder.build()
+
+    def stream_graph(self, id: str, filters: List[Filter], search_term: str = "",
+                     batch_size: Optional[int] = None) -> GraphStream:
         """
+        Retrieves a graph as a stream of node batches followed by edge batches.
+
+        Metadata is read immediately; nodes and edges are read lazily, each through its own
+        query, as the stream is consumed, so at most one batch is held in memory at a time.
+
+        :param id: Unique identifier of the graph to retrieve
+        :type id: str
+        :param filters: List of filters to apply
+        :type filters: list
+        :param search_term: Optional search string
+        :type search_term: str
+        :param batch_size: Maximum number of nodes or edges in a batch, defaults to the
+                           repository batch size
+        :type batch_size: Optional[int]
+        :return: A stream over the retrieved graph
+        :rtype: GraphStream
+        """
+        batch_size = batch_size or self.batch_size
+        node_query, edge_query, params = self._build_graph_queries(id, filters, search_term)
 
         with self.driver.session() as session:
-            result = session.run(metadata_query, graph_id=id)
-            directed, root_id = self._parse_metadata(result)
-
-            n_where_clause, params = self._build_where_clause(
-                filters, search_term, "n")
-            m_where_clause, params = self._build_where_clause(
-                filters, search_term, "m")
-            query = cast(Query, graph_query
-                         .replace("{n_where_clause}", n_where_clause)
-                         .replace("{m_where_clause}", m_where_clause)
-                         )
-            result = session.run(query, graph_id=id, **params)
-            return self._parse_graph(result, directed, root_id)
+            directed, root_id = self._read_metadata(session, id)
+
+        if "search_query" in params:
+            edges = self._stream_matched_edges(id, filters, search_term, edge_query, params, batch_size)
+        else:
+            edges = self._stream_records(edge_query, params, _parse_streamed_edge, batch_size)
+        return GraphStream(
+            self._stream_records(node_query, params, lambda record: _parse_node(record["n"]), batch_size),
+            edges, directed=directed, root_id=root_id)
+
+    def count_nodes(self, id: str, filters: List[Filter], search_term: str = "") -> int:
+        """
+        Counts the nodes of a graph matching the filters and the search, without reading them.
+
+        :param id: Unique identifier of the graph
+        :type id: str
+        :param filters: List of filters to apply
+        :type filters: list
+        :param search_term: Optional search string
+        :type search_term: str
+        :return: Number of matching nodes
+        :rtype: int
+        """
+        match_clause, params = self._build_node_match(filters, search_term)
+        with self.driver.session() as session:
+            record = session.run(cast(Query, match_clause + """
+            RETURN count(n) AS count
+            """), graph_id=id, **params).single()
+            return record["count"] if record else 0
+
+    def query_neighborhood(self, id: str, node_id: str, depth: int = 1, limit: int = 100,
+                           outgoing_only: bool = False) -> ColumnarGraph:
+        """
+        Retrieves the neighborhood of a node with a bounded variable-length match, without
+        reading the rest of the graph.
+
+        When more than `limit` nodes are within `depth` edges, an arbitrary `limit` of them are
+        returned, not necessarily the closest ones.
+
+        :param id: Unique identifier of the graph
+        :type id: str
+        :param node_id: ID of the node in the centre of the neighborhood
+        :type node_id: str
+        :param depth: Maximum number of edges between the node and its neighbours, clamped to
+                      `MAX_NEIGHBORHOOD_DEPTH`
+        :type depth: int
+        :param limit: Maximum number of neighbours
+        :type limit: int
+        :param outgoing_only: Follow only outgoing edges
+        :type outgoing_only: bool
+        :return: The node, its neighbours and the edges between them, empty if the node does
+                 not exist
+        :rtype: ColumnarGraph
+        """
+        depth = max(1, min(depth, MAX_NEIGHBORHOOD_DEPTH))
+        arrow = "->" if outgoing_only else "-"
+        # the depth cannot be a parameter, it is an integer inlined into the pattern
+        node_query = f"""
+        MATCH (start:Node {{graph_id: $graph_id, id: $node_id}})
+        CALL {{
+            WITH start
+            MATCH (start)-[:inRelationTo*1..{depth}]{arrow}(m:Node)
+            WHERE m <> start
+            WITH DISTINCT m
+            LIMIT $limit
+            RETURN collect(m) AS found
+        }}
+        UNWIND [start] + found AS n
+        RETURN properties(n) AS n
+        """
+        edge_query = """
+        UNWIND $ids AS node_id
+        MATCH (n:Node {graph_id: $graph_id, id: node_id})-[r:inRelationTo]->(m:Node)
+        WHERE m.id IN $ids
+        RETURN n.id AS src, m.id AS tgt, properties(r) AS r
+        """
+
+        with self.driver.session() as session:
+            directed, root_id = self._read_metadata(session, id)
+            builder = ColumnarGraphBuilder(directed=directed, root_id=root_id)
+            records = list(session.run(cast(Query, node_query), graph_id=id, node_id=node_id, limit=limit))
+            if not records:
+                return builder.build()
+            self._parse_nodes(builder, records)
+            ids = [record["n"]["id"] for record in records]
+            self._parse_edges(builder, session.run(cast(Query, edge_query), graph_id=id, ids=ids))
+            return builder.build()
+
+    def _build_graph_queries(self, id: str, filters: List[Filter], search_term: str) -> Tuple[str, str, Dict[str, Any]]:
+        """
+        Builds the two read queries of a graph and their parameters.
+
+        The node query returns the properties of every matching node once. The edge query
+        returns only the IDs of the endpoints and the properties of the relationship,
+        so node properties are never repeated per edge.
+        """
+        match_clause, params = self._build_node_match(filters, search_term)
+        if "search_query" in params:
+            # matches come ranked from the full-text index; edges are kept when both ends match
+            node_query = match_clause + """
+            RETURN properties(n) AS n
+            ORDER BY score DESC
+            """
+            # run with the IDs of the matched nodes as `ids`; looking up the targets in a
+            # parameter is a set lookup, where a collected list of nodes is scanned per edge
+            edge_query = """
+            UNWIND $ids AS node_id
+            MATCH (n:Node {graph_id: $graph_id, id: node_id})
+                  -[r:inRelationTo {graph_id: $graph_id}]->(m:Node {graph_id: $graph_id})
+            WHERE m.id IN $ids
+            RETURN n.id AS src, m.id AS tgt, properties(r) AS r
+            """
+        else:
+            m_filter_clause, _ = self._build_filter_clause(filters, "m")
+            m_where_clause = "WHERE " + m_filter_clause if m_filter_clause else ""
+            node_query = match_clause + """
+            RETURN properties(n) AS n
+            """
+            edge_query = match_clause + f"""
+            MATCH (n)-[r:inRelationTo {{graph_id: $graph_id}}]->(m:Node {{graph_id: $graph_id}})
+            {m_where_clause}
+            RETURN n.id AS src, m.id AS tgt, properties(r) AS r
+            """
+        params["graph_id"] = id
+        return node_query, edge_query, params
+
+    def _build_node_match(self, filters: List[Filter], search_term: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Builds the clause matching the nodes of a graph, as `n`, that pass the filters and the
+        search, and its parameters without the graph ID.
+        """
+        n_filter_clause, params = self._build_filter_clause(filters, "n")
+        search_query = _fulltext_query(search_term) if search_term else ""
+
+        if search_query:
+            params.update({"fulltext_index": FULLTEXT_INDEX_NAME, "search_query": search_query})
+            return f"""
+            CALL db.index.fulltext.queryNodes($fulltext_index, $search_query) YIELD node AS n, score
+            WHERE n.graph_id = $graph_id {"AND " + n_filter_clause if n_filter_clause else ""}
+            """, params
+
+        n_where_clause = "WHERE " + n_filter_clause if n_filter_clause else ""
+        return f"""
+            MATCH (n:Node {{graph_id: $graph_id}})
+            {n_where_clause}
+            """, params
+
+    def _read_metadata(self, session: Session, id: str) -> Tuple[bool, Optional[str]]:
+        result = session.run("""
+        MATCH (meta:GraphMeta {graph_id: $graph_id})
+        RETURN meta
+        """, graph_id=id)
+        return self._parse_metadata(result)
+
+    def _stream_records(self, query: str, params: Dict[str, Any],
+                        parse: Callable[[Any], Any], batch_size: int) -> Iterator[List[Any]]:
+        """
+        Runs a read query when first iterated and yields its parsed records in batches.
+        The session stays open until the generator is exhausted or closed.
+        """
+        with self.driver.session() as session:
+            batch = []
+            for record in session.run(cast(Query, query), **params):
+                batch.append(parse(record))
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+    def _stream_matched_edges(self, id: str, filters: List[Filter], search_term: str, edge_query: str,
+                              params: Dict[str, Any], batch_size: int) -> Iterator[List[Any]]:
+        """
+        Reads the IDs of the nodes matching a search when first iterated, then yields the edges
+        between them in batches.
+        """
+        match_clause, _ = self._build_node_match(filters, search_term)
+        with self.driver.session() as session:
+            ids = [record["id"] for record in session.run(cast(Query, match_clause + """
+            RETURN n.id AS id
+            """), **params)]
+        yield from self._stream_records(edge_query, {**params, "ids": ids}, _parse_streamed_edge, batch_size)
 
     def delete_graph(self, id: str):
         """
@@ -116,48 +400,246 @@ class Neo4JGraphRepository(BaseGraphRepository):
         with self.driver.session() as session:
             session.execute_write(self._delete_graph, id)
 
+    def clear_graph(self, id: str):
+        """
+        Removes all nodes and edges of a graph, keeping its metadata.
+
+        :param id: Unique identifier of the graph to clear
+        :type id: str
+        """
+        with self.driver.session() as session:
+            session.execute_write(self._clear_graph, id)
+
+    def get_node(self, id: str, node_id: str) -> Optional[Node]:
+        """
+        Retrieves a single node of a graph.
+
+        :param id: Unique identifier of the graph
+        :type id: str
+        :param node_id: ID of the node to retrieve
+        :type node_id: str
+        :return: The node without its edges, or None if it does not exist
+        :rtype: Optional[Node]
+        """
+        with self.driver.session() as session:
+            record = session.run("""
+                MATCH (n:Node {id: $node_id, graph_id: $graph_id})
+                RETURN n
+            """, node_id=node_id, graph_id=id).single()
+            return _parse_node(record["n"]) if record else None
+
+    def upsert_node(self, id: str, node: Node):
+        """
+        Creates a node or replaces the data of an existing node with the same ID.
+
+        :param id: Unique identifier of the graph
+        :type id: str
+        :param node: Node to save
+        :type node: Node
+        """
+        with self.driver.session() as session:
+            session.execute_write(self._upsert_node, id, node)
+
+    def delete_node(self, id: str, node_id: str) -> bool:
+        """
+        Deletes a node and all of its edges.
+
+        :param id: Unique identifier of the graph
+        :type id: str
+        :param node_id: ID of the node to delete
+        :type node_id: str
+        :return: True if the node existed, otherwise False
+        :rtype: bool
+        """
+        with self.driver.session() as session:
+            return session.execute_write(self._delete_node, id, node_id)
+
+    def get_edge(self, id: str, src_id: str, target_id: str) -> Optional[Edge]:
+        """
+        Retrieves the edge between two nodes of a graph.
+
+        :param id: Unique identifier of the graph
+        :type id: str
+        :param src_id: ID of the source node
+        :type src_id: str
+        :param target_id: ID of the target node
+        :type target_id: str
+        :return: The edge, or None if it does not exist
+        :rtype: Optional[Edge]
+        """
+        with self.driver.session() as session:
+            record = session.run("""
+                MATCH (a:Node {id: $src_id, graph_id: $graph_id})
+                      -[r:inRelationTo {graph_id: $graph_id}]->
+                      (b:Node {id: $target_id, graph_id: $graph_id})
+                RETURN a, r, b
+            """, src_id=src_id, target_id=target_id, graph_id=id).single()
+            if not record:
+                return None
+            return Edge(data=_parse_edge_data(record["r"]),
+                        src=_parse_node(record["a"]), target=_parse_node(record["b"]))
+
+    def upsert_edge(self, id: str, edge: Edge):
+        """
+        Creates an edge or replaces the data of the existing edge between the same nodes.
+        For undirected graphs the reverse edge is written as well.
+
+        :param id: Unique identifier of the graph
+        :type id: str
+        :param edge: Edge to save. Both of its nodes must already exist.
+        :type edge: Edge
+        """
+        with self.driver.session() as session:
+            session.execute_write(self._upsert_edge, id, edge)
+
+    def delete_edge(self, id: str, src_id: str, target_id: str) -> bool:
+        """
+        Deletes the edge between two nodes.
+        For undirected graphs the reverse edge is deleted as well.
+
+        :param id: Unique identifier of the graph
+        :type id: str
+        :param src_id: ID of the source node
+        :type src_id: str
+        :param target_id: ID of the target node
+        :type target_id: str
+        :return: True if the edge existed, otherwise False
+        :rtype: bool
+        """
+        with self.driver.session() as session:
+            return session.execute_write(self._delete_edge, id, src_id, target_id)
+
+    def version(self, id: str) -> Optional[int]:
+        """
+        Retrieves the version of a graph, a counter stored in its metadata and incremented in
+        the same transaction as every write to the graph, by any process.
+
+        :param id: Unique identifier of the graph
+        :type id: str
+        :return: The current version, 0 if the graph was never written
+        :rtype: Optional[int]
+        """
+        with self.driver.session() as session:
+            record = session.run(f"""
+                MATCH (meta:GraphMeta {{graph_id: $graph_id}})
+                RETURN meta.{VERSION_KEY} AS version
+            """, graph_id=id).single()
+            return (record["version"] or 0) if record else 0
+
+    def get_layout(self, id: str) -> Dict[str, Tuple[float, float]]:
+        """
+        Retrieves the stored node positions of a graph.
+
+        :param id: Unique identifier of the graph
+        :type id: str
+        :return: Positions by node ID
+        :rtype: Dict[str, Tuple[float, float]]
+        """
+        with self.driver.session() as session:
+            result = session.run(f"""
+            MATCH (n:Node {{graph_id: $graph_id}})
+            WHERE n.{POSITION_X_KEY} IS NOT NULL AND n.{POSITION_Y_KEY} IS NOT NULL
+            RETURN n.id AS id, n.{POSITION_X_KEY} AS x, n.{POSITION_Y_KEY} AS y
+            """, graph_id=id)
+            return {record["id"]: (record["x"], record["y"]) for record in result}
+
+    def save_layout(self, id: str, positions: Dict[str, Tuple[float, float]]):
+        """
+        Stores node positions on the nodes of a graph.
+
+        :param id: Unique identifier of the graph
+        :type id: str
+        :param positions: Positions by node ID
+        :type positions: Dict[str, Tuple[float, float]]
+        """
+        rows = [{"id": node_id, "x": float(x), "y": float(y)} for node_id, (x, y) in positions.items()]
+        with self.driver.session() as session:
+            session.execute_write(self._save_layout, id, rows, self.batch_size)
+
     @staticmethod
-    def _save_graph(tx: ManagedTransaction, graph_id: str, graph: Graph):
+    def _save_graph(tx: ManagedTransaction, graph_id: str, graph: AnyGraph, batch_size: int = DEFAULT_BATCH_SIZE):
+        Neo4JGraphRepository._save_stream(tx, graph_id, GraphStream.from_graph(graph, batch_size), batch_size)
+
+    @staticmethod
+    def _save_stream(tx: Union[Transaction, ManagedTransaction], graph_id: str, stream: GraphStream,
+                     batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Writes only the difference between the streamed graph and the stored one, batch by batch.
+
+        Nodes are matched by ID and edges by their (source, target) pair. Each stored element
+        carries a hash of its data, which the database compares with the hash of the streamed
+        element, so unchanged elements keep their properties. Every streamed element is stamped
+        with a token of this save; stored elements the stream did not contain keep an older token
+        and are deleted at the end. The diff runs in the database, so only one batch is held in
+        memory at a time.
+        """
+        token = uuid.uuid4().hex
+
         # 1. Save graph metadata
-        tx.run("""
-            MERGE (meta:GraphMeta {graph_id: $graph_id})
+        tx.run(f"""
+            MERGE (meta:GraphMeta {{graph_id: $graph_id}})
             SET meta.directed = $directed,
                 meta.root_id = $root_id,
-                meta.updated_at = datetime()
-        """, graph_id=graph_id, directed=graph.directed, root_id=graph.root_id)
-
-        node_ids = [node.id for node in graph.nodes]
-
-        # 2. Delete nodes not in the current list
-        tx.run("""
-            MATCH (n:Node {graph_id: $graph_id})
-            WHERE NOT n.id IN $node_ids
+                meta.updated_at = datetime(),
+                meta.{VERSION_KEY} = coalesce(meta.{VERSION_KEY}, 0) + 1
+        """, graph_id=graph_id, directed=stream.directed, root_id=stream.root_id)
+
+        # 2. Upsert added and changed nodes, stamp all streamed ones
+        # nodes saved before search text existed are rewritten
+        node_count = 0
+        for batch in stream.node_batches:
+            for rows in _chunks([_node_row(graph_id, node) for node in batch], batch_size):
+                tx.run(f"""
+                    UNWIND $rows AS row
+                    MERGE (n:Node {{id: row.id, graph_id: $graph_id}})
+                    WITH n, row
+                    FOREACH (changed IN CASE WHEN n.{CONTENT_HASH_KEY} = row.props.{CONTENT_HASH_KEY}
+                                            AND n.{SEARCH_TEXT_KEY} IS NOT NULL THEN [] ELSE [1] END |
+                        SET n = row.props)
+                    SET n.{LOAD_TOKEN_KEY} = $token
+                """, rows=rows, graph_id=graph_id, token=token)
+            node_count += len(batch)
+            report_progress(node_count, message="Saving nodes")
+
+        # 3. Upsert added and changed edges, stamp all streamed ones
+        edge_count = 0
+        for batch in stream.edge_batches:
+            for rows in _chunks([_edge_row(graph_id, edge) for edge in batch], batch_size):
+                tx.run(f"""
+                    UNWIND $rows AS row
+                    MATCH (a:Node {{id: row.from_id, graph_id: $graph_id}}),
+                          (b:Node {{id: row.to_id, graph_id: $graph_id}})
+                    MERGE (a)-[r:inRelationTo {{graph_id: $graph_id}}]->(b)
+                    WITH r, row
+                    FOREACH (changed IN CASE WHEN r.{CONTENT_HASH_KEY} = row.props.{CONTENT_HASH_KEY} THEN [] ELSE [1] END |
+                        SET r = row.props)
+                    SET r.{LOAD_TOKEN_KEY} = $token
+                """, rows=rows, graph_id=graph_id, token=token)
+            edge_count += len(batch)
+            report_progress(edge_count, message="Saving edges")
+
+        # 4. Delete nodes the stream did not contain, together with their edges
+        tx.run(f"""
+            MATCH (n:Node {{graph_id: $graph_id}})
+            WHERE n.{LOAD_TOKEN_KEY} IS NULL OR n.{LOAD_TOKEN_KEY} <> $token
             DETACH DELETE n
-        """, graph_id=graph_id, node_ids=node_ids)
-
-        # 3. Upsert nodes
-        for node in graph.nodes:
-            tx.run("""
-                MERGE (n:Node {id: $id, graph_id: $graph_id})
-                SET n = $props
-            """, id=node.id, graph_id=graph_id, props={**node.data, "id": node.id, "graph_id": graph_id})
+        """, graph_id=graph_id, token=token)
 
-        # 4. Delete all edges for this graph (simpler and safer than trying to diff)
-        tx.run("""
-            MATCH (:Node {graph_id: $graph_id})-[r]->(:Node {graph_id: $graph_id})
+        # 5. Delete edges the stream did not contain between remaining nodes
+        tx.run(f"""
+            MATCH (:Node {{graph_id: $graph_id}})-[r:inRelationTo {{graph_id: $graph_id}}]->(:Node {{graph_id: $graph_id}})
+            WHERE r.{LOAD_TOKEN_KEY} IS NULL OR r.{LOAD_TOKEN_KEY} <> $token
             DELETE r
-        """, graph_id=graph_id)
+        """, graph_id=graph_id, token=token)
 
-        # 5. Recreate all edges
-        for edge in graph.edges:
-            query = f"""
-                MATCH (a:Node {{id: $from_id, graph_id: $graph_id}}),
-                      (b:Node {{id: $to_id, graph_id: $graph_id}})
-                MERGE (a)-[r:inRelationTo {{graph_id: $graph_id}}]->(b)
-                SET r += $data
-            """
-            tx.run(query, from_id=edge.src.id, to_id=edge.target.id,
-                   graph_id=graph_id, data=edge.data)
+    @staticmethod
+    def _save_layout(tx: ManagedTransaction, graph_id: str, rows: List[Dict[str, Any]], batch_size: int):
+        for chunk in _chunks(rows, batch_size):
+            tx.run(f"""
+                UNWIND $rows AS row
+                MATCH (n:Node {{id: row.id, graph_id: $graph_id}})
+                SET n.{POSITION_X_KEY} = row.x, n.{POSITION_Y_KEY} = row.y
+            """, rows=chunk, graph_id=graph_id)
 
     @staticmethod
     def _parse_metadata(result: Result) -> Tuple[bool, Optional[str]]:
@@ -170,38 +652,15 @@ class Neo4JGraphRepository(BaseGraphRepository):
         return True, None
 
     @staticmethod
-    def _parse_graph(result: Result, directed: bool = True, root_id: Optional[str] = None) -> Graph:
-        node_map: Dict[str, Node] = {}
-        edges = set()
-
+    def _parse_nodes(builder: ColumnarGraphBuilder, result: Result):
         for record in result:
             n_data = record["n"]
-            m_data = record["m"]
-            r_data = record["r"]
-
-            # Node n
-            n_id = n_data["id"]
-            if n_id not in node_map:
-                node_map[n_id] = Node(
-                    id=n_id, data={k: _parse_value(v) for k, v in n_data.items() if k != "id" and k != "graph_id"})
-            n_node = node_map[n_id]
-
-            # Node m
-            if m_data:
-                m_id = m_data["id"]
-                if m_id not in node_map:
-                    node_map[m_id] = Node(
-                        id=m_id, data={k: _parse_value(v) for k, v in m_data.items() if k != "id" and k != "graph_id"})
-                m_node = node_map[m_id]
-
-            # Edge
-            if r_data:
-                edge_data = {k: _parse_value(v) for k, v in r_data.items() if k !=
-                             "graph_id"}
-                edge = Edge(data=edge_data, src=n_node, target=m_node)
-                edges.add(edge)
-
-        return Graph(nodes=set(node_map.values()), edges=edges, directed=directed, root_id=root_id)
+            builder.add_node(n_data["id"], _parse_node_data(n_data))
+
+    @staticmethod
+    def _parse_edges(builder: ColumnarGraphBuilder, result: Result):
+        for record in result:
+            builder.add_edge(record["src"], record["tgt"], _parse_edge_data(record["r"]))
 
     @staticmethod
     def _delete_graph(tx: ManagedTransaction, graph_id: str):
@@ -217,22 +676,76 @@ class Neo4JGraphRepository(BaseGraphRepository):
             DELETE n
         """, graph_id=graph_id)
 
-        # Delete graph metadata
+        # Delete graph metadata, keeping only the version so that it never repeats
+        tx.run(f"""
+            MATCH (meta:GraphMeta {{graph_id: $graph_id}})
+            SET meta = {{graph_id: $graph_id, {VERSION_KEY}: coalesce(meta.{VERSION_KEY}, 0) + 1}}
+        """, graph_id=graph_id)
+
+    @staticmethod
+    def _clear_graph(tx: ManagedTransaction, graph_id: str):
         tx.run("""
-            MATCH (meta:GraphMeta {graph_id: $graph_id})
-            DELETE meta
+            MATCH (n:Node {graph_id: $graph_id})
+            DETACH DELETE n
         """, graph_id=graph_id)
+        Neo4JGraphRepository._bump_version(tx, graph_id)
 
-    def _build_where_clause(self, filters: List[Filter], search_term: Optional[str], node_name: str) -> Tuple[str, Dict]:
-        filter_clause, params = self._build_filter_clause(filters, node_name)
-        clauses = [filter_clause]
-        if search_term:
-            search_clause, search_params = self._build_search_clause(
-                search_term, node_name)
-            clauses.append(search_clause)
-            params.update(search_params)
-        clause_str = " AND ".join([c for c in clauses if c.strip()])
-        return "WHERE " + clause_str if clause_str else "", params
+    @staticmethod
+    def _upsert_node(tx: ManagedTransaction, graph_id: str, node: Node):
+        row = _node_row(graph_id, node)
+        tx.run("""
+            MERGE (n:Node {id: $id, graph_id: $graph_id})
+            SET n = $props
+        """, id=row["id"], props=row["props"], graph_id=graph_id)
+        Neo4JGraphRepository._bump_version(tx, graph_id)
+
+    @staticmethod
+    def _delete_node(tx: ManagedTransaction, graph_id: str, node_id: str) -> bool:
+        record = tx.run("""
+            MATCH (n:Node {id: $node_id, graph_id: $graph_id})
+            DETACH DELETE n
+            RETURN count(*) AS deleted
+        """, node_id=node_id, graph_id=graph_id).single()
+        Neo4JGraphRepository._bump_version(tx, graph_id)
+        return bool(record and record["deleted"])
+
+    @staticmethod
+    def _upsert_edge(tx: ManagedTransaction, graph_id: str, edge: Edge):
+        row = _edge_row(graph_id, edge)
+        tx.run("""
+            MATCH (a:Node {id: $from_id, graph_id: $graph_id}),
+                  (b:Node {id: $to_id, graph_id: $graph_id})
+            OPTIONAL MATCH (meta:GraphMeta {graph_id: $graph_id})
+            MERGE (a)-[r:inRelationTo {graph_id: $graph_id}]->(b)
+            SET r = $props
+            FOREACH (changed IN CASE WHEN meta.directed = false THEN [1] ELSE [] END |
+                MERGE (b)-[reverse:inRelationTo {graph_id: $graph_id}]->(a)
+                SET reverse = $props
+            )
+        """, from_id=row["from_id"], to_id=row["to_id"], props=row["props"], graph_id=graph_id)
+        Neo4JGraphRepository._bump_version(tx, graph_id)
+
+    @staticmethod
+    def _delete_edge(tx: ManagedTransaction, graph_id: str, src_id: str, target_id: str) -> bool:
+        record = tx.run("""
+            MATCH (a:Node {id: $src_id, graph_id: $graph_id})
+                  -[r:inRelationTo {graph_id: $graph_id}]->
+                  (b:Node {id: $target_id, graph_id: $graph_id})
+            OPTIONAL MATCH (meta:GraphMeta {graph_id: $graph_id})
+            OPTIONAL MATCH (b)-[reverse:inRelationTo {graph_id: $graph_id}]->(a)
+            WHERE meta.directed = false
+            DELETE r, reverse
+            RETURN count(*) AS deleted
+        """, src_id=src_id, target_id=target_id, graph_id=graph_id).single()
+        Neo4JGraphRepository._bump_version(tx, graph_id)
+        return bool(record and record["deleted"])
+
+    @staticmethod
+    def _bump_version(tx: ManagedTransaction, graph_id: str):
+        tx.run(f"""
+            MERGE (meta:GraphMeta {{graph_id: $graph_id}})
+            SET meta.{VERSION_KEY} = coalesce(meta.{VERSION_KEY}, 0) + 1
+        """, graph_id=graph_id)
 
     @staticmethod
     def _build_filter_clause(filters: List[Filter], node_name: str) -> Tuple[str, Dict]:
@@ -254,14 +767,90 @@ class Neo4JGraphRepository(BaseGraphRepository):
 
         return " AND ".join(clauses), params
 
-    @staticmethod
-    def _build_search_clause(search_term: str, node_name: str) -> Tuple[str, Dict]:
-        search_term_key = "search_term"
-        regex = f"(?i).*{search_term}.*"
-        clause = f"ANY(prop IN keys({node_name}) WHERE {node_name}[prop] =~ ${search_term_key})"
-        params = {search_term_key: regex}
 
-        return clause, params
+def _content_hash(data: DataDict) -> str:
+    """
+    Computes a stable hash of node or edge data.
+
+    `None` values are skipped because Neo4j does not store null properties,
+    so a graph read back from the database hashes the same as the one that was saved.
+    """
+    present = {k: v for k, v in data.items() if v is not None}
+    serialized = json.dumps(present, sort_keys=True, default=str)
+    return hashlib.sha1(serialized.encode("utf-8")).hexdigest()
+
+
+def _node_row(graph_id: str, node: Node) -> Dict[str, Any]:
+    # `data` is rebuilt on every read, so it is read once
+    data = node.data
+    props = {**data, "id": node.id, "graph_id": graph_id,
+             CONTENT_HASH_KEY: _content_hash(data),
+             SEARCH_TEXT_KEY: _search_text(node.id, data)}
+    return {"id": node.id, "props": props}
+
+
+def _search_text(node_id: str, data: DataDict) -> str:
+    """
+    Joins the ID and the string values of a node into the text covered by the full-text index.
+    """
+    return " ".join([node_id] + [v for v in data.values() if isinstance(v, str)])
+
+
+def _fulltext_query(search_term: str) -> str:
+    """
+    Builds a Lucene query matching nodes which contain every whitespace separated part of the
+    search term, as a word or, for a part made of word characters, as the start of a word.
+
+    Each part is lowercased, so that it is never read as an operator, and escaped, so that
+    operators and wildcards typed by the user are matched literally. The escaped part is
+    analyzed like the indexed text and scored by relevance; the prefix match, which is not
+    analyzed, only adds words that start with it. Returns an empty string if the term contains
+    no words.
+    """
+    clauses = []
+    for part in search_term.lower().split():
+        if not re.search(r"\w", part):
+            # analyzed to nothing, it would match no node
+            continue
+        escaped = _escape_lucene(part)
+        clauses.append(f"({escaped} OR {escaped}*)" if re.fullmatch(r"\w+", part) else escaped)
+    return " AND ".join(clauses)
+
+
+def _escape_lucene(text: str) -> str:
+    return LUCENE_SPECIAL_CHARACTERS.sub(r"\\\g<0>", text)
+
+
+def _edge_row(graph_id: str, edge: Edge) -> Dict[str, Any]:
+    data = edge.data
+    props = {**data, "graph_id": graph_id,
+             CONTENT_HASH_KEY: _content_hash(data)}
+    return {"from_id": edge.src.id, "to_id": edge.target.id, "props": props}
+
+
+def _chunks(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    """
+    Splits a sequence into consecutive chunks of at most `size` elements.
+    """
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _parse_node(n_data: Any) -> Node:
+    return Node(id=n_data["id"], data=_parse_node_data(n_data))
+
+
+def _parse_node_data(n_data: Any) -> DataDict:
+    return {k: _parse_value(v) for k, v in n_data.items() if k not in NODE_INTERNAL_KEYS}
+
+
+def _parse_streamed_edge(record: Any) -> Edge:
+    return Edge(data=_parse_edge_data(record["r"]),
+                src=Node(record["src"], {}), target=Node(record["tgt"], {}))
+
+
+def _parse_edge_data(r_data: Any) -> DataDict:
+    return {k: _parse_value(v) for k, v in r_data.items() if k not in EDGE_INTERNAL_KEYS}
 
 
 def _parse_value(value: Any) -> Any:
@@ -1,7 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
+from api.models.columnar_graph import AnyGraph, ColumnarGraph
+from api.models.edge import Edge
 from api.models.graph import Graph
+from api.models.graph_stream import GraphStream
+from api.models.node import Node
 from core.models.filter import Filter
 
 
@@ -11,15 +15,26 @@ class BaseGraphRepository(ABC):
     """
 
     @abstractmethod
-    def save_graph(self, id: str, graph: Graph) -> None:
+    def save_graph(self, id: str, graph: AnyGraph) -> None:
         """
         Save a graph in the database.
 
         :param id: Unique identifier for the graph
-        :param graph: Graph object
+        :param graph: Graph or ColumnarGraph object
         """
         pass
 
+    def save_graph_stream(self, id: str, stream: GraphStream) -> None:
+        """
+        Save a graph delivered as a stream, replacing the stored one. Implementations that can
+        write batches as they arrive should override this, which by default collects the whole
+        stream first.
+
+        :param id: Unique identifier for the graph
+        :param stream: GraphStream object, consumed by the call
+        """
+        self.save_graph(id, stream.to_columnar_graph())
+
     @abstractmethod
     def query_graph(self, id: str, filters: List[Filter], search_term: str = "") -> Graph:
         """
@@ -32,6 +47,62 @@ class BaseGraphRepository(ABC):
         """
         pass
 
+    def query_columnar_graph(self, id: str, filters: List[Filter], search_term: str = "") -> ColumnarGraph:
+        """
+        Retrieve a graph as an immutable columnar graph. Implementations that can build
+        it directly from query results should override this conversion.
+
+        :param id: Graph ID
+        :param filters: List of filters
+        :param search_term: Optional search string
+        :return: ColumnarGraph object
+        """
+        return ColumnarGraph.from_graph(self.query_graph(id, filters, search_term))
+
+    def count_nodes(self, id: str, filters: List[Filter], search_term: str = "") -> int:
+        """
+        Count the nodes of a graph matching filters and an optional search. Implementations
+        that can count without reading the nodes should override this, which by default
+        queries the whole graph first.
+
+        :param id: Graph ID
+        :param filters: List of filters
+        :param search_term: Optional search string
+        :return: Number of matching nodes
+        """
+        return self.query_columnar_graph(id, filters, search_term).node_count
+
+    def stream_graph(self, id: str, filters: List[Filter], search_term: str = "",
+                     batch_size: Optional[int] = None) -> GraphStream:
+        """
+        Retrieve a graph as a stream of node batches followed by edge batches.
+        Implementations that can read results incrementally should override this,
+        which by default queries the whole graph first.
+
+        :param id: Graph ID
+        :param filters: List of filters
+        :param search_term: Optional search string
+        :param batch_size: Maximum number of nodes or edges in a batch
+        :return: GraphStream object
+        """
+        return GraphStream.from_graph(self.query_graph(id, filters, search_term), batch_size or 1000)
+
+    def query_neighborhood(self, id: str, node_id: str, depth: int = 1, limit: int = 100,
+                           outgoing_only: bool = False) -> ColumnarGraph:
+        """
+        Retrieve the neighborhood of a node: the nodes at most `depth` edges away from it and the
+        edges between them, ignoring filters. Implementations that can match a bounded path
+        should override this, which by default queries the whole graph first.
+
+        :param id: Graph ID
+        :param node_id: ID of the node in the centre of the neighborhood
+        :param depth: Maximum number of edges between the node and its neighbours
+        :param limit: Maximum number of neighbours
+        :param outgoing_only: Follow only outgoing edges
+        :return: ColumnarGraph object, empty if the node does not exist
+        """
+        return self.query_columnar_graph(id, []).neighborhood(node_id, depth, limit, outgoing_only)
+
     @abstractmethod
     def delete_graph(self, id: str):
         """
@@ -42,6 +113,115 @@ class BaseGraphRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def clear_graph(self, id: str) -> None:
+        """
+        Removes all nodes and edges of a graph, keeping its metadata.
+
+        :param id: Unique identifier of the graph to clear
+        :type id: str
+        """
+        pass
+
+    @abstractmethod
+    def get_node(self, id: str, node_id: str) -> Optional[Node]:
+        """
+        Retrieve a single node of a graph.
+
+        :param id: Graph ID
+        :param node_id: ID of the node
+        :return: The node without its edges, or None if it does not exist
+        """
+        pass
+
+    @abstractmethod
+    def upsert_node(self, id: str, node: Node) -> None:
+        """
+        Create a node or replace the data of an existing node with the same ID.
+
+        :param id: Graph ID
+        :param node: Node to save
+        """
+        pass
+
+    @abstractmethod
+    def delete_node(self, id: str, node_id: str) -> bool:
+        """
+        Delete a node and all of its edges.
+
+        :param id: Graph ID
+        :param node_id: ID of the node
+        :return: True if the node existed, otherwise False
+        """
+        pass
+
+    @abstractmethod
+    def get_edge(self, id: str, src_id: str, target_id: str) -> Optional[Edge]:
+        """
+        Retrieve the edge between two nodes of a graph.
+
+        :param id: Graph ID
+        :param src_id: ID of the source node
+        :param target_id: ID of the target node
+        :return: The edge, or None if it does not exist
+        """
+        pass
+
+    @abstractmethod
+    def upsert_edge(self, id: str, edge: Edge) -> None:
+        """
+        Create an edge or replace the data of the existing edge between the same nodes.
+        Both nodes must already exist. Undirected graphs also store the reverse edge.
+
+        :param id: Graph ID
+        :param edge: Edge to save
+        """
+        pass
+
+    @abstractmethod
+    def delete_edge(self, id: str, src_id: str, target_id: str) -> bool:
+        """
+        Delete the edge between two nodes. Undirected graphs also lose the reverse edge.
+
+        :param id: Graph ID
+        :param src_id: ID of the source node
+        :param target_id: ID of the target node
+        :return: True if the edge existed, otherwise False
+        """
+        pass
+
+    @abstractmethod
+    def get_layout(self, id: str) -> Dict[str, Tuple[float, float]]:
+        """
+        Retrieve the stored positions of the nodes of a graph.
+
+        :param id: Graph ID
+        :return: Positions by node ID, nodes without a stored position are left out
+        """
+        pass
+
+    @abstractmethod
+    def save_layout(self, id: str, positions: Dict[str, Tuple[float, float]]):
+        """
+        Store node positions alongside a graph. Positions are not part of node data and are
+        dropped when a node is rewritten.
+
+        :param id: Graph ID
+        :param positions: Positions by node ID
+        """
+        pass
+
+    def version(self, id: str) -> Optional[int]:
+        """
+        Return a number that changes whenever the graph is written, by this or any other
+        process, so that results derived from it can be cached. Repositories that do not
+        track writes return None.
+
+        :param id: Graph ID
+        :return: The current version, or None if unknown
+        """
+        return None
+
     @abstractmethod
     def close(self) -> None:
         """
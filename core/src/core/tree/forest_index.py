@@ -0,0 +1,360 @@
+from bisect import insort
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set
+
+from api.models.columnar_graph import ColumnarGraph
+
+
+class ForestIndex(object):
+    """
+    The spanning forest of a graph shown by the tree view, with lookups for the roots, the
+    children, the parents, the depth and the component of every node.
+
+    Every weakly connected component is covered by its own trees. Their roots are the graph
+    root, if it is in the component, and the nodes without incoming edges (loops aside). Nodes
+    are reached from the roots breadth first along outgoing edges; the parent of a node in the
+    forest is, of its sources one level closer to the roots, the one added first. Nodes that no
+    root reaches, e.g. the members of a component made of cycles only, become roots themselves,
+    so every node has a path from a root. Roots, components and parents are ordered by the order
+    in which their nodes were added, i.e. the node order of the graph followed by nodes added
+    later, so the forest after a change equals the forest built from the changed graph with its
+    nodes in that order.
+
+    Children are all targets of a node, in the order of the edges of a directed graph and in node
+    order for an undirected one, so a node with several parents is listed under each of them,
+    while `parent` and `depth` describe the spanning tree.
+
+    Single nodes and edges are added and removed in place. A change that can move parents,
+    depths or roots recomputes only the components it touches.
+    """
+
+    def __init__(self, directed: Optional[bool] = True, root_id: Optional[str] = None):
+        """
+        Initializes an empty forest. Use `from_graph` to index an existing graph.
+
+        :param directed: Whether edges of the graph are directed, edges of undirected graphs
+                         are followed in both directions.
+        :type directed: bool
+        :param root_id: ID of the root node of the graph, if any.
+        :type root_id: Optional[str]
+        """
+        self.directed = directed
+        self.root_id = root_id
+        # nodes without children or parents have no entry
+        self._children: Dict[str, List[str]] = {}
+        self._parents: Dict[str, List[str]] = {}
+        self._parent: Dict[str, Optional[str]] = {}
+        self._depth: Dict[str, int] = {}
+        self._component: Dict[str, int] = {}
+        self._members: Dict[int, List[str]] = {}
+        self._roots: Dict[int, List[str]] = {}
+        self._next_component = 0
+        self._root_list: Optional[List[str]] = None
+        # position of every node in the order nodes were added, which orders roots
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+        self._first: Dict[int, int] = {}
+        # components in which some nodes are reached from none of the regular roots
+        self._unreached: Set[int] = set()
+
+    @classmethod
+    def from_graph(cls, graph: ColumnarGraph) -> "ForestIndex":
+        """
+        Builds the forest of a graph.
+
+        :param graph: The graph to index.
+        :type graph: ColumnarGraph
+        :return: The forest.
+        :rtype: ForestIndex
+        """
+        forest = cls(graph.directed, graph.root_id)
+        ids = graph.node_ids
+        forest._order = {node_id: i for i, node_id in enumerate(ids)}
+        forest._next_order = len(ids)
+        children: Dict[str, Dict[str, None]] = {}
+        for i, node_id in enumerate(ids):
+            for target in graph.neighbours(i):
+                children.setdefault(node_id, {})[ids[target]] = None
+                if not graph.directed:
+                    # as `add_edge` does, undirected edges are followed in both directions
+                    children.setdefault(ids[target], {})[node_id] = None
+        order = forest._order.__getitem__
+        for node_id, targets in children.items():
+            forest._children[node_id] = list(targets) if graph.directed else sorted(targets, key=order)
+            for target_id in targets:
+                forest._parents.setdefault(target_id, []).append(node_id)
+        for sources in forest._parents.values():
+            sources.sort(key=order)
+        forest._rebuild(ids)
+        return forest
+
+    @property
+    def node_count(self) -> int:
+        return len(self._component)
+
+    @property
+    def component_count(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._component
+
+    def roots(self, offset: int = 0, limit: Optional[int] = None) -> List[str]:
+        """
+        Returns a page of the roots, those of the component of the graph root first, then
+        component by component.
+        """
+        if self._root_list is None:
+            first = self._component.get(self.root_id) if self.root_id is not None else None
+            components = sorted(self._roots, key=lambda component: (component != first, self._first[component]))
+            self._root_list = list(chain.from_iterable(self._roots[c] for c in components))
+        return _page(self._root_list, offset, limit)
+
+    def root_count(self) -> int:
+        return sum(len(roots) for roots in self._roots.values())
+
+    def children(self, node_id: str, offset: int = 0, limit: Optional[int] = None) -> List[str]:
+        """
+        Returns a page of the targets of the outgoing edges of a node.
+        """
+        return _page(self._children.get(node_id, []), offset, limit)
+
+    def child_count(self, node_id: str) -> int:
+        return len(self._children.get(node_id, ()))
+
+    def parents(self, node_id: str) -> List[str]:
+        """
+        Returns the sources of the incoming edges of a node.
+        """
+        return list(self._parents.get(node_id, ()))
+
+    def parent(self, node_id: str) -> Optional[str]:
+        """
+        Returns the parent of a node in the spanning forest, None for roots and missing nodes.
+        """
+        return self._parent.get(node_id)
+
+    def depth(self, node_id: str) -> Optional[int]:
+        """
+        Returns the distance of a node from its root, or None if the node does not exist.
+        """
+        return self._depth.get(node_id)
+
+    def component(self, node_id: str) -> Optional[int]:
+        """
+        Returns the ID of the weakly connected component of a node, or None if the node does
+        not exist. IDs of components touched by a change are not kept.
+        """
+        return self._component.get(node_id)
+
+    def path(self, node_id: str) -> List[str]:
+        """
+        Returns the IDs of the nodes from the root of a node down to the node itself, empty if
+        the node does not exist.
+        """
+        if node_id not in self._component:
+            return []
+        path = [node_id]
+        parent = self._parent[node_id]
+        while parent is not None:
+            path.append(parent)
+            parent = self._parent[parent]
+        path.reverse()
+        return path
+
+    def add_node(self, node_id: str):
+        """
+        Adds a node without edges. Adding a node that exists does nothing.
+        """
+        if node_id in self._component:
+            return
+        self._order[node_id] = self._next_order
+        self._next_order += 1
+        self._span([node_id])
+
+    def remove_node(self, node_id: str):
+        """
+        Removes a node with its edges. Removing a node that does not exist does nothing.
+        """
+        component = self._component.get(node_id)
+        if component is None:
+            return
+        for target_id in self._children.pop(node_id, []):
+            if target_id != node_id:
+                _discard(self._parents, target_id, node_id)
+        for src_id in self._parents.pop(node_id, []):
+            if src_id != node_id:
+                _discard(self._children, src_id, node_id)
+        members = self._drop_component(component)
+        del self._component[node_id], self._parent[node_id], self._depth[node_id], self._order[node_id]
+        self._rebuild(member for member in members if member != node_id)
+
+    def add_edge(self, src_id: str, target_id: str):
+        """
+        Adds an edge, and its nodes if they are missing. Edges of undirected graphs are added
+        in both directions.
+        """
+        self.add_node(src_id)
+        self.add_node(target_id)
+        self._connect(src_id, target_id)
+        if not self.directed:
+            self._connect(target_id, src_id)
+
+    def remove_edge(self, src_id: str, target_id: str):
+        """
+        Removes an edge, in both directions for undirected graphs. Removing an edge that does
+        not exist does nothing.
+        """
+        self._disconnect(src_id, target_id)
+        if not self.directed:
+            self._disconnect(target_id, src_id)
+
+    def _connect(self, src_id: str, target_id: str):
+        if target_id in self._children.get(src_id, ()):
+            return
+        order = self._order.__getitem__
+        if self.directed:
+            self._children.setdefault(src_id, []).append(target_id)
+        else:
+            insort(self._children.setdefault(src_id, []), target_id, key=order)
+        insort(self._parents.setdefault(target_id, []), src_id, key=order)
+        if src_id == target_id:
+            return
+
+        src_component, target_component = self._component[src_id], self._component[target_id]
+        if (src_component == target_component and self._parent[target_id] is not None
+                and src_component not in self._unreached):
+            # the roots stay the same, only distances through the new edge can get shorter
+            if self._relax(src_id, target_id):
+                self._shorten([target_id])
+            return
+        members = self._drop_component(src_component)
+        if target_component != src_component:
+            members += self._drop_component(target_component)
+        self._rebuild(members)
+
+    def _disconnect(self, src_id: str, target_id: str):
+        if target_id not in self._children.get(src_id, ()):
+            return
+        _discard(self._children, src_id, target_id)
+        _discard(self._parents, target_id, src_id)
+        if src_id == target_id or (self._parent[target_id] not in (src_id, None)
+                                   and self._tree_root(src_id) == self._tree_root(target_id)):
+            # both ends stay connected through their tree, which does not use the edge, and the
+            # target keeps an incoming edge, so it does not become a root
+            return
+        self._rebuild(self._drop_component(self._component[src_id]))
+
+    def _relax(self, src_id: str, target_id: str) -> bool:
+        """
+        Makes a node the parent of its target if it is closer to the roots than the current
+        parent, or as close and added earlier. Returns whether the depth of the target changed.
+        """
+        depth = self._depth[src_id] + 1
+        if self._depth[target_id] > depth:
+            self._parent[target_id] = src_id
+            self._depth[target_id] = depth
+            return True
+        parent = self._parent[target_id]
+        if self._depth[target_id] == depth and parent is not None and self._order[src_id] < self._order[parent]:
+            self._parent[target_id] = src_id
+        return False
+
+    def _shorten(self, frontier: List[str]):
+        while frontier:
+            next_frontier = []
+            for node_id in frontier:
+                for target_id in self._children.get(node_id, ()):
+                    if self._relax(node_id, target_id):
+                        next_frontier.append(target_id)
+            frontier = next_frontier
+
+    def _tree_root(self, node_id: str) -> str:
+        while self._parent[node_id] is not None:
+            node_id = self._parent[node_id]
+        return node_id
+
+    def _drop_component(self, component: int) -> List[str]:
+        self._roots.pop(component, None)
+        self._first.pop(component, None)
+        self._unreached.discard(component)
+        self._root_list = None
+        return self._members.pop(component)
+
+    def _rebuild(self, nodes: Iterable[str]):
+        """
+        Recomputes the components of the given nodes, which are whole components or what remains
+        of them after a change.
+        """
+        seen = set()
+        for start in nodes:
+            if start in seen:
+                continue
+            seen.add(start)
+            members = [start]
+            stack = [start]
+            while stack:
+                node_id = stack.pop()
+                for other in chain(self._children.get(node_id, ()), self._parents.get(node_id, ())):
+                    if other not in seen:
+                        seen.add(other)
+                        members.append(other)
+                        stack.append(other)
+            self._span(members)
+
+    def _span(self, members: List[str]):
+        # the same order whether the component is built with the forest or after a change
+        members.sort(key=self._order.__getitem__)
+        component = self._next_component
+        self._next_component += 1
+        self._members[component] = members
+        self._first[component] = self._order[members[0]]
+        for node_id in members:
+            self._component[node_id] = component
+            self._depth.pop(node_id, None)
+
+        roots = [node_id for node_id in members
+                 if all(src_id == node_id for src_id in self._parents.get(node_id, ()))]
+        if self.root_id is not None and self._component.get(self.root_id) == component:
+            roots = [self.root_id] + [node_id for node_id in roots if node_id != self.root_id]
+        self._reach(roots)
+        for node_id in members:
+            if node_id not in self._depth:
+                roots.append(node_id)
+                self._reach([node_id])
+                self._unreached.add(component)
+
+        self._roots[component] = roots
+        self._root_list = None
+
+    def _reach(self, roots: List[str]):
+        frontier = []
+        for root_id in roots:
+            if root_id not in self._depth:
+                self._parent[root_id] = None
+                self._depth[root_id] = 0
+                frontier.append(root_id)
+        depth = 0
+        while frontier:
+            depth += 1
+            next_frontier = []
+            # the parent of a node is the one of its sources one level up that was added first
+            frontier.sort(key=self._order.__getitem__)
+            for node_id in frontier:
+                for target_id in self._children.get(node_id, ()):
+                    if target_id not in self._depth:
+                        self._parent[target_id] = node_id
+                        self._depth[target_id] = depth
+                        next_frontier.append(target_id)
+            frontier = next_frontier
+
+
+def _page(values: List[str], offset: int, limit: Optional[int]) -> List[str]:
+    return values[offset:] if limit is None else values[offset:offset + limit]
+
+
+def _discard(lists: Dict[str, List[str]], key: str, value: str):
+    values = lists[key]
+    values.remove(value)
+    if not values:
+        del lists[key]
@@ -0,0 +1,74 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Optional, Union
+
+from core.tree.forest_index import ForestIndex
+
+FORMAT_VERSION = 2
+"""Bumped whenever `ForestIndex` changes its attributes, invalidating stored forests."""
+
+
+class ForestStore(object):
+    """
+    Keeps the forests of graphs on disk, one file per graph, tagged with the graph version it
+    was built for, so that a restarted process need not read a graph again to show its tree.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        """
+        Initializes the store.
+
+        :param directory: Directory of the forest files, created when the first forest is saved
+        :type directory: Union[str, Path]
+        """
+        self.directory = Path(directory)
+
+    def load(self, graph_id: str, version: int) -> Optional[ForestIndex]:
+        """
+        Returns the forest saved for a version of a graph.
+
+        :param graph_id: ID of the graph
+        :type graph_id: str
+        :param version: Current version of the graph
+        :type version: int
+        :return: The forest, or None if none was saved for the version
+        :rtype: Optional[ForestIndex]
+        """
+        try:
+            with open(self._path(graph_id), "rb") as file:
+                if pickle.load(file) != (FORMAT_VERSION, graph_id, version):
+                    return None
+                forest = pickle.load(file)
+        except (OSError, EOFError, ValueError, TypeError, AttributeError, pickle.UnpicklingError):
+            # missing, unreadable or written by an incompatible version
+            return None
+        return forest if isinstance(forest, ForestIndex) else None
+
+    def save(self, graph_id: str, version: int, forest: ForestIndex):
+        """
+        Saves the forest of a version of a graph, replacing the one saved before.
+
+        :param graph_id: ID of the graph
+        :type graph_id: str
+        :param version: Version of the graph the forest was built for
+        :type version: int
+        :param forest: The forest
+        :type forest: ForestIndex
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # written to a temporary file first, so that readers never see a partial forest
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                pickle.dump((FORMAT_VERSION, graph_id, version), file, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(forest, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self._path(graph_id))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def _path(self, graph_id: str) -> Path:
+        return self.directory / f"{hashlib.sha1(graph_id.encode('utf-8')).hexdigest()}.forest"
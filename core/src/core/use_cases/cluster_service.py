@@ -0,0 +1,290 @@
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from api.models.columnar_graph import ColumnarGraph, ColumnarGraphBuilder
+from core.clustering.label_propagation import label_propagation
+from core.repositories.graph_repository.interfaces.base_graph_repository import \
+    BaseGraphRepository
+
+DEFAULT_LEAF_SIZE = 50
+DEFAULT_MAX_CHILDREN = 100
+
+CLUSTER_NODE_PREFIX = "cluster:"
+
+Positions = Dict[str, Tuple[float, float]]
+
+
+class _Hierarchy(object):
+    """
+    Community hierarchy of one version of a graph. Clusters are identified by paths ("c3",
+    "c3.1", ...) and split into sub-clusters lazily, the first time they are expanded.
+    """
+
+    def __init__(self, graph: ColumnarGraph):
+        self.graph = graph
+        offsets = np.frombuffer(graph.offsets, dtype=np.int64)
+        self.sources = np.repeat(np.arange(graph.node_count), np.diff(offsets))
+        self.targets = np.frombuffer(graph.targets, dtype=np.int64)
+        self.degree = (np.bincount(self.sources, minlength=graph.node_count)
+                       + np.bincount(self.targets, minlength=graph.node_count))
+        self.members: Dict[str, np.ndarray] = {"": np.arange(graph.node_count)}
+        self.children: Dict[str, Tuple[List[str], np.ndarray]] = {}
+
+
+class ClusterService(object):
+    """
+    Summarizes graphs as collapsed super-graphs of their communities.
+
+    Communities are found by label propagation and, while there are more than `max_children` of
+    them, merged by label propagation over the graph of communities. Every community with more
+    than `leaf_size` members is split the same way when expanded, so the summary stays bounded
+    at every depth. Hierarchies are computed over the unfiltered graph, once per graph version.
+    """
+
+    def __init__(self,
+                 graph_repository: BaseGraphRepository,
+                 leaf_size: int = DEFAULT_LEAF_SIZE,
+                 max_children: int = DEFAULT_MAX_CHILDREN):
+        """
+        Initializes the service.
+
+        :param graph_repository: Repository holding the graphs
+        :type graph_repository: BaseGraphRepository
+        :param leaf_size: Communities up to this size expand into their nodes
+        :type leaf_size: int
+        :param max_children: Maximum number of clusters and nodes a cluster expands into
+        :type max_children: int
+        """
+        self._graph_repository = graph_repository
+        self.leaf_size = leaf_size
+        self.max_children = max_children
+        self._lock = threading.Lock()
+        self._graph_locks: Dict[str, threading.Lock] = {}
+        self._hierarchies: Dict[str, Tuple[Optional[int], _Hierarchy]] = {}
+
+    def summarize(self,
+                  graph_id: str,
+                  graph: ColumnarGraph,
+                  expanded: Set[str],
+                  positions: Optional[Positions] = None) -> Tuple[ColumnarGraph, Positions]:
+        """
+        Collapses a graph into its top level communities, except for the expanded ones, which are
+        replaced by their sub-communities and nodes.
+
+        Collapsed communities become nodes with the data `cluster_id`, `size` (number of members
+        in the given graph) and `label` (ID of the member with most edges); their node ID is the
+        cluster ID prefixed with "cluster:". Edges between a community and anything else are
+        merged into one edge with the data `edges` (number of merged edges); edges between two
+        plain nodes are kept as they are.
+
+        :param graph_id: ID of the graph
+        :type graph_id: str
+        :param graph: The graph to summarize, possibly filtered; its nodes must be nodes of the
+                      stored graph
+        :type graph: ColumnarGraph
+        :param expanded: IDs of the expanded clusters; an expanded cluster is shown only if its
+                         parent is expanded as well
+        :type expanded: Set[str]
+        :param positions: Node positions by node ID, if any
+        :type positions: Optional[Dict[str, Tuple[float, float]]]
+        :return: The summary graph and the positions of its nodes; a collapsed community is
+                 placed at the centre of its members
+        :rtype: Tuple[ColumnarGraph, Dict[str, Tuple[float, float]]]
+        """
+        with self._lock:
+            graph_lock = self._graph_locks.setdefault(graph_id, threading.Lock())
+        # hierarchies of different graphs are computed and split concurrently, those of one graph in turn
+        with graph_lock:
+            hierarchy = self._get_hierarchy(graph_id)
+            unit_of, clusters = self._units(hierarchy, expanded)
+
+        # units of the nodes of the given graph, -1 for nodes missing from the hierarchy
+        full_index = np.array([_index_or(hierarchy.graph, node_id) for node_id in graph.node_ids], dtype=np.int64)
+        unit = np.where(full_index >= 0, unit_of[np.maximum(full_index, 0)], -1)
+        sizes = np.bincount(unit[unit >= 0], minlength=len(clusters))
+        # a community with a single member in this graph is shown as that member
+        collapsed = np.array([cluster is not None for cluster in clusters], dtype=bool) & (sizes > 1)
+        shown_as_node = (unit < 0) | ~collapsed[np.maximum(unit, 0)]
+
+        builder = ColumnarGraphBuilder(directed=graph.directed, root_id=graph.root_id)
+        summary_positions: Positions = {}
+        representative = self._representatives(hierarchy, full_index, unit, collapsed)
+        centres = _centres(graph, unit, collapsed, positions)
+        for u in np.flatnonzero(collapsed):
+            node_id = CLUSTER_NODE_PREFIX + clusters[u]
+            builder.add_node(node_id, {
+                "cluster_id": clusters[u],
+                "size": int(sizes[u]),
+                "label": graph.node_ids[representative[u]],
+            })
+            if u in centres:
+                summary_positions[node_id] = centres[u]
+        for i in np.flatnonzero(shown_as_node):
+            node_id = graph.node_ids[i]
+            builder.add_node(node_id, graph.node_data(int(i)))
+            if positions and node_id in positions:
+                summary_positions[node_id] = positions[node_id]
+
+        # edges between plain nodes are kept, the others are merged per pair of summary nodes
+        offsets = np.frombuffer(graph.offsets, dtype=np.int64)
+        sources = np.repeat(np.arange(graph.node_count), np.diff(offsets))
+        targets = np.frombuffer(graph.targets, dtype=np.int64)
+        plain = shown_as_node[sources] & shown_as_node[targets]
+        for position in np.flatnonzero(plain):
+            builder.add_edge(graph.node_ids[sources[position]], graph.node_ids[targets[position]],
+                             graph.edge_data(int(position)))
+
+        summary_index = np.where(shown_as_node, np.arange(graph.node_count), graph.node_count + unit)
+        a, b = summary_index[sources[~plain]], summary_index[targets[~plain]]
+        if not graph.directed:
+            a, b = np.minimum(a, b), np.maximum(a, b)
+        distinct = a != b
+        span = graph.node_count + len(clusters)
+        pairs, counts = np.unique(a[distinct] * span + b[distinct], return_counts=True)
+
+        def summary_id(index: int) -> str:
+            if index < graph.node_count:
+                return graph.node_ids[index]
+            return CLUSTER_NODE_PREFIX + clusters[index - graph.node_count]
+
+        for pair, count in zip(pairs, counts):
+            builder.add_edge(summary_id(int(pair // span)), summary_id(int(pair % span)), {"edges": int(count)})
+
+        return builder.build(), summary_positions
+
+    def _get_hierarchy(self, graph_id: str) -> _Hierarchy:
+        version = self._graph_repository.version(graph_id)
+        with self._lock:
+            cached = self._hierarchies.get(graph_id)
+        if cached is not None and version is not None and cached[0] == version:
+            return cached[1]
+        hierarchy = _Hierarchy(self._graph_repository.query_columnar_graph(graph_id, []))
+        with self._lock:
+            self._hierarchies[graph_id] = (version, hierarchy)
+        return hierarchy
+
+    def _units(self, hierarchy: _Hierarchy, expanded: Set[str]) -> Tuple[np.ndarray, List[Optional[str]]]:
+        """
+        Assigns every node of the hierarchy to the unit it is shown as: a collapsed cluster or
+        itself. Returns the unit of every node and the cluster ID of every unit, None for nodes.
+        """
+        unit_of = np.full(hierarchy.graph.node_count, -1, dtype=np.int64)
+        clusters: List[Optional[str]] = []
+        pending = [""]
+        while pending:
+            sub_clusters, nodes = self._split(hierarchy, pending.pop())
+            for cluster_id in sub_clusters:
+                if cluster_id in expanded:
+                    pending.append(cluster_id)
+                else:
+                    unit_of[hierarchy.members[cluster_id]] = len(clusters)
+                    clusters.append(cluster_id)
+            unit_of[nodes] = np.arange(len(clusters), len(clusters) + len(nodes))
+            clusters.extend([None] * len(nodes))
+        return unit_of, clusters
+
+    def _split(self, hierarchy: _Hierarchy, cluster_id: str) -> Tuple[List[str], np.ndarray]:
+        """
+        Returns the sub-clusters and the direct member nodes of a cluster, computing them on
+        the first call.
+        """
+        if cluster_id in hierarchy.children:
+            return hierarchy.children[cluster_id]
+
+        members = hierarchy.members[cluster_id]
+        if len(members) <= self.leaf_size:
+            hierarchy.children[cluster_id] = ([], members)
+            return hierarchy.children[cluster_id]
+
+        local = np.full(hierarchy.graph.node_count, -1, dtype=np.int64)
+        local[members] = np.arange(len(members))
+        inside = (local[hierarchy.sources] >= 0) & (local[hierarchy.targets] >= 0)
+        sources, targets = local[hierarchy.sources[inside]], local[hierarchy.targets[inside]]
+
+        labels = label_propagation(len(members), sources, targets)
+        while labels.max() + 1 > self.max_children:
+            # merge communities by label propagation over the graph of communities
+            community_count = labels.max() + 1
+            pairs, weights = np.unique(labels[sources] * community_count + labels[targets], return_counts=True)
+            merged = label_propagation(community_count, pairs // community_count, pairs % community_count, weights)
+            if merged.max() + 1 == community_count:
+                break
+            labels = merged[labels]
+        labels = _pack(labels, self.max_children)
+
+        if labels.max() == 0:
+            # no community structure, members are split into chunks so that expansion stays bounded
+            chunk_count = min(self.max_children, -(-len(members) // self.leaf_size))
+            labels = np.arange(len(members)) * chunk_count // len(members)
+
+        sizes = np.bincount(labels)
+        sub_clusters: List[str] = []
+        nodes: List[np.ndarray] = []
+        prefix = f"{cluster_id}." if cluster_id else "c"
+        for label in np.argsort(-sizes, kind="stable"):
+            group = members[labels == label]
+            if len(group) == 1:
+                nodes.append(group)
+                continue
+            sub_id = f"{prefix}{len(sub_clusters)}"
+            hierarchy.members[sub_id] = group
+            sub_clusters.append(sub_id)
+
+        hierarchy.children[cluster_id] = (
+            sub_clusters, np.concatenate(nodes) if nodes else np.zeros(0, dtype=np.int64))
+        return hierarchy.children[cluster_id]
+
+    @staticmethod
+    def _representatives(hierarchy: _Hierarchy, full_index: np.ndarray, unit: np.ndarray,
+                         collapsed: np.ndarray) -> np.ndarray:
+        # the member with the most edges in the stored graph, as an index into the given graph
+        representative = np.full(len(collapsed), -1, dtype=np.int64)
+        candidates = np.flatnonzero((unit >= 0) & collapsed[np.maximum(unit, 0)])
+        degree = hierarchy.degree[full_index[candidates]]
+        order = candidates[np.lexsort((-degree, unit[candidates]))]
+        units, first = np.unique(unit[order], return_index=True)
+        representative[units] = order[first]
+        return representative
+
+
+def _index_or(graph: ColumnarGraph, node_id: str) -> int:
+    index = graph.index_of(node_id)
+    return -1 if index is None else index
+
+
+def _pack(labels: np.ndarray, limit: int) -> np.ndarray:
+    """
+    Keeps the largest half of `limit` communities and packs the remaining ones, whole, into
+    bins of similar size, so that there are at most `limit` groups. This bounds the summary of
+    graphs with many small components, which label propagation cannot merge.
+    """
+    sizes = np.bincount(labels)
+    if len(sizes) <= limit:
+        return labels
+    order = np.argsort(-sizes, kind="stable")
+    keep = limit // 2
+    bins = limit - keep
+    rest = order[keep:]
+    before = np.cumsum(sizes[rest]) - sizes[rest]
+    capacity = sizes[rest].sum() / bins
+
+    packed = np.empty(len(sizes), dtype=np.int64)
+    packed[order[:keep]] = np.arange(keep)
+    packed[rest] = keep + np.minimum((before / capacity).astype(np.int64), bins - 1)
+    return packed[labels]
+
+
+def _centres(graph: ColumnarGraph, unit: np.ndarray, collapsed: np.ndarray,
+             positions: Optional[Positions]) -> Dict[int, Tuple[float, float]]:
+    # the centre of the positioned members of every collapsed community
+    if not positions:
+        return {}
+    xy = np.array([positions.get(node_id, (np.nan, np.nan)) for node_id in graph.node_ids], dtype=float).reshape(-1, 2)
+    counted = (unit >= 0) & collapsed[np.maximum(unit, 0)] & ~np.isnan(xy).any(axis=1)
+    counts = np.bincount(unit[counted], minlength=len(collapsed))
+    x = np.bincount(unit[counted], weights=xy[counted, 0], minlength=len(collapsed))
+    y = np.bincount(unit[counted], weights=xy[counted, 1], minlength=len(collapsed))
+    return {int(u): (round(float(x[u] / counts[u]), 1), round(float(y[u] / counts[u]), 1))
+            for u in np.flatnonzero(counts)}
@@ -1,14 +1,30 @@
-from typing import List, Optional
+import sys
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
 
 from api.components.data_source import DataSourcePlugin
 from api.components.visualizer import VisualizerPlugin
+from api.models.columnar_graph import ColumnarGraph
+from api.models.edge import Edge
 from api.models.graph import Graph
-from core.models.filter import Filter
+from api.models.graph_stream import GraphStream
+from api.models.node import Node
+from core.cache.sized_lru_cache import SizedLRUCache
+from core.models.filter import Filter, normalize_filters
+from core.models.job import Job
 from core.models.workspace import Workspace
 from core.repositories.graph_repository.interfaces.base_graph_repository import \
     BaseGraphRepository
+from core.tree.forest_index import ForestIndex
+from core.use_cases.cluster_service import ClusterService
+from core.use_cases.job_service import JobService
+from core.use_cases.layout_service import LayoutService
+from core.use_cases.tree_service import TreeService
+from core.use_cases.viewport_service import ViewportService
 from core.use_cases.workspaces import WorkspaceService
 
+SUMMARY_BATCH_SIZE = 1000
+REFRESH_JOB = "refresh"
+
 
 class GraphContext(object):
     """
@@ -36,6 +52,12 @@ class GraphContext(object):
                  visualizer: Optional[VisualizerPlugin],
                  workspace_service: WorkspaceService,
                  graph_repository: BaseGraphRepository,
+                 render_cache: Optional[SizedLRUCache[str]] = None,
+                 layout_service: Optional[LayoutService] = None,
+                 viewport_service: Optional[ViewportService] = None,
+                 cluster_service: Optional[ClusterService] = None,
+                 tree_service: Optional[TreeService] = None,
+                 job_service: Optional[JobService] = None,
                  ):
         """
         Initializes the GraphContext with workspace and plugins.
@@ -50,9 +72,27 @@ class GraphContext(object):
         :type workspace_service: WorkspaceService
         :param graph_repository: Repository for managing persistent graph storage
         :type graph_repository: BaseGraphRepository
+        :param render_cache: Cache of rendered graph HTML shared between workspaces, if any
+        :type render_cache: Optional[SizedLRUCache[str]]
+        :param layout_service: Service providing precomputed node positions, if any
+        :type layout_service: Optional[LayoutService]
+        :param viewport_service: Service answering viewport queries over large graphs, if any
+        :type viewport_service: Optional[ViewportService]
+        :param cluster_service: Service summarizing graphs by their communities, if any
+        :type cluster_service: Optional[ClusterService]
+        :param tree_service: Service serving the tree view from a server-side forest, if any
+        :type tree_service: Optional[TreeService]
+        :param job_service: Service running data source refreshes in the background, if any
+        :type job_service: Optional[JobService]
         """
         self._workspace_service = workspace_service
         self._graph_repository = graph_repository
+        self._render_cache = render_cache
+        self._layout_service = layout_service
+        self._viewport_service = viewport_service
+        self._cluster_service = cluster_service
+        self._tree_service = tree_service
+        self._job_service = job_service
 
         self._workspace_id = workspace.id
         self._data_source_config = workspace.data_source_config
@@ -62,6 +102,8 @@ class GraphContext(object):
 
         self.filters: List[Filter] = workspace.filters
         self.search_term: str = ""
+        self.summary_mode: bool = False
+        self.expanded_clusters: Set[str] = set()
 
     def get_context(self) -> dict:
         """
@@ -71,22 +113,55 @@ class GraphContext(object):
             - selected_data_source: ID of current data source
             - selected_visualizer: ID of current visualizer
             - graph_html: Rendered graph HTML
+            - viewport_mode: Whether the graph is too large to render and is browsed through viewports
+            - summary_mode: Whether the graph is shown collapsed into its communities
+            - expanded_clusters: IDs of the expanded clusters of the summary
+            - refresh_job: The running data source refresh, if any
+            - layout_job: The running layout computation, if any
         :rtype: dict
         """
         graph_html = ""
-        if self._selected_data_source is not None and self._selected_visualizer is not None:
-            graph = self._graph_repository.query_graph(
-                self._workspace_id, self.filters, self.search_term)
-            graph_html = self._selected_visualizer.display(graph)
+        viewport_mode = self.uses_viewport()
+        if self._selected_data_source is not None and self._selected_visualizer is not None and not viewport_mode:
+            graph_html = self._render_graph(self._selected_visualizer)
+        refresh_job = self.get_refresh_job()
+        layout_job = self.get_layout_job()
 
         return {
             "selected_data_source": self._selected_data_source.identifier() if self._selected_data_source else None,
             "selected_visualizer": self._selected_visualizer.identifier() if self._selected_visualizer else None,
             "filters": [f.to_dict() for f in self.filters],
             "search_term": self.search_term,
-            "graph_html": graph_html
+            "graph_html": graph_html,
+            "viewport_mode": viewport_mode,
+            "summary_mode": self.summary_mode,
+            "expanded_clusters": sorted(self.expanded_clusters),
+            "refresh_job": refresh_job.to_dict() if refresh_job else None,
+            "layout_job": layout_job.to_dict() if layout_job else None,
         }
 
+    def render_key(self) -> Optional[Hashable]:
+        """
+        Returns a key identifying everything the rendered graph depends on: the workspace,
+        the graph version, the selected plugins, the filters, the search term and the
+        expanded clusters in summary mode.
+
+        :return: The key, or None if the repository does not track graph versions
+        :rtype: Optional[Hashable]
+        """
+        version = self._graph_repository.version(self._workspace_id)
+        if version is None:
+            return None
+        return (
+            self._workspace_id,
+            version,
+            self._selected_data_source.identifier() if self._selected_data_source else None,
+            self._selected_visualizer.identifier() if self._selected_visualizer else None,
+            normalize_filters(self.filters),
+            self.search_term,
+            tuple(sorted(self.expanded_clusters)) if self.summary_mode else None,
+        )
+
     def get_graph(self) -> Graph:
         """
         Returns the saved graph with no filters applied.
@@ -95,10 +170,176 @@ class GraphContext(object):
         :return graph
         :rtype Graph
         """
-        if self._selected_data_source is None:
-            raise KeyError("No data source selected")
+        self._require_data_source()
         return self._graph_repository.query_graph(self._workspace_id, [])
 
+    def stream_graph(self, apply_filters: bool = True) -> GraphStream:
+        """
+        Returns the saved graph as a stream of node batches followed by edge batches.
+
+        :param apply_filters: Whether to apply the active filters and search term
+        :type apply_filters: bool
+        :raises KeyError: If no data source is selected
+        :return: A stream over the graph
+        :rtype: GraphStream
+        """
+        self._require_data_source()
+        if not apply_filters:
+            return self._graph_repository.stream_graph(self._workspace_id, [])
+        return self._graph_repository.stream_graph(self._workspace_id, self.filters, self.search_term)
+
+    def uses_viewport(self) -> bool:
+        """
+        Returns whether the filtered graph is too large to be rendered at once, in which case
+        it is browsed through `get_viewport` instead.
+
+        :return: True if a data source is selected and the graph exceeds the viewport threshold
+        :rtype: bool
+        """
+        if self._selected_data_source is None or self._viewport_service is None or self._layout_service is None:
+            return False
+        if self.summary_mode:
+            return False
+        count = self._graph_repository.count_nodes(self._workspace_id, self.filters, self.search_term)
+        return self._viewport_service.applies_to(count)
+
+    def get_viewport(self, bounds: Tuple[float, float, float, float], zoom: float) -> Dict[str, Any]:
+        """
+        Returns the nodes and edges of the filtered graph visible in a viewport, aggregated
+        into clusters when there are too many of them.
+
+        :param bounds: The viewport rectangle (min x, min y, max x, max y) in layout coordinates
+        :type bounds: Tuple[float, float, float, float]
+        :param zoom: Screen pixels per layout unit
+        :type zoom: float
+        :raises KeyError: If no data source is selected
+        :raises ValueError: If the context has no layout or viewport service
+        :return: The visible part of the graph, see `ViewportService.get_viewport`
+        :rtype: Dict[str, Any]
+        """
+        self._require_data_source()
+        if self._viewport_service is None or self._layout_service is None:
+            raise ValueError("Viewport queries are not available")
+
+        graph = self._graph_repository.query_columnar_graph(self._workspace_id, self.filters, self.search_term)
+        positions = self._layout_service.get_positions(self._workspace_id)
+        key = self.render_key()
+        if key is None or self.layout_pending():
+            # without graph versions the index of an earlier query cannot be trusted, and an
+            # index of provisional positions must not outlive them
+            key = object()
+        return self._viewport_service.get_viewport(self._workspace_id, key, graph, positions, bounds, zoom)
+
+    def query_neighborhood(self, node_id: str, depth: int = 1, limit: int = 100,
+                           outgoing_only: bool = False) -> ColumnarGraph:
+        """
+        Returns a node with its neighbours up to a depth and the edges between them, read
+        without loading the rest of the graph. Filters are not applied.
+
+        :param node_id: ID of the node
+        :type node_id: str
+        :param depth: Maximum number of edges between the node and its neighbours
+        :type depth: int
+        :param limit: Maximum number of neighbours
+        :type limit: int
+        :param outgoing_only: Follow only outgoing edges, which yields the children of the node
+        :type outgoing_only: bool
+        :raises KeyError: If no data source is selected
+        :return: The neighborhood, empty if the node does not exist
+        :rtype: ColumnarGraph
+        """
+        self._require_data_source()
+        return self._graph_repository.query_neighborhood(self._workspace_id, node_id, depth, limit, outgoing_only)
+
+    def get_positions(self) -> Dict[str, Tuple[float, float]]:
+        """
+        Returns the precomputed layout positions of the nodes of the graph.
+
+        :raises KeyError: If no data source is selected
+        :return: Positions by node ID, empty if the context has no layout service
+        :rtype: Dict[str, Tuple[float, float]]
+        """
+        self._require_data_source()
+        if self._layout_service is None:
+            return {}
+        return self._layout_service.get_positions(self._workspace_id)
+
+    def get_tree_page(self, node_id: Optional[str] = None, offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """
+        Returns a page of the roots of the tree view of the filtered graph, or of the children
+        of a node in it.
+
+        :param node_id: ID of the node whose children are listed, None for the roots
+        :type node_id: Optional[str]
+        :param offset: Index of the first listed node
+        :type offset: int
+        :param limit: Maximum number of listed nodes
+        :type limit: int
+        :raises KeyError: If no data source is selected
+        :raises ValueError: If the context has no tree service
+        :return: The page, see `TreeService.get_page`
+        :rtype: Dict[str, Any]
+        """
+        self._require_data_source()
+        if self._tree_service is None:
+            raise ValueError("The tree view is not available")
+        return self._tree_service.get_page(self._workspace_id, self.filters, self.search_term,
+                                           node_id, offset, limit)
+
+    def get_tree_path(self, node_id: str) -> List[str]:
+        """
+        Returns the path from a root of the tree view of the filtered graph down to a node.
+
+        :param node_id: ID of the node
+        :type node_id: str
+        :raises KeyError: If no data source is selected
+        :raises ValueError: If the context has no tree service
+        :return: Node IDs from the root to the node, empty if the node is not in the graph
+        :rtype: List[str]
+        """
+        self._require_data_source()
+        if self._tree_service is None:
+            raise ValueError("The tree view is not available")
+        return self._tree_service.get_path(self._workspace_id, self.filters, self.search_term, node_id)
+
+    def set_summary_mode(self, enabled: bool):
+        """
+        Switches between showing the whole graph and showing it collapsed into its communities.
+        Expanded clusters are collapsed again either way.
+
+        :param enabled: Whether to show the summary
+        :type enabled: bool
+        :raises ValueError: If the context has no cluster service
+        """
+        if enabled and self._cluster_service is None:
+            raise ValueError("Graph summaries are not available")
+        self.summary_mode = enabled
+        self.expanded_clusters = set()
+
+    def expand_cluster(self, cluster_id: str):
+        """
+        Replaces a collapsed cluster of the summary by its sub-clusters and nodes.
+
+        :param cluster_id: ID of the cluster
+        :type cluster_id: str
+        """
+        self.expanded_clusters.add(cluster_id)
+
+    def collapse_cluster(self, cluster_id: str) -> bool:
+        """
+        Collapses an expanded cluster of the summary, together with the clusters expanded inside it.
+
+        :param cluster_id: ID of the cluster
+        :type cluster_id: str
+        :return: True if the cluster was expanded, otherwise False
+        :rtype: bool
+        """
+        if cluster_id not in self.expanded_clusters:
+            return False
+        self.expanded_clusters = {c for c in self.expanded_clusters
+                                  if c != cluster_id and not c.startswith(cluster_id + ".")}
+        return True
+
     def save_graph(self, graph: Graph):
         """
         Saves the given graph for the active workspace
@@ -108,9 +349,106 @@ class GraphContext(object):
         """
         self._graph_repository.save_graph(self._workspace_id, graph)
 
+    def get_node(self, node_id: str) -> Optional[Node]:
+        """
+        Returns a single node of the saved graph.
+
+        :param node_id: ID of the node
+        :type node_id: str
+        :raises KeyError: If no data source is selected
+        :return: The node, or None if it does not exist
+        :rtype: Optional[Node]
+        """
+        self._require_data_source()
+        return self._graph_repository.get_node(self._workspace_id, node_id)
+
+    def save_node(self, node: Node):
+        """
+        Creates a node or replaces the data of an existing one in the active workspace.
+
+        :param node: Node to save
+        :type node: Node
+        :raises KeyError: If no data source is selected
+        """
+        self._require_data_source()
+        previous_version = self._graph_repository.version(self._workspace_id)
+        self._graph_repository.upsert_node(self._workspace_id, node)
+        self._update_tree(previous_version, lambda forest: forest.add_node(node.id))
+
+    def delete_node(self, node_id: str) -> bool:
+        """
+        Deletes a node and its edges from the active workspace.
+
+        :param node_id: ID of the node
+        :type node_id: str
+        :raises KeyError: If no data source is selected
+        :return: True if the node existed, otherwise False
+        :rtype: bool
+        """
+        self._require_data_source()
+        previous_version = self._graph_repository.version(self._workspace_id)
+        deleted = self._graph_repository.delete_node(self._workspace_id, node_id)
+        self._update_tree(previous_version, lambda forest: forest.remove_node(node_id))
+        return deleted
+
+    def get_edge(self, src_id: str, target_id: str) -> Optional[Edge]:
+        """
+        Returns the edge between two nodes of the saved graph.
+
+        :param src_id: ID of the source node
+        :type src_id: str
+        :param target_id: ID of the target node
+        :type target_id: str
+        :raises KeyError: If no data source is selected
+        :return: The edge, or None if it does not exist
+        :rtype: Optional[Edge]
+        """
+        self._require_data_source()
+        return self._graph_repository.get_edge(self._workspace_id, src_id, target_id)
+
+    def save_edge(self, edge: Edge):
+        """
+        Creates an edge or replaces the data of an existing one in the active workspace.
+
+        :param edge: Edge to save
+        :type edge: Edge
+        :raises KeyError: If no data source is selected
+        """
+        self._require_data_source()
+        previous_version = self._graph_repository.version(self._workspace_id)
+        self._graph_repository.upsert_edge(self._workspace_id, edge)
+        self._update_tree(previous_version, lambda forest: forest.add_edge(edge.src.id, edge.target.id))
+
+    def delete_edge(self, src_id: str, target_id: str) -> bool:
+        """
+        Deletes the edge between two nodes from the active workspace.
+
+        :param src_id: ID of the source node
+        :type src_id: str
+        :param target_id: ID of the target node
+        :type target_id: str
+        :raises KeyError: If no data source is selected
+        :return: True if the edge existed, otherwise False
+        :rtype: bool
+        """
+        self._require_data_source()
+        previous_version = self._graph_repository.version(self._workspace_id)
+        deleted = self._graph_repository.delete_edge(self._workspace_id, src_id, target_id)
+        self._update_tree(previous_version, lambda forest: forest.remove_edge(src_id, target_id))
+        return deleted
+
+    def clear_graph(self):
+        """
+        Removes all nodes and edges from the active workspace.
+
+        :raises KeyError: If no data source is selected
+        """
+        self._require_data_source()
+        self._graph_repository.clear_graph(self._workspace_id)
+
     def select_data_source(self, data_source: DataSourcePlugin):
         """
-        Changes the active data source.
+        Changes the active data source and starts loading its data.
 
         :param data_source: The new data source
         :type data_source: DataSourcePlugin
@@ -119,18 +457,85 @@ class GraphContext(object):
         self._selected_data_source = data_source
         self._workspace_service.set_data_source(
             self._workspace_id, data_source.identifier())
-        self.refresh_data_source()
+        self.start_refresh()
 
     def refresh_data_source(self):
         """
-        Reloads data from the current data source.
+        Reloads data from the current data source, blocking until the graph is saved.
+
+        The data is written batch by batch as the data source streams it, see
+        `DataSourcePlugin.stream`.
 
         :raises KeyError: If no data source is selected
         """
         if self._selected_data_source is None:
             raise KeyError("No data source selected")
-        graph = self._selected_data_source.load(**self._data_source_config)
-        self._graph_repository.save_graph(self._workspace_id, graph)
+        stream = self._selected_data_source.stream(**self._data_source_config)
+        self._graph_repository.save_graph_stream(self._workspace_id, stream)
+
+    def start_refresh(self) -> Optional[Job]:
+        """
+        Starts reloading data from the current data source in the background. If a refresh of
+        the workspace is already running, that refresh is returned instead.
+
+        The current graph stays readable while the data loads. The new graph is written in a
+        single transaction as it is streamed, so readers never see a partially loaded graph. A
+        cancelled or failed refresh leaves the current graph unchanged.
+
+        Without a job service the data is reloaded synchronously.
+
+        :raises KeyError: If no data source is selected
+        :return: The refresh job, or None if the data was reloaded synchronously
+        :rtype: Optional[Job]
+        """
+        if self._selected_data_source is None:
+            raise KeyError("No data source selected")
+        if self._job_service is None:
+            self.refresh_data_source()
+            return None
+
+        # the job must not see later changes of the context, e.g. another data source
+        data_source = self._selected_data_source
+        config = dict(self._data_source_config)
+        graph_repository = self._graph_repository
+        workspace_id = self._workspace_id
+
+        def refresh(job: Job):
+            job.update(0, message=f"Loading data from {data_source.name()}")
+            graph_repository.save_graph_stream(workspace_id, data_source.stream(**config))
+
+        return self._job_service.submit(workspace_id, REFRESH_JOB, refresh)
+
+    def get_refresh_job(self) -> Optional[Job]:
+        """
+        Returns the pending or running data source refresh of the workspace, if any.
+
+        :rtype: Optional[Job]
+        """
+        if self._job_service is None:
+            return None
+        return self._job_service.get_active(self._workspace_id, REFRESH_JOB)
+
+    def get_layout_job(self) -> Optional[Job]:
+        """
+        Returns the pending or running layout computation of the workspace, if any.
+
+        :rtype: Optional[Job]
+        """
+        if self._layout_service is None:
+            return None
+        return self._layout_service.get_job(self._workspace_id)
+
+    def layout_pending(self) -> bool:
+        """
+        Returns whether the positions of the graph are provisional because its layout was not
+        computed for the current version yet.
+
+        :rtype: bool
+        """
+        if self._selected_data_source is None or self._layout_service is None:
+            return False
+        return not self._layout_service.is_current(self._workspace_id)
 
     def select_visualizer(self, visualizer: VisualizerPlugin):
         """
@@ -154,3 +559,36 @@ class GraphContext(object):
 
     def set_data_source_config(self, config: dict):
         self._data_source_config = config
+
+    def _render_graph(self, visualizer: VisualizerPlugin) -> str:
+        key = self.render_key() if self._render_cache is not None else None
+        if key is not None:
+            graph_html = self._render_cache.get(key)
+            if graph_html is not None:
+                return graph_html
+
+        positions = self._layout_service.get_positions(self._workspace_id) if self._layout_service else {}
+        if self.summary_mode and self._cluster_service is not None:
+            graph = self._graph_repository.query_columnar_graph(self._workspace_id, self.filters, self.search_term)
+            summary, positions = self._cluster_service.summarize(
+                self._workspace_id, graph, self.expanded_clusters, positions)
+            stream = GraphStream.from_graph(summary, SUMMARY_BATCH_SIZE)
+        else:
+            stream = self._graph_repository.stream_graph(
+                self._workspace_id, self.filters, self.search_term)
+        graph_html = "".join(visualizer.display_stream(stream, positions=positions))
+
+        if key is not None and not self.layout_pending():
+            # pages rendered from earlier versions of this graph can no longer be requested
+            workspace_id, version = self._workspace_id, key[1]
+            self._render_cache.remove_where(lambda k: k[0] == workspace_id and k[1] != version)
+            self._render_cache.put(key, graph_html, sys.getsizeof(graph_html))
+        return graph_html
+
+    def _update_tree(self, previous_version: Optional[int], change: Callable[[ForestIndex], None]):
+        if self._tree_service is not None:
+            self._tree_service.apply(self._workspace_id, previous_version, change)
+
+    def _require_data_source(self):
+        if self._selected_data_source is None:
+            raise KeyError("No data source selected")
@@ -1,25 +1,44 @@
-from typing import List
+from typing import List, Optional
 
 from api.components.data_source import DataSourcePlugin
 from api.components.visualizer import VisualizerPlugin
+from core.cache.sized_lru_cache import SizedLRUCache
 from core.models.workspace import Workspace
-from core.repositories.graph_repository.implementations.neo4j_graph_repository import Neo4JGraphRepository
+from core.repositories.graph_repository.interfaces.base_graph_repository import \
+    BaseGraphRepository
+from core.use_cases.cluster_service import ClusterService
 from core.use_cases.graph_context import GraphContext
+from core.use_cases.job_service import JobService
+from core.use_cases.layout_service import LayoutService
+from core.use_cases.tree_service import TreeService
+from core.use_cases.viewport_service import ViewportService
 from core.use_cases.workspaces import WorkspaceService
 
 
 class GraphContextFactory():
     def __init__(self, 
                  workspace_service: WorkspaceService,
-                 graph_repository: Neo4JGraphRepository,
+                 graph_repository: BaseGraphRepository,
                  data_source_plugins: List[DataSourcePlugin],
-                 visualizer_plugins: List[VisualizerPlugin]
+                 visualizer_plugins: List[VisualizerPlugin],
+                 render_cache: Optional[SizedLRUCache[str]] = None,
+                 layout_service: Optional[LayoutService] = None,
+                 viewport_service: Optional[ViewportService] = None,
+                 cluster_service: Optional[ClusterService] = None,
+                 tree_service: Optional[TreeService] = None,
+                 job_service: Optional[JobService] = None
                  ):
         self.data_source_map = {p.identifier(): p for p in data_source_plugins}
         self.visualizer_map = {p.identifier(): p for p in visualizer_plugins}
         self.workspace_service = workspace_service
         self.graph_repository = graph_repository
         self.visualizer_plugins = visualizer_plugins
+        self.render_cache = render_cache
+        self.layout_service = layout_service
+        self.viewport_service = viewport_service
+        self.cluster_service = cluster_service
+        self.tree_service = tree_service
+        self.job_service = job_service
 
     def make(self, workspace: Workspace):
         # Create the initial graph context
@@ -36,4 +55,10 @@ class GraphContextFactory():
             current_visualizer,
             self.workspace_service,
             self.graph_repository,
+            self.render_cache,
+            self.layout_service,
+            self.viewport_service,
+            self.cluster_service,
+            self.tree_service,
+            self.job_service,
         )
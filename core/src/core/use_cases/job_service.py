@@ -0,0 +1,125 @@
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from api.components.progress import LoadCancelled, listening
+from core.models.job import Job, JobState
+
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_MAX_FINISHED = 50
+
+
+class JobService(object):
+    """
+    Runs long tasks, e.g. data source refreshes, in background threads and keeps track of them,
+    so that requests starting them return at once and the page can poll their progress.
+
+    At most one job of a kind runs per workspace: submitting a job while one of the same kind is
+    pending or running for the workspace returns the existing job. Finished jobs are kept for
+    status queries, the oldest are dropped once there are more than `max_finished` of them.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, max_finished: int = DEFAULT_MAX_FINISHED):
+        """
+        Initializes the service.
+
+        :param max_workers: Maximum number of jobs running at the same time
+        :type max_workers: int
+        :param max_finished: Maximum number of finished jobs kept for status queries
+        :type max_finished: int
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="job")
+        self._max_finished = max_finished
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._active: Dict[Tuple[str, str], Job] = {}
+
+    def submit(self, workspace_id: str, kind: str, task: Callable[[Job], None]) -> Job:
+        """
+        Starts a job, unless one of the same kind is already active for the workspace.
+
+        The task runs in a background thread. It can report its progress through the job or
+        through `report_progress`, and should stop when the job is cancelled. A task that raises
+        `LoadCancelled` ends the job as cancelled, any other exception ends it as failed.
+
+        :param workspace_id: ID of the workspace the job works on
+        :type workspace_id: str
+        :param kind: Kind of the job, e.g. "refresh"
+        :type kind: str
+        :param task: The work, called with the job
+        :type task: Callable[[Job], None]
+        :return: The started job, or the active job of the same kind
+        :rtype: Job
+        """
+        with self._lock:
+            active = self._active.get((workspace_id, kind))
+            if active is not None:
+                return active
+            job = Job(uuid.uuid4().hex, workspace_id, kind)
+            self._jobs[job.id] = job
+            self._active[(workspace_id, kind)] = job
+            self._prune()
+        self._executor.submit(self._run, job, task)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Returns a job by its ID, or None if it does not exist or was dropped.
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def get_active(self, workspace_id: str, kind: str) -> Optional[Job]:
+        """
+        Returns the pending or running job of a kind for a workspace, if any.
+        """
+        with self._lock:
+            return self._active.get((workspace_id, kind))
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Requests a job to stop.
+
+        :param job_id: ID of the job
+        :type job_id: str
+        :raises KeyError: If the job does not exist
+        :return: False if the job had already finished, otherwise True
+        :rtype: bool
+        """
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(f"Job not found: {job_id}")
+        return job.cancel()
+
+    def shutdown(self):
+        """
+        Cancels all active jobs and waits for them to stop.
+        """
+        with self._lock:
+            active = list(self._active.values())
+        for job in active:
+            job.cancel()
+        self._executor.shutdown(wait=True)
+
+    def _run(self, job: Job, task: Callable[[Job], None]):
+        try:
+            if job.is_cancelled():
+                raise LoadCancelled()
+            job.start()
+            with listening(job):
+                task(job)
+            state, error = JobState.SUCCEEDED, None
+        except LoadCancelled:
+            state, error = JobState.CANCELLED, None
+        except Exception as e:
+            state, error = JobState.FAILED, str(e) or type(e).__name__
+        with self._lock:
+            job.finish(state, error)
+            if self._active.get((job.workspace_id, job.kind)) is job:
+                del self._active[(job.workspace_id, job.kind)]
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.state.is_finished()]
+        for job in finished[:max(0, len(finished) - self._max_finished)]:
+            del self._jobs[job.id]
@@ -0,0 +1,157 @@
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from core.layout.force_layout import DEFAULT_ITERATIONS, force_layout
+from core.models.job import Job
+from core.repositories.graph_repository.interfaces.base_graph_repository import \
+    BaseGraphRepository
+from core.use_cases.job_service import JobService
+
+WARM_START_ITERATIONS = 30
+MAX_NODE_ITERATIONS = 1_000_000
+"""Bound of iterations times nodes of a layout computed from scratch."""
+LAYOUT_JOB = "layout"
+
+Positions = Dict[str, Tuple[float, float]]
+
+
+class LayoutService(object):
+    """
+    Computes node positions on the server, once per graph version, and stores them
+    in the graph repository so that visualizers can render pre-positioned nodes.
+
+    A layout is recomputed when the graph version changes. Nodes that already have a stored
+    position start from it, so an edited graph keeps its shape and settles in a few iterations.
+    With a job service layouts are computed in background jobs, and requests get the positions
+    known so far until the job is done.
+
+    An iteration costs about 0.35s per 20,000 nodes and 40,000 edges, so a layout from scratch
+    runs at most `MAX_NODE_ITERATIONS` / node count iterations (and no fewer than a warm start):
+    the full 150 iterations took 48s at that size, the capped 50 take 18s.
+    """
+
+    def __init__(self, graph_repository: BaseGraphRepository, job_service: Optional[JobService] = None,
+                 iterations: int = DEFAULT_ITERATIONS):
+        """
+        Initializes the service.
+
+        :param graph_repository: Repository holding the graphs and their positions
+        :type graph_repository: BaseGraphRepository
+        :param job_service: Service running layouts in the background, layouts are computed
+                            synchronously without one
+        :type job_service: Optional[JobService]
+        :param iterations: Number of iterations of a layout computed from scratch
+        :type iterations: int
+        """
+        self._graph_repository = graph_repository
+        self._job_service = job_service
+        self._iterations = iterations
+        self._lock = threading.Lock()
+        # lock of every graph with a running or waiting computation, and the number of those
+        self._graph_locks: Dict[str, Tuple[threading.Lock, int]] = {}
+        self._layouts: Dict[str, Tuple[Optional[int], Positions]] = {}
+
+    def get_positions(self, graph_id: str) -> Positions:
+        """
+        Returns the positions of the nodes of a graph. If the graph changed since they were last
+        computed, a layout job is started and the positions known so far are returned: those of
+        the previous layout, or those stored by an earlier run. Nodes may lack positions then.
+
+        :param graph_id: ID of the graph
+        :type graph_id: str
+        :return: Positions by node ID
+        :rtype: Dict[str, Tuple[float, float]]
+        """
+        computed, current = self._computed(graph_id)
+        if current:
+            return computed[1]
+
+        if self._job_service is None:
+            return self._compute(graph_id)
+
+        self._job_service.submit(graph_id, LAYOUT_JOB, lambda job: self._compute(graph_id))
+        if computed is not None:
+            return computed[1]
+        return self._graph_repository.get_layout(graph_id)
+
+    def is_current(self, graph_id: str) -> bool:
+        """
+        Returns whether the positions of a graph were computed for its current version, i.e.
+        `get_positions` returns its final layout.
+
+        :param graph_id: ID of the graph
+        :type graph_id: str
+        :rtype: bool
+        """
+        return self._computed(graph_id)[1]
+
+    def get_job(self, graph_id: str) -> Optional[Job]:
+        """
+        Returns the pending or running layout job of a graph, if any. Positions returned
+        while there is one are provisional.
+
+        :param graph_id: ID of the graph
+        :type graph_id: str
+        :rtype: Optional[Job]
+        """
+        if self._job_service is None:
+            return None
+        return self._job_service.get_active(graph_id, LAYOUT_JOB)
+
+    def _computed(self, graph_id: str, version: Optional[int] = None
+                  ) -> Tuple[Optional[Tuple[Optional[int], Positions]], bool]:
+        # the last computed layout and whether it belongs to the current version of the graph
+        if version is None:
+            version = self._graph_repository.version(graph_id)
+        with self._lock:
+            computed = self._layouts.get(graph_id)
+        return computed, computed is not None and version is not None and computed[0] == version
+
+    def _compute(self, graph_id: str) -> Positions:
+        with self._lock:
+            graph_lock, users = self._graph_locks.get(graph_id, (threading.Lock(), 0))
+            self._graph_locks[graph_id] = (graph_lock, users + 1)
+        try:
+            # layouts of different graphs are computed concurrently, those of one graph in turn
+            with graph_lock:
+                return self._compute_locked(graph_id)
+        finally:
+            with self._lock:
+                graph_lock, users = self._graph_locks[graph_id]
+                if users == 1:
+                    del self._graph_locks[graph_id]
+                else:
+                    self._graph_locks[graph_id] = (graph_lock, users - 1)
+
+    def _compute_locked(self, graph_id: str) -> Positions:
+        version = self._graph_repository.version(graph_id)
+        computed, current = self._computed(graph_id, version)
+        if current:
+            return computed[1]
+
+        graph = self._graph_repository.query_columnar_graph(graph_id, [])
+        stored = self._graph_repository.get_layout(graph_id)
+        complete = all(node_id in stored for node_id in graph.node_ids)
+
+        if complete and (computed is None or version is None):
+            # positions stored by an earlier run, or by a repository without versions
+            positions = {node_id: stored[node_id] for node_id in graph.node_ids}
+        else:
+            initial = np.array([stored.get(node_id, (np.nan, np.nan)) for node_id in graph.node_ids],
+                               dtype=float).reshape(-1, 2)
+            known = (~np.isnan(initial).any(axis=1)).mean() if graph.node_count else 0.0
+            if known > 0.9:
+                iterations = WARM_START_ITERATIONS
+            else:
+                iterations = max(WARM_START_ITERATIONS,
+                                 min(self._iterations, MAX_NODE_ITERATIONS // max(graph.node_count, 1)))
+            result = force_layout(graph, initial=initial, iterations=iterations)
+            positions = {node_id: (round(float(x), 1), round(float(y), 1))
+                         for node_id, (x, y) in zip(graph.node_ids, result)}
+            self._graph_repository.save_layout(graph_id, positions)
+
+        with self._lock:
+            self._layouts[graph_id] = (version, positions)
+        return positions
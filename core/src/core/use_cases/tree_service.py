@@ -0,0 +1,157 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from core.models.filter import Filter, normalize_filters
+from core.repositories.graph_repository.interfaces.base_graph_repository import \
+    BaseGraphRepository
+from core.tree.forest_index import ForestIndex
+from core.tree.forest_store import ForestStore
+
+DEFAULT_PAGE_SIZE = 100
+
+
+class TreeService(object):
+    """
+    Serves the tree view from a spanning forest kept on the server, so that expanding a node
+    or finding the path to it is a lookup instead of a traversal in the browser.
+
+    One forest is kept per graph, for its current version, filters and search term. Changes of
+    single nodes and edges of the unfiltered graph are applied to its forest in place; any other
+    change rebuilds the forest on the next request. Forests of unfiltered graphs, built or
+    updated, are also saved to a store, keyed by graph version, and loaded from it while the
+    graph is unchanged, e.g. after a restart.
+    """
+
+    def __init__(self, graph_repository: BaseGraphRepository, store: Optional[ForestStore] = None):
+        """
+        Initializes the service.
+
+        :param graph_repository: Repository holding the graphs
+        :type graph_repository: BaseGraphRepository
+        :param store: Store of the forests of unfiltered graphs, if any
+        :type store: Optional[ForestStore]
+        """
+        self._graph_repository = graph_repository
+        self._store = store
+        self._lock = threading.Lock()
+        self._forests: Dict[str, Tuple[Hashable, ForestIndex]] = {}
+
+    def get_page(self,
+                 graph_id: str,
+                 filters: List[Filter],
+                 search_term: str,
+                 node_id: Optional[str] = None,
+                 offset: int = 0,
+                 limit: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        Returns a page of the roots of the forest, or of the children of a node.
+
+        :param graph_id: ID of the graph
+        :type graph_id: str
+        :param filters: Filters applied to the graph
+        :type filters: List[Filter]
+        :param search_term: Search term applied to the graph
+        :type search_term: str
+        :param node_id: ID of the node whose children are listed, None for the roots
+        :type node_id: Optional[str]
+        :param offset: Index of the first listed node
+        :type offset: int
+        :param limit: Maximum number of listed nodes
+        :type limit: int
+        :return: A dictionary with the keys:
+            - node_id: the given node ID
+            - total: number of roots or children
+            - node_count: number of nodes in the forest
+            - offset: the given offset
+            - items: the listed nodes, each with its id, number of children, number of parents,
+              depth and component
+        :rtype: Dict[str, Any]
+        """
+        with self._lock:
+            forest = self._get_forest(graph_id, filters, search_term)
+            if node_id is None:
+                ids, total = forest.roots(offset, limit), forest.root_count()
+            else:
+                ids, total = forest.children(node_id, offset, limit), forest.child_count(node_id)
+            items = [{
+                "id": item_id,
+                "children": forest.child_count(item_id),
+                "parents": len(forest.parents(item_id)),
+                "depth": forest.depth(item_id),
+                "component": forest.component(item_id),
+            } for item_id in ids]
+            node_count = forest.node_count
+        return {"node_id": node_id, "total": total, "node_count": node_count, "offset": offset, "items": items}
+
+    def get_path(self, graph_id: str, filters: List[Filter], search_term: str, node_id: str) -> List[str]:
+        """
+        Returns the path from the root of a node down to the node in the spanning forest.
+
+        :param graph_id: ID of the graph
+        :type graph_id: str
+        :param filters: Filters applied to the graph
+        :type filters: List[Filter]
+        :param search_term: Search term applied to the graph
+        :type search_term: str
+        :param node_id: ID of the node
+        :type node_id: str
+        :return: Node IDs from the root to the node, empty if the node is not in the graph
+        :rtype: List[str]
+        """
+        with self._lock:
+            return self._get_forest(graph_id, filters, search_term).path(node_id)
+
+    def apply(self, graph_id: str, previous_version: Optional[int], change: Callable[[ForestIndex], None]):
+        """
+        Applies a change just written to a graph to its forest, if the forest was built for the
+        unfiltered graph at the version the change was made to and the change is the only write
+        since, i.e. it advanced the version by one. Otherwise the forest is dropped.
+
+        :param graph_id: ID of the graph
+        :type graph_id: str
+        :param previous_version: Version of the graph before the change
+        :type previous_version: Optional[int]
+        :param change: Applies the change to a forest
+        :type change: Callable[[ForestIndex], None]
+        """
+        with self._lock:
+            cached = self._forests.pop(graph_id, None)
+            if cached is None or previous_version is None:
+                return
+            version = self._graph_repository.version(graph_id)
+            if version != previous_version + 1 or cached[0] != _key(previous_version, [], ""):
+                # another write, e.g. by another process, came in between
+                return
+            change(cached[1])
+            self._forests[graph_id] = (_key(version, [], ""), cached[1])
+            self._save(graph_id, version, cached[1])
+
+    def _get_forest(self, graph_id: str, filters: List[Filter], search_term: str) -> ForestIndex:
+        version = self._graph_repository.version(graph_id)
+        key = _key(version, filters, search_term)
+        cached = self._forests.get(graph_id)
+        if cached is not None and version is not None and cached[0] == key:
+            return cached[1]
+
+        stored = self._store is not None and version is not None and key == _key(version, [], "")
+        forest = self._store.load(graph_id, version) if stored else None
+        if forest is None:
+            graph = self._graph_repository.query_columnar_graph(graph_id, filters, search_term)
+            forest = ForestIndex.from_graph(graph)
+            if stored:
+                self._save(graph_id, version, forest)
+        self._forests[graph_id] = (key, forest)
+        return forest
+
+    def _save(self, graph_id: str, version: int, forest: ForestIndex):
+        if self._store is None:
+            return
+        try:
+            self._store.save(graph_id, version, forest)
+        except OSError:
+            # the forest is still served from memory
+            pass
+
+
+def _key(version: Optional[int], filters: List[Filter], search_term: str) -> Hashable:
+    return version, normalize_filters(filters), search_term
@@ -0,0 +1,231 @@
+import threading
+from typing import Any, Dict, Hashable, List, Tuple
+
+import numpy as np
+
+from api.models.columnar_graph import ColumnarGraph
+from core.layout.spatial_index import SpatialIndex
+
+DEFAULT_NODE_THRESHOLD = 5000
+DEFAULT_MAX_NODES = 2000
+DEFAULT_CLUSTER_PIXELS = 60.0
+
+Bounds = Tuple[float, float, float, float]
+
+
+class _ViewportIndex(object):
+    """
+    A graph with its node positions, edge arrays and spatial index.
+    Nodes without a position are left out of the index and never returned.
+    """
+
+    def __init__(self, graph: ColumnarGraph, positions: Dict[str, Tuple[float, float]]):
+        self.graph = graph
+        self.node_indexes = np.array([i for i, node_id in enumerate(graph.node_ids) if node_id in positions],
+                                     dtype=np.int64)
+        self.xy = np.array([positions[graph.node_ids[i]] for i in self.node_indexes], dtype=float).reshape(-1, 2)
+        self.spatial_index = SpatialIndex(self.xy)
+
+        # position of every graph node in the spatial index, -1 for nodes without a position
+        self.slot = np.full(graph.node_count, -1, dtype=np.int64)
+        self.slot[self.node_indexes] = np.arange(len(self.node_indexes))
+
+        offsets = np.frombuffer(graph.offsets, dtype=np.int64)
+        sources = np.repeat(np.arange(graph.node_count), np.diff(offsets))
+        targets = np.frombuffer(graph.targets, dtype=np.int64)
+        self.edge_sources = self.slot[sources]
+        self.edge_targets = self.slot[targets]
+
+        placed = (self.edge_sources >= 0) & (self.edge_targets >= 0)
+        self.degree = (np.bincount(self.edge_sources[placed], minlength=len(self.xy))
+                       + np.bincount(self.edge_targets[placed], minlength=len(self.xy)))
+
+
+class ViewportService(object):
+    """
+    Answers viewport queries over laid out graphs: given a rectangle in layout coordinates and a
+    zoom level, returns only what is visible in it.
+
+    When the rectangle holds few enough nodes, they are returned with their data, together with
+    the edges touching them. Otherwise nodes are aggregated into clusters, one per quadtree cell
+    of roughly `cluster_pixels` on screen, and edges into counted edges between clusters.
+    """
+
+    def __init__(self,
+                 node_threshold: int = DEFAULT_NODE_THRESHOLD,
+                 max_nodes: int = DEFAULT_MAX_NODES,
+                 cluster_pixels: float = DEFAULT_CLUSTER_PIXELS):
+        """
+        Initializes the service.
+
+        :param node_threshold: Graphs with more nodes are browsed through viewports
+        :type node_threshold: int
+        :param max_nodes: Maximum number of nodes or clusters in a response
+        :type max_nodes: int
+        :param cluster_pixels: On-screen size of the cells aggregated into a cluster
+        :type cluster_pixels: float
+        """
+        self.node_threshold = node_threshold
+        self.max_nodes = max_nodes
+        self.cluster_pixels = cluster_pixels
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, Tuple[Hashable, _ViewportIndex]] = {}
+
+    def applies_to(self, node_count: int) -> bool:
+        """
+        Returns whether a graph with the given number of nodes is too large to be rendered at
+        once and should be browsed through viewports instead.
+        """
+        return node_count > self.node_threshold
+
+    def get_viewport(self,
+                     graph_id: str,
+                     key: Hashable,
+                     graph: ColumnarGraph,
+                     positions: Dict[str, Tuple[float, float]],
+                     bounds: Bounds,
+                     zoom: float) -> Dict[str, Any]:
+        """
+        Returns the part of a graph visible in a viewport.
+
+        :param graph_id: ID of the graph, one index is kept per graph
+        :type graph_id: str
+        :param key: Identifies the graph contents (version, filters, ...); the index of a graph is
+                    rebuilt when its key changes
+        :type key: Hashable
+        :param graph: The graph, used only when the index has to be rebuilt
+        :type graph: ColumnarGraph
+        :param positions: Node positions by node ID, used only when the index has to be rebuilt
+        :type positions: Dict[str, Tuple[float, float]]
+        :param bounds: The viewport rectangle (min x, min y, max x, max y) in layout coordinates
+        :type bounds: Tuple[float, float, float, float]
+        :param zoom: Screen pixels per layout unit
+        :type zoom: float
+        :return: A dictionary with the keys:
+            - clustered: whether nodes were aggregated into clusters
+            - nodes: visible nodes (id, data, x, y)
+            - clusters: visible clusters (id, label, count, x, y)
+            - edges: edges touching visible nodes (src, tgt, data) or edges between clusters and
+              nodes (src, tgt, count), with the coordinates of both ends
+            - bounds: bounding box of the whole graph layout
+            - total_nodes: number of nodes with a position in the whole graph
+        :rtype: Dict[str, Any]
+        """
+        index = self._get_index(graph_id, key, graph, positions)
+        visible = index.spatial_index.query(*bounds)
+
+        if len(visible) <= self.max_nodes:
+            result = self._detail(index, visible)
+        else:
+            result = self._clusters(index, visible, zoom)
+
+        xy = index.xy
+        result["bounds"] = ([float(v) for v in xy.min(axis=0)] + [float(v) for v in xy.max(axis=0)]
+                            if len(xy) else None)
+        result["total_nodes"] = len(xy)
+        return result
+
+    def _get_index(self, graph_id: str, key: Hashable, graph: ColumnarGraph,
+                   positions: Dict[str, Tuple[float, float]]) -> _ViewportIndex:
+        with self._lock:
+            cached = self._indexes.get(graph_id)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+            index = _ViewportIndex(graph, positions)
+            self._indexes[graph_id] = (key, index)
+            return index
+
+    def _detail(self, index: _ViewportIndex, visible: np.ndarray) -> Dict[str, Any]:
+        graph, xy = index.graph, index.xy
+        nodes = [{
+            "id": graph.node_ids[index.node_indexes[i]],
+            "data": graph.node_data(int(index.node_indexes[i])),
+            "x": float(xy[i, 0]),
+            "y": float(xy[i, 1]),
+        } for i in visible]
+
+        shown = np.zeros(len(xy), dtype=bool)
+        shown[visible] = True
+        placed = (index.edge_sources >= 0) & (index.edge_targets >= 0)
+        touching = np.flatnonzero(placed & (shown[np.maximum(index.edge_sources, 0)]
+                                            | shown[np.maximum(index.edge_targets, 0)]))
+        edges = []
+        for position in touching[:4 * self.max_nodes]:
+            src, tgt = index.edge_sources[position], index.edge_targets[position]
+            edges.append({
+                "src": graph.node_ids[index.node_indexes[src]],
+                "tgt": graph.node_ids[index.node_indexes[tgt]],
+                "data": graph.edge_data(int(position)),
+                **_ends(xy, src, tgt),
+            })
+
+        return {
+            "clustered": False,
+            "nodes": nodes,
+            "clusters": [],
+            "edges": edges,
+            "truncated": len(touching) > len(edges),
+        }
+
+    def _clusters(self, index: _ViewportIndex, visible: np.ndarray, zoom: float) -> Dict[str, Any]:
+        graph, xy = index.graph, index.xy
+        level = index.spatial_index.level_for(self.cluster_pixels / max(zoom, 1e-9))
+        while True:
+            cells, group, counts = np.unique(index.spatial_index.cells(visible, level),
+                                             return_inverse=True, return_counts=True)
+            if len(cells) <= self.max_nodes or level == 0:
+                break
+            level -= 1
+
+        centre_x = np.bincount(group, weights=xy[visible, 0]) / counts
+        centre_y = np.bincount(group, weights=xy[visible, 1]) / counts
+        # the member with the most edges names the cluster
+        by_degree = np.lexsort((-index.degree[visible], group))
+        _, first = np.unique(group[by_degree], return_index=True)
+        representative = visible[by_degree[first]]
+
+        nodes: List[Dict[str, Any]] = []
+        clusters: List[Dict[str, Any]] = []
+        labels: List[str] = []
+        for g, cell in enumerate(cells):
+            member = int(representative[g])
+            node_id = graph.node_ids[index.node_indexes[member]]
+            if counts[g] == 1:
+                nodes.append({"id": node_id, "data": graph.node_data(int(index.node_indexes[member])),
+                              "x": float(xy[member, 0]), "y": float(xy[member, 1])})
+                labels.append(node_id)
+            else:
+                cluster_id = f"cluster:{level}:{int(cell)}"
+                clusters.append({"id": cluster_id, "label": node_id, "count": int(counts[g]),
+                                 "x": float(centre_x[g]), "y": float(centre_y[g])})
+                labels.append(cluster_id)
+
+        # aggregate edges between distinct groups, both ends visible
+        group_of = np.full(len(xy), -1, dtype=np.int64)
+        group_of[visible] = group
+        placed = (index.edge_sources >= 0) & (index.edge_targets >= 0)
+        src = group_of[np.maximum(index.edge_sources, 0)]
+        tgt = group_of[np.maximum(index.edge_targets, 0)]
+        keep = placed & (src >= 0) & (tgt >= 0) & (src != tgt)
+        src, tgt = src[keep], tgt[keep]
+        if not graph.directed:
+            src, tgt = np.minimum(src, tgt), np.maximum(src, tgt)
+        pairs, pair_counts = np.unique(src * len(cells) + tgt, return_counts=True)
+
+        centres = np.column_stack((centre_x, centre_y))
+        edges = []
+        for pair, count in sorted(zip(pairs, pair_counts), key=lambda p: -p[1])[:4 * self.max_nodes]:
+            a, b = divmod(int(pair), len(cells))
+            edges.append({"src": labels[a], "tgt": labels[b], "count": int(count), **_ends(centres, a, b)})
+
+        return {
+            "clustered": True,
+            "nodes": nodes,
+            "clusters": clusters,
+            "edges": edges,
+            "truncated": len(pairs) > len(edges),
+        }
+
+
+def _ends(xy: np.ndarray, a: int, b: int) -> Dict[str, float]:
+    return {"x1": float(xy[a, 0]), "y1": float(xy[a, 1]), "x2": float(xy[b, 0]), "y2": float(xy[b, 1])}
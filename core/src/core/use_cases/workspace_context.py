@@ -25,7 +25,7 @@ class WorkspaceContext(object):
 
         :param workspace_id: The ID of the workspace to activate.
         :type workspace_id: str
-        :param refresh: Whether to load new data from the data source after selection.
+        :param refresh: Whether to start loading new data from the data source after selection.
         :type refresh: bool
         :raises KeyError: If the specified workspace doesn't exist.
         """
@@ -37,7 +37,7 @@ class WorkspaceContext(object):
         self.graph_context = self.graph_context_factory.make(workspace)
 
         if refresh:
-            self.graph_context.refresh_data_source()
+            self.graph_context.start_refresh()
 
         return workspace
 
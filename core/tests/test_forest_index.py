@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from api.models.columnar_graph import ColumnarGraphBuilder
+from core.tree.forest_index import ForestIndex
+
+
+def _rebuild(nodes, edges, directed, root_id):
+    builder = ColumnarGraphBuilder(directed=directed, root_id=root_id)
+    for node_id in nodes:
+        builder.add_node(node_id, {})
+    for src_id, target_id in edges:
+        builder.add_edge(src_id, target_id, {})
+    return ForestIndex.from_graph(builder.build())
+
+
+def _snapshot(forest, nodes):
+    components = {}
+    for node_id in nodes:
+        components.setdefault(forest.component(node_id), []).append(node_id)
+    return {
+        "roots": forest.roots(),
+        "parent": {node_id: forest.parent(node_id) for node_id in nodes},
+        "depth": {node_id: forest.depth(node_id) for node_id in nodes},
+        "children": {node_id: forest.children(node_id) for node_id in nodes},
+        "parents": {node_id: forest.parents(node_id) for node_id in nodes},
+        "components": sorted(components.values()),
+    }
+
+
+@pytest.mark.parametrize("directed", [True, False])
+@pytest.mark.parametrize("seed", range(20))
+def test_updates_match_rebuild(directed, seed):
+    rng = random.Random(seed)
+    root_id = "n0" if seed % 2 else None
+    # insertion ordered, as the nodes and edges of a graph read back after the changes
+    nodes = dict.fromkeys(f"n{i}" for i in range(30))
+    edges = {}
+    for _ in range(30):
+        src_id, target_id = rng.sample(list(nodes), 2)
+        if directed or (target_id, src_id) not in edges:
+            edges[(src_id, target_id)] = None
+    forest = _rebuild(nodes, edges, directed, root_id)
+
+    for step in range(200):
+        operation = rng.random()
+        if operation < 0.35:
+            src_id, target_id = rng.choice(list(nodes)), rng.choice(list(nodes))
+            if (src_id, target_id) in edges or (not directed and (target_id, src_id) in edges):
+                continue
+            edges[(src_id, target_id)] = None
+            forest.add_edge(src_id, target_id)
+        elif operation < 0.7 and edges:
+            src_id, target_id = rng.choice(list(edges))
+            del edges[(src_id, target_id)]
+            forest.remove_edge(src_id, target_id)
+        elif operation < 0.85:
+            nodes[f"x{step}"] = None
+            forest.add_node(f"x{step}")
+        elif len(nodes) > 2:
+            node_id = rng.choice(list(nodes))
+            del nodes[node_id]
+            for edge in [edge for edge in edges if node_id in edge]:
+                del edges[edge]
+            forest.remove_node(node_id)
+
+        expected = _rebuild(nodes, edges, directed, root_id)
+        assert _snapshot(forest, nodes) == _snapshot(expected, nodes), f"after step {step}"
@@ -0,0 +1,37 @@
+from collections import Counter
+
+import numpy as np
+
+from core.clustering.label_propagation import label_propagation
+
+
+def _planted_partition(community_count, community_size, inner_degree, outer_degree, seed=0):
+    # edges inside a community are `inner_degree / outer_degree` times as frequent as edges between them
+    rng = np.random.default_rng(seed)
+    node_count = community_count * community_size
+    community = np.repeat(np.arange(community_count), community_size)
+    inner = node_count * inner_degree // 2
+    outer = node_count * outer_degree // 2
+    sources = rng.integers(0, node_count, inner + outer)
+    targets = np.r_[community[sources[:inner]] * community_size + rng.integers(0, community_size, inner),
+                    rng.integers(0, node_count, outer)]
+    distinct = sources != targets
+    return node_count, sources[distinct], targets[distinct], community
+
+
+def test_recovers_planted_partition():
+    node_count, sources, targets, community = _planted_partition(30, 200, 10, 2)
+    labels = label_propagation(node_count, sources, targets)
+
+    assert labels.max() + 1 <= 32
+    # every detected community lies within one planted community
+    purity = sum(Counter(community[labels == label]).most_common(1)[0][1]
+                 for label in range(labels.max() + 1)) / node_count
+    assert purity > 0.99
+
+
+def test_same_seed_gives_same_result():
+    node_count, sources, targets, _ = _planted_partition(10, 50, 6, 2)
+    first = label_propagation(node_count, sources, targets, seed=3)
+    assert np.array_equal(first, label_propagation(node_count, sources, targets, seed=3))
+
@@ -135,6 +135,25 @@ class Command(BaseCommand):
         filter_parser.add_argument('--operator', type=str, required=True, help='Filter operator')
         filter_parser.add_argument('--value', type=str, required=True, help='Filter value')
         
+        # Summarize command
+        summarize_parser = subparsers.add_parser(
+            CommandNames.SUMMARIZE, help='Show the graph collapsed into its communities')
+        summarize_parser.add_argument('--workspace', type=str, help='Workspace ID to use')
+        summarize_parser.add_argument('--state', type=str, choices=['on', 'off'], default='on',
+                                      help='Whether to show the summary')
+
+        # Expand cluster command
+        expand_cluster_parser = subparsers.add_parser(
+            CommandNames.EXPAND_CLUSTER, help='Expand a cluster of the graph summary')
+        expand_cluster_parser.add_argument('--workspace', type=str, help='Workspace ID to use')
+        expand_cluster_parser.add_argument('--id', type=str, required=True, help='Cluster ID')
+
+        # Collapse cluster command
+        collapse_cluster_parser = subparsers.add_parser(
+            CommandNames.COLLAPSE_CLUSTER, help='Collapse an expanded cluster of the graph summary')
+        collapse_cluster_parser.add_argument('--workspace', type=str, help='Workspace ID to use')
+        collapse_cluster_parser.add_argument('--id', type=str, required=True, help='Cluster ID')
+
         # Clear graph command
         clear_graph_parser = subparsers.add_parser(
             CommandNames.CLEAR_GRAPH, help='Clear all nodes and edges from the graph')
@@ -0,0 +1,19 @@
+from django.apps import apps
+
+from core.application import Application
+
+
+class RequestScopeMiddleware:
+    """
+    Handles every request inside the core application's request scope, so that graph versions
+    are read from the database once per request rather than by every component using them.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        core_app: Application = apps.get_app_config(
+            'graph_explorer').core_app  # type: ignore
+        with core_app.request_scope():
+            return self.get_response(request)
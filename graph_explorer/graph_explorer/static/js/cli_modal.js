@@ -38,6 +38,12 @@ cliHelpBtn.onclick = () => {
     `      Example: filter --field name --operator eq --value John\n` +
     `  operators: eq (equal), neq (not equal), gt (greater than), gte (greater than or equal to), lt (less than), lte (less than or equal to)\n` +
     `  clear-graph\n` +
+    `  summarize [--state on|off]\n` +
+    `      Example: summarize --state on\n` +
+    `  expand-cluster --id &lt;cluster id&gt;\n` +
+    `      Example: expand-cluster --id c3\n` +
+    `  collapse-cluster --id &lt;cluster id&gt;\n` +
+    `      Example: collapse-cluster --id c3\n` +
     `</pre>`;
   cliResult.className = "cli-modal-result";
 };
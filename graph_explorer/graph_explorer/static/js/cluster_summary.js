@@ -0,0 +1,44 @@
+function postClusterAction(url, body) {
+  // Show skeleton loader
+  if (window.skeletonLoader) {
+    window.skeletonLoader.show();
+  }
+
+  const csrfToken = document.querySelector("[name=csrfmiddlewaretoken]").value;
+  fetch(url, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      "X-CSRFToken": csrfToken,
+    },
+    body: JSON.stringify(body),
+  })
+    .then((response) => {
+      if (!response.ok) {
+        return response
+          .json()
+          .then((errData) => {
+            showErrorModal(errData.error || "Server error");
+          })
+          .catch((err) => {
+            showErrorModal(err.error || "Server error");
+          });
+      }
+      location.reload();
+    })
+    .catch((error) => {
+      showErrorModal(error || "Server error");
+    });
+}
+
+function setSummaryMode(state) {
+  postClusterAction("/summarize/", { state });
+}
+
+function expandCluster(cluster_id) {
+  postClusterAction("/expand-cluster/", { cluster_id });
+}
+
+function collapseCluster(cluster_id) {
+  postClusterAction("/collapse-cluster/", { cluster_id });
+}
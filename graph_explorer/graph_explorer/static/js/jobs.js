@@ -0,0 +1,86 @@
+const JOB_POLL_INTERVAL = 1000;
+
+function watchJob(element) {
+  const jobId = element.dataset.jobId;
+  const progress = element.querySelector("progress");
+  const message = element.querySelector(".job-status-message");
+
+  const cancelButton = element.querySelector(".job-cancel");
+  if (cancelButton) {
+    cancelButton.addEventListener("click", () => cancelJob(jobId));
+  }
+
+  function poll() {
+    fetch(`/jobs/${jobId}/`)
+      .then((response) =>
+        response.json().then((data) => {
+          if (!response.ok) {
+            throw data.error || "Server error";
+          }
+          return data;
+        })
+      )
+      .then((job) => {
+        showJob(job);
+        if (job.state === "succeeded" || job.state === "cancelled") {
+          location.reload();
+        } else if (job.state === "failed") {
+          element.remove();
+          showErrorModal(`${element.dataset.failureMessage}: ${job.error}`);
+        } else {
+          setTimeout(poll, JOB_POLL_INTERVAL);
+        }
+      })
+      .catch((error) => {
+        element.remove();
+        showErrorModal(error || "Server error");
+      });
+  }
+
+  function showJob(job) {
+    if (job.total) {
+      progress.max = job.total;
+      progress.value = job.done;
+    } else {
+      // unknown total, the progress bar stays indeterminate
+      progress.removeAttribute("value");
+    }
+    let text = job.message || "Loading data";
+    if (job.done) {
+      text += job.total ? ` (${job.done}/${job.total})` : ` (${job.done})`;
+    }
+    message.textContent = text;
+  }
+
+  poll();
+}
+
+function cancelJob(jobId) {
+  const csrfToken = document.querySelector("[name=csrfmiddlewaretoken]").value;
+
+  fetch(`/jobs/${jobId}/cancel/`, {
+    method: "POST",
+    headers: {
+      "X-CSRFToken": csrfToken,
+    },
+  })
+    .then((response) => {
+      if (!response.ok) {
+        return response
+          .json()
+          .then((errData) => {
+            showErrorModal(errData.error || "Server error");
+          })
+          .catch((err) => {
+            showErrorModal(err.error || "Server error");
+          });
+      }
+    })
+    .catch((error) => {
+      showErrorModal(error || "Server error");
+    });
+}
+
+document.addEventListener("DOMContentLoaded", () => {
+  document.querySelectorAll(".job-status[data-job-id]").forEach(watchJob);
+});
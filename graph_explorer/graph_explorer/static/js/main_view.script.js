@@ -12,34 +12,51 @@ document.addEventListener("DOMContentLoaded", () => {
     };
   });
 
+  const nodeById = new Map(nodes.map((n) => [n.id, n]));
   const links = linkElements.map((elem) => {
     const data = elem.__data__;
     return {
       ...data,
-      source: nodes.find((n) => n.id === elem.__data__.source.id),
-      target: nodes.find((n) => n.id === elem.__data__.target.id),
+      source: nodeById.get(data.source.id),
+      target: nodeById.get(data.target.id),
     };
   });
 
-  const simulation = d3
-    .forceSimulation(nodes)
-    .force("link", d3.forceLink(links).distance(350))
-    .force("charge", d3.forceManyBody().strength(100))
-    .force("center", d3.forceCenter(500, 400))
-    .force("gravity", d3.forceManyBody().strength(-100))
-    .force("collide", d3.forceCollide().radius(100))
-    .on("tick", tick);
+  // links drawn bent because the opposite link exists as well, computed once
+  const linkKeys = new Set(links.map((l) => `${l.source.id}\u0000${l.target.id}`));
+  const hasReverse = links.map(
+    (l) =>
+      l.source.id !== l.target.id &&
+      linkKeys.has(`${l.target.id}\u0000${l.source.id}`)
+  );
+
+  // visualizers may render nodes at positions computed on the server,
+  // otherwise the layout is simulated in the browser
+  const prepositioned =
+    nodes.length > 0 &&
+    nodes.every((n) => Number.isFinite(n.x) && Number.isFinite(n.y));
+
+  const simulation = prepositioned
+    ? null
+    : d3
+        .forceSimulation(nodes)
+        .force("link", d3.forceLink(links).distance(350))
+        .force("charge", d3.forceManyBody().strength(100))
+        .force("center", d3.forceCenter(500, 400))
+        .force("gravity", d3.forceManyBody().strength(-100))
+        .force("collide", d3.forceCollide().radius(100))
+        .on("tick", tick);
+
+  if (prepositioned) {
+    tick();
+  }
 
   function tick() {
     svg
       .selectAll("path.link")
       .data(links)
-      .attr("d", function (d) {
-        const reverse = links.find(
-          (l) => l.source.id === d.target.id && l.target.id === d.source.id
-        );
-
-        if (reverse && reverse !== d) {
+      .attr("d", function (d, i) {
+        if (hasReverse[i]) {
           const offset = 20;
 
           const dx = d.target.x - d.source.x;
@@ -67,15 +84,23 @@ document.addEventListener("DOMContentLoaded", () => {
     d3
       .drag()
       .on("start", (event, d) => {
+        if (!simulation) return;
         if (!event.active) simulation.alphaTarget(0.3).restart();
         d.fx = d.x;
         d.fy = d.y;
       })
       .on("drag", (event, d) => {
+        if (!simulation) {
+          d.x = event.x;
+          d.y = event.y;
+          tick();
+          return;
+        }
         d.fx = event.x;
         d.fy = event.y;
       })
       .on("end", (event, d) => {
+        if (!simulation) return;
         if (!event.active) simulation.alphaTarget(0);
         d.fx = null;
         d.fy = null;
@@ -87,11 +112,53 @@ document.addEventListener("DOMContentLoaded", () => {
   const zoom = d3.zoom().on("zoom", handleZoom);
   d3.selectAll("svg[zoom='true']").call(zoom);
 
+  if (prepositioned) {
+    fitToView();
+  }
+
+  function fitToView() {
+    const zoomSvg = d3.select("svg[zoom='true']");
+    const svgNode = zoomSvg.node();
+    if (!svgNode) return;
+
+    const xs = nodes.map((n) => n.x);
+    const ys = nodes.map((n) => n.y);
+    const minX = Math.min(...xs);
+    const maxX = Math.max(...xs);
+    const minY = Math.min(...ys);
+    const maxY = Math.max(...ys);
+    const padding = 100;
+
+    const width = svgNode.clientWidth || 1000;
+    const height = svgNode.clientHeight || 800;
+    const scale = Math.min(
+      1,
+      width / (maxX - minX + 2 * padding),
+      height / (maxY - minY + 2 * padding)
+    );
+
+    zoomSvg.call(
+      zoom.transform,
+      d3.zoomIdentity
+        .translate(width / 2, height / 2)
+        .scale(scale)
+        .translate(-(minX + maxX) / 2, -(minY + maxY) / 2)
+    );
+  }
+
   d3.selectAll("g.node[click-focus='true']").on("click", function (event, d) {
     dispatchNodeFocusEvent(d.id);
     handleNodeFocus(d.id);
   });
 
+  // clusters of a graph summary expand on double click
+  d3.selectAll("g.node")
+    .filter((d) => d && d.data && d.data.cluster_id !== undefined)
+    .on("dblclick", (event, d) => {
+      event.stopPropagation();
+      expandCluster(d.data.cluster_id);
+    });
+
   function handleNodeFocus(nodeId) {
     d3.selectAll(".active-node")
       .selectAll("*:not(text)")
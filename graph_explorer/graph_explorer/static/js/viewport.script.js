@@ -0,0 +1,310 @@
+// Browsing of graphs too large to render at once: the main view and the bird view
+// fetch only the part of the graph visible in their viewport from /viewport/.
+// Double clicking a node fetches its neighbours from /neighborhood/ and keeps them shown.
+
+const VIEWPORT_FETCH_DELAY = 150;
+const NEIGHBORHOOD_LIMIT = 100;
+
+function fetchViewport(bounds, zoom) {
+  const params = new URLSearchParams({
+    x0: bounds.x0,
+    y0: bounds.y0,
+    x1: bounds.x1,
+    y1: bounds.y1,
+    zoom: zoom,
+  });
+  return fetch(`/viewport/?${params}`).then((response) =>
+    response.json().then((data) => {
+      if (!response.ok) throw new Error(data.error || "Failed to load viewport");
+      return data;
+    })
+  );
+}
+
+function fetchNeighborhood(nodeId, limit = NEIGHBORHOOD_LIMIT) {
+  const params = new URLSearchParams({ node_id: nodeId, depth: 1, limit: limit });
+  return fetch(`/neighborhood/?${params}`).then((response) =>
+    response.json().then((data) => {
+      if (!response.ok) throw new Error(data.error || "Failed to load neighborhood");
+      return data;
+    })
+  );
+}
+
+function fitTransform(graphBounds, width, height, padding = 40) {
+  const [minX, minY, maxX, maxY] = graphBounds;
+  const scale = Math.min(
+    (width - 2 * padding) / Math.max(maxX - minX, 1),
+    (height - 2 * padding) / Math.max(maxY - minY, 1)
+  );
+  return d3.zoomIdentity
+    .translate(width / 2, height / 2)
+    .scale(scale)
+    .translate(-(minX + maxX) / 2, -(minY + maxY) / 2);
+}
+
+function clusterRadius(count) {
+  return 8 + 3 * Math.log2(count);
+}
+
+// Draws a viewport response into a group, in screen coordinates of the given transform, so that
+// node sizes do not depend on the zoom level.
+function drawViewport(group, data, transform, options = {}) {
+  const x = (v) => transform.applyX(v);
+  const y = (v) => transform.applyY(v);
+
+  group
+    .selectAll("line.viewport-edge")
+    .data(data.edges, (d) => `${d.src}\u0000${d.tgt}`)
+    .join("line")
+    .attr("class", "viewport-edge")
+    .attr("x1", (d) => x(d.x1))
+    .attr("y1", (d) => y(d.y1))
+    .attr("x2", (d) => x(d.x2))
+    .attr("y2", (d) => y(d.y2))
+    .style("stroke", (d) => (d.pinned ? "#e65100" : "#1a699e82"))
+    .style("stroke-width", (d) => (d.count ? Math.min(1 + Math.log2(d.count), 6) : 1.5));
+
+  const clusters = group
+    .selectAll("g.viewport-cluster")
+    .data(data.clusters, (d) => d.id)
+    .join((enter) => {
+      const g = enter.append("g").attr("class", "viewport-cluster");
+      g.append("circle")
+        .style("fill", "#e3f2fd")
+        .style("stroke", "#04446fff")
+        .style("stroke-width", "1.5px");
+      if (options.labels !== false) {
+        g.append("text")
+          .attr("text-anchor", "middle")
+          .attr("dy", "0.35em")
+          .attr("font-size", 11)
+          .attr("fill", "#1a699e");
+      }
+      g.append("title");
+      return g;
+    })
+    .attr("transform", (d) => `translate(${x(d.x)},${y(d.y)})`);
+  clusters.select("circle").attr("r", (d) => clusterRadius(d.count));
+  clusters.select("text").text((d) => d.count);
+  clusters.select("title").text((d) => `${d.count} nodes around ${d.label}`);
+
+  const nodes = group
+    .selectAll("g.viewport-node")
+    .data(data.nodes, (d) => d.id)
+    .join((enter) => {
+      const g = enter
+        .append("g")
+        .attr("class", "viewport-node")
+        .attr("id", (d) => `ID:${d.id}`);
+      g.append("circle")
+        .attr("r", 6)
+        .style("fill", "white")
+        .style("stroke", "#04446fff")
+        .style("stroke-width", "1.5px");
+      if (options.labels !== false) {
+        g.append("text")
+          .attr("x", 9)
+          .attr("dy", "0.35em")
+          .attr("font-size", 12)
+          .attr("fill", "#1a699e");
+      }
+      g.append("title");
+      return g;
+    })
+    .attr("transform", (d) => `translate(${x(d.x)},${y(d.y)})`);
+  nodes.select("circle").style("stroke", (d) => (d.pinned ? "#e65100" : "#04446fff"));
+  nodes.select("text").text((d) => d.id);
+  nodes
+    .select("title")
+    .text((d) =>
+      [d.id, ...Object.entries(d.data || {}).map(([k, v]) => `${k}: ${v}`)].join("\n")
+    );
+
+  // nodes and clusters are drawn over the edges
+  group.selectAll("g.viewport-cluster, g.viewport-node").raise();
+  return nodes;
+}
+
+function initMainViewport() {
+  const svg = d3.select("#viewport-svg");
+  if (svg.empty()) return;
+  const svgNode = svg.node();
+  const content = svg.select("g.viewport-content");
+
+  let transform = d3.zoomIdentity;
+  let data = { nodes: [], clusters: [], edges: [] };
+  // neighbourhoods fetched on double click, shown whatever the viewport
+  const pinnedNodes = new Map();
+  const pinnedEdges = new Map();
+  let graphBounds = null;
+  let timer = null;
+  let requestId = 0;
+
+  function visibleBounds() {
+    const [x0, y0] = transform.invert([0, 0]);
+    const [x1, y1] = transform.invert([svgNode.clientWidth, svgNode.clientHeight]);
+    return { x0, y0, x1, y1 };
+  }
+
+  function withPinned() {
+    if (pinnedNodes.size === 0) return data;
+    const shown = new Set(data.nodes.map((n) => n.id));
+    const edgeKeys = new Set(data.edges.map((e) => `${e.src}\u0000${e.tgt}`));
+    return {
+      nodes: data.nodes.concat([...pinnedNodes.values()].filter((n) => !shown.has(n.id))),
+      clusters: data.clusters,
+      edges: data.edges.concat([...pinnedEdges.entries()].filter(([k]) => !edgeKeys.has(k)).map(([, e]) => e)),
+    };
+  }
+
+  function expand(nodeId) {
+    fetchNeighborhood(nodeId)
+      .then((response) => {
+        const positioned = new Map();
+        response.nodes.forEach((n) => {
+          if (n.x === undefined) return;
+          const node = { ...n, pinned: true };
+          positioned.set(n.id, node);
+          pinnedNodes.set(n.id, node);
+        });
+        response.edges.forEach((e) => {
+          const src = positioned.get(e.src);
+          const tgt = positioned.get(e.tgt);
+          if (!src || !tgt) return;
+          pinnedEdges.set(`${e.src}\u0000${e.tgt}`, {
+            ...e,
+            pinned: true,
+            x1: src.x,
+            y1: src.y,
+            x2: tgt.x,
+            y2: tgt.y,
+          });
+        });
+        redraw();
+      })
+      .catch((error) => console.error(error));
+  }
+
+  function redraw() {
+    drawViewport(content, withPinned(), transform)
+      .on("click", (event, d) => {
+        dispatchNodeFocusEvent(d.id);
+      })
+      .on("dblclick", (event, d) => {
+        event.stopPropagation();
+        expand(d.id);
+      });
+  }
+
+  function load() {
+    const bounds = visibleBounds();
+    // a margin around the viewport keeps short pans from showing empty space
+    const marginX = (bounds.x1 - bounds.x0) / 2;
+    const marginY = (bounds.y1 - bounds.y0) / 2;
+    const id = ++requestId;
+    fetchViewport(
+      {
+        x0: bounds.x0 - marginX,
+        y0: bounds.y0 - marginY,
+        x1: bounds.x1 + marginX,
+        y1: bounds.y1 + marginY,
+      },
+      transform.k
+    )
+      .then((response) => {
+        if (id !== requestId) return;
+        data = response;
+        redraw();
+        document.dispatchEvent(
+          new CustomEvent("viewport-change", {
+            detail: { bounds: bounds, graphBounds: graphBounds },
+          })
+        );
+      })
+      .catch((error) => console.error(error));
+  }
+
+  const zoom = d3
+    .zoom()
+    .scaleExtent([1e-4, 20])
+    .on("zoom", (event) => {
+      transform = event.transform;
+      redraw();
+      clearTimeout(timer);
+      timer = setTimeout(load, VIEWPORT_FETCH_DELAY);
+    });
+  svg.call(zoom).on("dblclick.zoom", null);
+
+  // the first request only finds the extent of the layout, the view is then fitted to it
+  fetchViewport({ x0: -Infinity, y0: -Infinity, x1: Infinity, y1: Infinity }, 1e-9)
+    .then((response) => {
+      if (!response.bounds) return;
+      graphBounds = response.bounds;
+      svg.call(
+        zoom.transform,
+        fitTransform(graphBounds, svgNode.clientWidth, svgNode.clientHeight)
+      );
+    })
+    .catch((error) => console.error(error));
+
+  document.addEventListener("viewport-center", (e) => {
+    svg.transition().duration(500).call(zoom.translateTo, e.detail.x, e.detail.y);
+  });
+
+  document.addEventListener("node-focus", (e) => {
+    const node =
+      pinnedNodes.get(e.detail) ||
+      data.nodes.find((n) => `ID:${n.id}` === e.detail || n.id === e.detail);
+    if (node) {
+      svg.transition().duration(750).call(zoom.translateTo, node.x, node.y);
+    }
+  });
+}
+
+function initBirdViewport() {
+  const svg = d3.select("#bird-view-svg");
+  if (svg.empty()) return;
+  const svgNode = svg.node();
+  const content = svg.select("g.viewport-content");
+  const frame = svg
+    .append("rect")
+    .attr("id", "bird-view-border")
+    .attr("fill", "none")
+    .attr("stroke-width", 2)
+    .attr("stroke", "red");
+
+  let transform = null;
+
+  document.addEventListener("viewport-change", (e) => {
+    const { bounds, graphBounds } = e.detail;
+    if (!graphBounds) return;
+
+    if (transform === null) {
+      // the overview is fetched once, at the zoom level of the bird view
+      transform = fitTransform(graphBounds, svgNode.clientWidth, svgNode.clientHeight, 10);
+      const [x0, y0] = transform.invert([0, 0]);
+      const [x1, y1] = transform.invert([svgNode.clientWidth, svgNode.clientHeight]);
+      fetchViewport({ x0, y0, x1, y1 }, transform.k)
+        .then((data) => drawViewport(content, data, transform, { labels: false }))
+        .catch((error) => console.error(error));
+    }
+
+    frame
+      .attr("x", transform.applyX(bounds.x0))
+      .attr("y", transform.applyY(bounds.y0))
+      .attr("width", (bounds.x1 - bounds.x0) * transform.k)
+      .attr("height", (bounds.y1 - bounds.y0) * transform.k);
+  });
+
+  svg.on("click", (event) => {
+    if (transform === null) return;
+    const [x, y] = transform.invert(d3.pointer(event, svgNode));
+    document.dispatchEvent(new CustomEvent("viewport-center", { detail: { x, y } }));
+  });
+}
+
+document.addEventListener("DOMContentLoaded", () => {
+  initBirdViewport();
+  initMainViewport();
+});
@@ -4,9 +4,18 @@ from . import views
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('graph-data/', views.graph_data, name='graph-data'),
+    path('viewport/', views.viewport, name='viewport'),
+    path('neighborhood/', views.neighborhood, name='neighborhood'),
+    path('tree/', views.tree_page, name='tree'),
+    path('tree/path/', views.tree_path, name='tree-path'),
+    path('node/', views.node_detail, name='node'),
     path('filter/', views.filter_view, name='filter'),
     path('select-visualizer/', views.select_visualizer),
     path('select-workspace/', views.select_workspace),
+    path('summarize/', views.summarize),
+    path('expand-cluster/', views.toggle_cluster, {'action': 'expand'}),
+    path('collapse-cluster/', views.toggle_cluster, {'action': 'collapse'}),
     path('workspace-form/', views.workspace_form),
     path('save-workspace/', views.save_workspace, name='save-workspace'),
     path('delete-workspace/<str:workspace_id>/', views.delete_workspace),
@@ -15,5 +24,8 @@ urlpatterns = [
     path('remove-search/', views.remove_search, name='remove-search'),
     path('data-source-config', views.data_source_config),
     path('refresh-data-source/', views.refresh_data_source),
+    path('jobs/<str:job_id>/', views.job_status, name='job-status'),
+    path('jobs/<str:job_id>/cancel/', views.cancel_job),
+    path('cache-stats/', views.cache_stats),
     path('cli/execute/', views.cli_command_view, name='cli_command'),
 ]
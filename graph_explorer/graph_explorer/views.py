@@ -1,18 +1,28 @@
 import json
+from typing import Iterator
 
 from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
 from django.http import (HttpRequest, HttpResponse, HttpResponseNotAllowed,
-                         JsonResponse)
+                         JsonResponse, StreamingHttpResponse)
 from django.shortcuts import redirect, render
 from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import condition
 
-from api.models.graph import Graph
+from api.models.graph_stream import GraphStream
 from core.application import Application
 from core.commands.command_names import CommandNames
 from core.commands.command_processor import CommandProcessor
 from core.use_cases.graph_context import GraphContext
 
 
+def _index_etag(request: HttpRequest) -> str | None:
+    core_app: Application = apps.get_app_config(
+        'graph_explorer').core_app  # type: ignore
+    return core_app.get_state_tag()
+
+
+@condition(etag_func=_index_etag)
 def index(request):
     graph_context: GraphContext = apps.get_app_config(
         'graph_explorer').graph_context  # type: ignore
@@ -23,17 +33,21 @@ def index(request):
     context = core_app.get_context()
     current_workspace = next(
         (w for w in context["workspaces"] if w.id == context["current_workspace_id"]), None)
-    if current_workspace:
+    if current_workspace and context.get("viewport_mode"):
+        # too large to list, the graph is fetched by viewport
+        context["current_workspace"] = current_workspace
+        context["graph_nodes"] = []
+        context["graph_edges"] = []
+    elif current_workspace:
         try:
-            graph = graph_context.get_graph()
+            stream = graph_context.stream_graph(apply_filters=False)
         except KeyError:
-            graph = Graph()
-        context["graph"] = graph
+            stream = GraphStream([], [])
         context["current_workspace"] = current_workspace
         context["graph_nodes"] = [{"id": n.id, "data": n.data}
-                                  for n in graph.get_nodes()]
+                                  for n in stream.iter_nodes()]
         context["graph_edges"] = [
-            {"src": e.src.id, "tgt": e.target.id, "data": e.data} for e in graph.get_edges()]
+            {"src": e.src.id, "tgt": e.target.id, "data": e.data} for e in stream.iter_edges()]
     else:
         context["current_workspace"] = None
         context["graph_nodes"] = []
@@ -41,6 +55,201 @@ def index(request):
     return render(request, "index.html", context)
 
 
+
+def graph_data(request: HttpRequest) -> HttpResponse:
+    """
+    Streams the graph of the current workspace, with the active filters applied, as JSON:
+    {"directed": ..., "root_id": ..., "nodes": [...], "edges": [...]}.
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(['GET'])
+
+    graph_context: GraphContext = apps.get_app_config(
+        'graph_explorer').graph_context  # type: ignore
+
+    try:
+        stream = graph_context.stream_graph()
+    except KeyError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return StreamingHttpResponse(_graph_json_chunks(stream), content_type="application/json")
+
+
+def viewport(request: HttpRequest) -> HttpResponse:
+    """
+    Returns the part of the filtered graph visible in a viewport as JSON, see
+    `GraphContext.get_viewport`. Query parameters: x0, y0, x1, y1 (the viewport rectangle in
+    layout coordinates) and zoom (screen pixels per layout unit).
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(['GET'])
+
+    graph_context: GraphContext = apps.get_app_config(
+        'graph_explorer').graph_context  # type: ignore
+
+    try:
+        bounds = tuple(float(request.GET[name]) for name in ("x0", "y0", "x1", "y1"))
+        zoom = float(request.GET.get("zoom", "1"))
+    except KeyError as e:
+        return JsonResponse({"error": f"Missing '{e.args[0]}'"}, status=400)
+    except ValueError:
+        return JsonResponse({"error": "Viewport coordinates must be numbers"}, status=400)
+
+    try:
+        result = graph_context.get_viewport(bounds, zoom)  # type: ignore
+    except (KeyError, ValueError) as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse(result, encoder=DjangoJSONEncoder)
+
+
+MAX_NEIGHBORHOOD_LIMIT = 1000
+
+
+def neighborhood(request: HttpRequest) -> HttpResponse:
+    """
+    Returns a node with its neighbours and the edges between them as JSON, see
+    `GraphContext.query_neighborhood`. Query parameters: node_id, depth (default 1),
+    limit (default 100) and direction ("both" or "out", the default is "both").
+
+    Nodes carry their layout position when one is known, and `truncated` tells whether
+    neighbours were left out because of the limit.
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(['GET'])
+
+    graph_context: GraphContext = apps.get_app_config(
+        'graph_explorer').graph_context  # type: ignore
+
+    try:
+        node_id = request.GET["node_id"]
+        depth = int(request.GET.get("depth", "1"))
+        limit = min(int(request.GET.get("limit", "100")), MAX_NEIGHBORHOOD_LIMIT)
+    except KeyError as e:
+        return JsonResponse({"error": f"Missing '{e.args[0]}'"}, status=400)
+    except ValueError:
+        return JsonResponse({"error": "Depth and limit must be integers"}, status=400)
+    direction = request.GET.get("direction", "both")
+    if depth < 1 or limit < 1 or direction not in ("both", "out"):
+        return JsonResponse({"error": "Invalid neighborhood parameters"}, status=400)
+
+    try:
+        # one node more than the limit tells whether the neighborhood was cut
+        graph = graph_context.query_neighborhood(node_id, depth, limit + 1, direction == "out")
+        positions = graph_context.get_positions()
+    except KeyError as e:
+        return JsonResponse({"error": str(e.args[0])}, status=400)
+
+    # the requested node comes first, so only a neighbour is ever dropped
+    kept = range(min(graph.node_count, limit + 1))
+    nodes = []
+    for i in kept:
+        node = {"id": graph.node_ids[i], "data": graph.node_data(i)}
+        if graph.node_ids[i] in positions:
+            node["x"], node["y"] = positions[graph.node_ids[i]]
+        nodes.append(node)
+    edges = [{"src": graph.node_ids[src], "tgt": graph.node_ids[tgt], "data": graph.edge_data(position)}
+             for src, tgt, position in graph.iter_edges() if src in kept and tgt in kept]
+
+    return JsonResponse({
+        "node_id": node_id,
+        "directed": graph.directed,
+        "root_id": graph.root_id,
+        "nodes": nodes,
+        "edges": edges,
+        "truncated": graph.node_count > limit + 1,
+    }, encoder=DjangoJSONEncoder)
+
+
+MAX_TREE_PAGE_SIZE = 500
+
+
+def tree_page(request: HttpRequest) -> HttpResponse:
+    """
+    Returns a page of the tree view as JSON, see `GraphContext.get_tree_page`. Query parameters:
+    node_id (the node whose children are listed, the roots when missing), offset (default 0)
+    and limit (default 100).
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(['GET'])
+
+    graph_context: GraphContext = apps.get_app_config(
+        'graph_explorer').graph_context  # type: ignore
+
+    try:
+        offset = int(request.GET.get("offset", "0"))
+        limit = min(int(request.GET.get("limit", "100")), MAX_TREE_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({"error": "Offset and limit must be integers"}, status=400)
+    if offset < 0 or limit < 1:
+        return JsonResponse({"error": "Invalid page"}, status=400)
+
+    try:
+        page = graph_context.get_tree_page(request.GET.get("node_id"), offset, limit)
+    except (KeyError, ValueError) as e:
+        return JsonResponse({"error": str(e.args[0])}, status=400)
+
+    return JsonResponse(page, encoder=DjangoJSONEncoder)
+
+
+def tree_path(request: HttpRequest) -> HttpResponse:
+    """
+    Returns the path from a root of the tree view down to a node as JSON. Query parameter: node_id.
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(['GET'])
+
+    graph_context: GraphContext = apps.get_app_config(
+        'graph_explorer').graph_context  # type: ignore
+
+    if "node_id" not in request.GET:
+        return JsonResponse({"error": "Missing 'node_id'"}, status=400)
+    try:
+        path = graph_context.get_tree_path(request.GET["node_id"])
+    except (KeyError, ValueError) as e:
+        return JsonResponse({"error": str(e.args[0])}, status=400)
+
+    return JsonResponse({"path": path})
+
+
+def node_detail(request: HttpRequest) -> HttpResponse:
+    """
+    Returns the data of a single node as JSON. Query parameter: node_id.
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(['GET'])
+
+    graph_context: GraphContext = apps.get_app_config(
+        'graph_explorer').graph_context  # type: ignore
+
+    if "node_id" not in request.GET:
+        return JsonResponse({"error": "Missing 'node_id'"}, status=400)
+    try:
+        node = graph_context.get_node(request.GET["node_id"])
+    except KeyError as e:
+        return JsonResponse({"error": str(e.args[0])}, status=400)
+    if node is None:
+        return JsonResponse({"error": "Node not found"}, status=404)
+
+    return JsonResponse({"id": node.id, "data": node.data}, encoder=DjangoJSONEncoder)
+
+
+def _graph_json_chunks(stream: GraphStream) -> Iterator[str]:
+    def dumps(value) -> str:
+        return json.dumps(value, cls=DjangoJSONEncoder)
+
+    yield f'{{"directed": {dumps(stream.directed)}, "root_id": {dumps(stream.root_id)}, "nodes": ['
+    separator = ""
+    for batch in stream.node_batches:
+        yield separator + ",".join(dumps({"id": n.id, "data": n.data}) for n in batch)
+        separator = ","
+    yield '], "edges": ['
+    separator = ""
+    for batch in stream.edge_batches:
+        yield separator + ",".join(dumps({"src": e.src.id, "tgt": e.target.id, "data": e.data}) for e in batch)
+        separator = ","
+    yield "]}"
+
 @csrf_protect
 def filter_view(request: HttpRequest):
     processor: CommandProcessor = apps.get_app_config(
@@ -98,6 +307,50 @@ def select_visualizer(request: HttpRequest) -> HttpResponse:
         return JsonResponse({"error": f"Visualizer not found: {visualizer_id}"}, status=400)
 
 
+def summarize(request: HttpRequest) -> HttpResponse:
+    if request.method != "POST":
+        return HttpResponseNotAllowed(['POST'])
+
+    processor: CommandProcessor = apps.get_app_config(
+        'graph_explorer').command_processor  # type: ignore
+
+    try:
+        data = json.loads(request.body)
+        success, message = processor.execute_command(
+            CommandNames.SUMMARIZE, {"state": data.get("state", "on")})
+
+        if not success:
+            return JsonResponse({"error": message}, status=400)
+
+        return JsonResponse({"message": message})
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+
+def toggle_cluster(request: HttpRequest, action: str) -> HttpResponse:
+    if request.method != "POST":
+        return HttpResponseNotAllowed(['POST'])
+
+    processor: CommandProcessor = apps.get_app_config(
+        'graph_explorer').command_processor  # type: ignore
+
+    try:
+        data = json.loads(request.body)
+        cluster_id = data.get("cluster_id")
+        if cluster_id is None:
+            return JsonResponse({"error": "Missing 'cluster_id'"}, status=400)
+
+        command = CommandNames.EXPAND_CLUSTER if action == "expand" else CommandNames.COLLAPSE_CLUSTER
+        success, message = processor.execute_command(command, {"id": cluster_id})
+
+        if not success:
+            return JsonResponse({"error": message}, status=400)
+
+        return JsonResponse({"message": message})
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+
 def select_workspace(request: HttpRequest) -> HttpResponse:
     if request.method != "POST":
         return HttpResponseNotAllowed(['POST'])
@@ -150,7 +403,7 @@ def save_workspace(request: HttpRequest) -> HttpResponse:
         if not success:
             return JsonResponse({"error": message}, status=400)
 
-        return JsonResponse({"message": message})
+        return JsonResponse({"message": message, "job": _refresh_job()})
 
     except json.JSONDecodeError:
         return JsonResponse({"error": "Invalid JSON"}, status=400)
@@ -275,9 +528,59 @@ def refresh_data_source(_: HttpRequest) -> HttpResponse:
     if not success:
         return JsonResponse({"error": message}, status=400)
 
+    return JsonResponse({"message": message, "job": _refresh_job()})
+
+
+def job_status(request: HttpRequest, job_id: str) -> HttpResponse:
+    """
+    Returns the state and progress of a background job, e.g. a data source refresh, as JSON.
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(['GET'])
+
+    app: Application = apps.get_app_config(
+        'graph_explorer').core_app  # type: ignore
+
+    job = app.get_job(job_id)
+    if job is None:
+        return JsonResponse({"error": f"Job not found: {job_id}"}, status=404)
+
+    return JsonResponse(job.to_dict())
+
+
+def cancel_job(request: HttpRequest, job_id: str) -> HttpResponse:
+    if request.method != "POST":
+        return HttpResponseNotAllowed(['POST'])
+
+    processor: CommandProcessor = apps.get_app_config(
+        'graph_explorer').command_processor  # type: ignore
+
+    success, message = processor.execute_command(
+        CommandNames.CANCEL_JOB, {"job_id": job_id})
+
+    if not success:
+        return JsonResponse({"error": message}, status=400)
+
     return JsonResponse({"message": message})
 
 
+def _refresh_job() -> dict | None:
+    graph_context: GraphContext = apps.get_app_config(
+        'graph_explorer').graph_context  # type: ignore
+    job = graph_context.get_refresh_job()
+    return job.to_dict() if job else None
+
+
+def cache_stats(request: HttpRequest) -> HttpResponse:
+    if request.method != "GET":
+        return HttpResponseNotAllowed(['GET'])
+
+    app: Application = apps.get_app_config(
+        'graph_explorer').core_app  # type: ignore
+
+    return JsonResponse(app.get_cache_stats())
+
+
 @csrf_exempt
 def cli_command_view(request: HttpRequest) -> HttpResponse:
     """
@@ -1,14 +1,18 @@
 from typing import List
 
 from api.components.data_source import DataSourceConfigParam, DataSourcePlugin
-from api.models.graph import Graph
+from api.models.columnar_graph import AnyGraph
+from api.models.graph_stream import GraphStream
 
-from .services import create_graph
+from .services import DEFAULT_CONCURRENCY, PostgresGraphReader
 
 
 class PostgresDataSource(DataSourcePlugin):
     """
     A data source that always returns rows from a PostgreSQL database with relationships between them.
+
+    Rows are streamed as they are read. Nodes and edges come from the same pass over the
+    tables, so the data source overrides `stream` rather than extending `StreamingDataSourcePlugin`.
     """
 
     def name(self) -> str:
@@ -17,15 +21,20 @@ class PostgresDataSource(DataSourcePlugin):
     def identifier(self) -> str:
         return "postgresql_datasource"
 
-    def load(self, **kwargs) -> Graph:
+    def load(self, **kwargs) -> AnyGraph:
+        return self.stream(**kwargs).to_columnar_graph()
+
+    def stream(self, **kwargs) -> GraphStream:
         host = kwargs.get("host")
         port = kwargs.get("port")
         database = kwargs.get("database")
         username = kwargs.get("username")
         password = kwargs.get("password")
         if host is None or port is None or database is None or username is None or password is None:
-            return Graph()
-        return create_graph(host, int(port), database, username, password)
+            return GraphStream([], [])
+        concurrency = int(kwargs.get("concurrency") or DEFAULT_CONCURRENCY)
+        return PostgresGraphReader(host, int(port), database, username, password,
+                                   concurrency=concurrency).stream()
 
     def get_configuration_parameters(self) -> List[DataSourceConfigParam]:
         return [
@@ -57,4 +66,11 @@ class PostgresDataSource(DataSourcePlugin):
                 display_name="Password",
                 value_type=DataSourceConfigParam.Type.PASSWORD,
             ),
+            DataSourceConfigParam(
+                name="concurrency",
+                display_name="Tables read in parallel",
+                value_type=DataSourceConfigParam.Type.INT,
+                required=False,
+                default=str(DEFAULT_CONCURRENCY),
+            ),
         ]
@@ -1,103 +1,263 @@
-from typing import Dict, List, Set
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from queue import Full, Queue
+from typing import Any, Dict, Generator, Iterator, List, Optional, Set, Tuple
 
 import psycopg2
+from psycopg2 import sql
+from psycopg2.extensions import ISOLATION_LEVEL_REPEATABLE_READ
+from psycopg2.pool import ThreadedConnectionPool
 
-from api.models.data import DataDict
+from api.components.progress import report_progress
 from api.models.edge import Edge
-from api.models.graph import Graph
+from api.models.graph_stream import GraphStream
 from api.models.node import Node
 
+ITER_SIZE = 2000
+"""Number of rows fetched from a server-side cursor in one round trip."""
 
-def create_graph(host: str, port: int, database: str, username: str, password: str) -> Graph:
-    conn = psycopg2.connect(
-        dbname=database,
-        user=username,
-        password=password,
-        host=host,
-        port=port
-    )
-    cursor = conn.cursor()
+BATCH_SIZE = 1000
+"""Number of nodes or edges in a batch of the stream."""
 
-    tables = _get_table_names(cursor)
-    primary_keys = _get_primary_keys(cursor)
+DEFAULT_CONCURRENCY = 4
+"""Number of tables read at the same time, each over its own connection."""
 
-    nodes = {}
-    table_columns: Dict[str, List[str]] = {}
+ForeignKey = Tuple[str, str, str, str]
+"""(source table, foreign key column, target table, target column)"""
 
-    # 1. Create nodes
-    for table in tables:
-        cursor.execute(f'SELECT * FROM "{table}"')
-        records = cursor.fetchall()
-        if cursor.description is None:
-            continue
-        columns = [col.name for col in cursor.description]
-        table_columns[table] = columns  # cache columns
-
-        # fallback: all columns as PK if no PK is set
-        pk_columns = primary_keys.get(table, set(columns))
-
-        for record in records:
-            pk_values = [str(val) for val, col in zip(
-                record, columns) if col in pk_columns]
-            node_id = f"{table}:{'_'.join(pk_values)}"
-            data = {col: val for col, val in zip(columns, record)}
-            node = Node(id=node_id, data={"table": table, **data})
-            nodes[node_id] = node
-
-    # 2. Create edges via foreign keys
-    fk_relations = _get_foreign_keys(cursor)
-    edges = set()
-
-    for src_table, fk_column, target_table, target_column in fk_relations:
-        src_pk_cols = primary_keys.get(src_table)
-        target_pk_cols = primary_keys.get(target_table)
-        if not src_pk_cols or not target_pk_cols:
-            continue
+TableTask = Tuple[int, str, Optional[Set[str]], List[Tuple[str, str, str, bool]]]
+"""(index, table, primary key columns, references) of a table to read"""
+
+NodeBatch = Tuple[bool, List[Node]]
+"""Nodes read from a table, and whether the table was read completely."""
+
+
+class PostgresGraphReader(object):
+    """
+    Reads the tables of the public schema of a PostgreSQL database as a graph: every row is a
+    node and every foreign key reference between rows is an edge.
+
+    Every table is read once, through a server-side cursor, so only `iter_size` rows per table
+    are held in memory at a time. Edges are derived from the foreign key columns of the rows as
+    they are read, only the IDs of their endpoints are kept until all nodes were streamed.
+
+    Up to `concurrency` tables are read at the same time, each over its own pooled connection.
+    All connections read the same snapshot, exported by a REPEATABLE READ transaction, so the
+    graph is consistent even when the database changes while it is read.
+
+    A reader streams the database once.
+    """
+
+    def __init__(self, host: str, port: int, database: str, username: str, password: str,
+                 iter_size: int = ITER_SIZE, concurrency: int = DEFAULT_CONCURRENCY):
+        self._connection_params = {
+            "host": host,
+            "port": port,
+            "dbname": database,
+            "user": username,
+            "password": password,
+        }
+        self.iter_size = iter_size
+        self.concurrency = max(1, concurrency)
+        # tables read concurrently only append to the lists and fill the lookups of their own
+        # columns, which needs no lock
+        # (source ID, target ID, relation) of references to single-column primary keys
+        self._edges: List[Tuple[str, str, str]] = []
+        # (source ID, (target table, target column), value, relation) of other references,
+        # resolved through the node IDs indexed by the values of the referenced columns
+        self._pending_edges: List[Tuple[str, Tuple[str, str], Any, str]] = []
+        self._lookups: Dict[Tuple[str, str], Dict[Any, str]] = {}
+
+    def stream(self) -> GraphStream:
+        """
+        Streams the nodes of all tables, then the edges between them. The database is read as
+        the node batches are consumed.
 
-        query = f"""
-            SELECT s.*, t.*
-            FROM "{src_table}" s
-            JOIN "{target_table}" t ON s."{fk_column}" = t."{target_column}"
+        :return: A stream over the graph.
+        :rtype: GraphStream
         """
-        cursor.execute(query)
-        links = cursor.fetchall()
+        return GraphStream.from_iterables(self._iter_nodes(), self._iter_edges(), BATCH_SIZE,
+                                          directed=True)
+
+    def _iter_nodes(self) -> Iterator[Node]:
+        conn = psycopg2.connect(**self._connection_params)
+        batches: Optional[Generator[NodeBatch, None, None]] = None
+        try:
+            conn.set_session(isolation_level=ISOLATION_LEVEL_REPEATABLE_READ, readonly=True)
+            with conn.cursor() as cursor:
+                tables = _get_table_names(cursor)
+                primary_keys = _get_primary_keys(cursor)
+                foreign_keys = _get_foreign_keys(cursor)
+
+            references = self._plan_references(foreign_keys, primary_keys)
+            tasks: List[TableTask] = [(i, table, primary_keys.get(table), references.get(table, []))
+                                      for i, table in enumerate(tables)]
+            if self.concurrency > 1 and len(tasks) > 1:
+                with conn.cursor() as cursor:
+                    # the snapshot stays importable while this transaction is open
+                    cursor.execute("SELECT pg_export_snapshot()")
+                    snapshot = cursor.fetchone()[0]
+                batches = self._read_tables_concurrently(snapshot, tasks)
+            else:
+                batches = self._read_tables(conn, tasks)
+
+            # progress is reported from the consuming thread, the one the load runs in
+            rows = read_tables = 0
+            report_progress(0, len(tasks), "Reading tables")
+            for finished, nodes in batches:
+                yield from nodes
+                rows += len(nodes)
+                read_tables += finished
+                report_progress(read_tables, len(tasks), f"Read {rows} rows")
+        finally:
+            if batches is not None:
+                # stops the reading threads before the snapshot goes away
+                batches.close()
+            conn.close()
+
+    def _read_tables(self, conn: Any, tasks: List[TableTask]) -> Generator[NodeBatch, None, None]:
+        for task in tasks:
+            batch: List[Node] = []
+            for node in self._read_table(conn, *task):
+                batch.append(node)
+                if len(batch) == self.iter_size:
+                    yield False, batch
+                    batch = []
+            yield True, batch
+
+    def _read_tables_concurrently(self, snapshot: str,
+                                  tasks: List[TableTask]) -> Generator[NodeBatch, None, None]:
+        pool = ThreadedConnectionPool(1, self.concurrency, **self._connection_params)
+        # bounded, so that tables are not read faster than the nodes are written
+        batches: Queue = Queue(maxsize=2 * self.concurrency)
+        stopped = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="postgres")
+        try:
+            for task in tasks:
+                executor.submit(self._extract_table, pool, snapshot, task, batches, stopped)
+            remaining = len(tasks)
+            while remaining:
+                finished, nodes, error = batches.get()
+                if error is not None:
+                    raise error
+                remaining -= finished
+                yield finished, nodes
+        finally:
+            # also reached when the consumer stops early, e.g. when the load is cancelled
+            stopped.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+            pool.closeall()
 
-        src_cols = table_columns[src_table]
-        tgt_cols = table_columns[target_table]
+    def _extract_table(self, pool: ThreadedConnectionPool, snapshot: str, task: TableTask,
+                       batches: Queue, stopped: threading.Event):
+        if stopped.is_set():
+            return
+        try:
+            conn = pool.getconn()
+            try:
+                conn.set_session(isolation_level=ISOLATION_LEVEL_REPEATABLE_READ, readonly=True)
+                with conn.cursor() as cursor:
+                    cursor.execute("SET TRANSACTION SNAPSHOT %s", (snapshot,))
+                batch: List[Node] = []
+                for node in self._read_table(conn, *task):
+                    batch.append(node)
+                    if len(batch) == self.iter_size:
+                        if not _put(batches, (False, batch, None), stopped):
+                            return
+                        batch = []
+                _put(batches, (True, batch, None), stopped)
+            finally:
+                conn.rollback()
+                pool.putconn(conn)
+        except Exception as e:
+            _put(batches, (True, [], e), stopped)
 
-        src_col_count = len(src_cols)
+    def _iter_edges(self) -> Iterator[Edge]:
+        for src_id, target_id, relation in self._edges:
+            yield Edge({"relation": relation}, Node(src_id, {}), Node(target_id, {}))
+        for src_id, key, value, relation in self._pending_edges:
+            target_id = self._lookups[key].get(value)
+            if target_id is not None:
+                yield Edge({"relation": relation}, Node(src_id, {}), Node(target_id, {}))
 
-        for link in links:
-            src_values = link[:src_col_count]
-            target_values = link[src_col_count:]
+    def _plan_references(self,
+                         foreign_keys: List[ForeignKey],
+                         primary_keys: Dict[str, Set[str]]) -> Dict[str, List[Tuple[str, str, str, bool]]]:
+        """
+        Groups the foreign keys by their source table as (column, target table, target column,
+        direct) tuples. References to a single-column primary key are direct: the target ID
+        follows from the value. The values of other referenced columns are indexed while
+        their tables are read.
+        """
+        references: Dict[str, List[Tuple[str, str, str, bool]]] = {}
+        for src_table, fk_column, target_table, target_column in foreign_keys:
+            if not primary_keys.get(src_table) or not primary_keys.get(target_table):
+                continue
+            direct = primary_keys[target_table] == {target_column}
+            if not direct:
+                self._lookups.setdefault((target_table, target_column), {})
+            references.setdefault(src_table, []).append((fk_column, target_table, target_column, direct))
+        return references
 
-            src_pk_values = [str(val) for val, col in zip(
-                src_values, src_cols) if col in src_pk_cols]
-            target_pk_values = [str(val) for val, col in zip(
-                target_values, tgt_cols) if col in src_pk_cols]
+    def _read_table(self,
+                    conn: Any,
+                    index: int,
+                    table: str,
+                    pk_columns: Optional[Set[str]],
+                    references: List[Tuple[str, str, str, bool]]) -> Iterator[Node]:
+        with conn.cursor(name=f"graph_explorer_table_{index}") as cursor:
+            cursor.itersize = self.iter_size
+            cursor.execute(sql.SQL("SELECT * FROM {}").format(sql.Identifier(table)))
 
-            src_node_id = f"{src_table}:{'_'.join(src_pk_values)}"
-            target_node_id = f"{target_table}:{'_'.join(target_pk_values)}"
+            columns: List[str] = []
+            pk_positions: List[int] = []
+            lookups: List[Tuple[int, Dict[Any, str]]] = []
+            reference_positions: List[Tuple[int, str, Tuple[str, str], bool, str]] = []
+            for record in cursor:
+                if not columns:
+                    # the description of a server-side cursor is known once rows arrive
+                    columns = [col.name for col in cursor.description]
+                    # fallback: all columns as PK if no PK is set
+                    pk_positions = [i for i, col in enumerate(columns) if col in (pk_columns or columns)]
+                    lookups = [(i, self._lookups[(table, col)]) for i, col in enumerate(columns)
+                               if (table, col) in self._lookups]
+                    reference_positions = [
+                        (columns.index(fk_column), target_table, (target_table, target_column), direct,
+                         f"{table}.{fk_column} -> {target_table}.{target_column}")
+                        for fk_column, target_table, target_column, direct in references]
 
-            src_node = nodes.get(src_node_id)
-            target_node = nodes.get(target_node_id)
+                node_id = f"{table}:{'_'.join(str(record[i]) for i in pk_positions)}"
+                for position, lookup in lookups:
+                    lookup[record[position]] = node_id
+                for position, target_table, key, direct, relation in reference_positions:
+                    value = record[position]
+                    if value is None:
+                        continue
+                    if direct:
+                        self._edges.append((node_id, f"{target_table}:{value}", relation))
+                    else:
+                        self._pending_edges.append((node_id, key, value, relation))
 
-            if src_node and target_node:
-                edge_data: DataDict = {
-                    "relation": f"{src_table}.{fk_column} -> {target_table}.{target_column}"
-                }
-                edge = Edge(data=edge_data, src=src_node, target=target_node)
-                edges.add(edge)
+                yield Node(id=node_id, data={"table": table, **dict(zip(columns, record))})
 
-    conn.close()
 
-    return Graph(nodes=set(nodes.values()), edges=edges, directed=True)
+def _put(batches: Queue, item: Tuple[bool, List[Node], Optional[Exception]], stopped: threading.Event) -> bool:
+    """
+    Waits for room in the queue until the reading is stopped. Returns whether the item was put.
+    """
+    while not stopped.is_set():
+        try:
+            batches.put(item, timeout=0.1)
+            return True
+        except Full:
+            continue
+    return False
 
 
 def _get_table_names(cursor) -> List[str]:
     cursor.execute("""
-        SELECT table_name 
-        FROM information_schema.tables 
+        SELECT table_name
+        FROM information_schema.tables
         WHERE table_schema = 'public'
     """)
     return [row[0] for row in cursor.fetchall()]
@@ -106,7 +266,7 @@ def _get_table_names(cursor) -> List[str]:
 def _get_primary_keys(cursor) -> Dict[str, Set[str]]:
     """
     Get primary key columns for each table.
-    Returns a dict: {table_name: [pk_column1, pk_column2, ...]}
+    Returns a dict: {table_name: {pk_column1, pk_column2, ...}}
     """
     cursor.execute("""
         SELECT
@@ -114,7 +274,7 @@ def _get_primary_keys(cursor) -> Dict[str, Set[str]]:
             kcu.column_name
         FROM
             information_schema.table_constraints tc
-            JOIN information_schema.key_column_usage kcu 
+            JOIN information_schema.key_column_usage kcu
                 ON tc.constraint_name = kcu.constraint_name
                 AND tc.table_schema = kcu.table_schema
         WHERE tc.constraint_type = 'PRIMARY KEY' AND tc.table_schema = 'public'
@@ -126,7 +286,7 @@ def _get_primary_keys(cursor) -> Dict[str, Set[str]]:
     return pk_info
 
 
-def _get_foreign_keys(cursor) -> List[Dict]:
+def _get_foreign_keys(cursor) -> List[ForeignKey]:
     """
     Get foreign key constraints between tables.
     Returns list of tuples: (source_table, fk_column, target_table, target_column)
@@ -137,8 +297,8 @@ def _get_foreign_keys(cursor) -> List[Dict]:
             kcu.column_name AS fk_column,
             ccu.table_name AS target_table,
             ccu.column_name AS target_column
-        FROM 
-            information_schema.table_constraints AS tc 
+        FROM
+            information_schema.table_constraints AS tc
             JOIN information_schema.key_column_usage AS kcu
                 ON tc.constraint_name = kcu.constraint_name
                 AND tc.table_schema = kcu.table_schema
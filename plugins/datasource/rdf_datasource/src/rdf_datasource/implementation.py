@@ -1,23 +1,34 @@
-from api.models.graph import Graph
+from api.models.columnar_graph import AnyGraph
+from api.models.graph_stream import GraphStream
 from api.components.data_source import DataSourceConfigParam, DataSourcePlugin
 from typing import List
+from .mapping import DEFAULT_EDGE_PREDICATES, DEFAULT_PROPERTY_PREDICATES, PredicateMapping
 from .services import ProxyRdfGraph
 
 class RdfDataSource(DataSourcePlugin):
-  
+
   def __init__(self):
     self.proxy_rdf_graph = ProxyRdfGraph()
-  
+
   def name(self) -> str:
     return "RDF Data Source"
-    
+
   def identifier(self) -> str:
     return "rdf_data_source"
-    
-  def load(self, **kwargs) -> Graph:
+
+  def load(self, **kwargs) -> AnyGraph:
+    filename = kwargs.get("filename")
+    return self.proxy_rdf_graph.create_graph(filename, self._mapping(kwargs))
+
+  def stream(self, **kwargs) -> GraphStream:
     filename = kwargs.get("filename")
-    return self.proxy_rdf_graph.create_graph(filename)
-    
+    return self.proxy_rdf_graph.stream_graph(filename, self._mapping(kwargs))
+
+  def _mapping(self, kwargs) -> PredicateMapping:
+    # blank form fields mean the defaults, for edges and properties alike
+    return PredicateMapping.parse((kwargs.get("edge_predicates") or "").strip() or DEFAULT_EDGE_PREDICATES,
+                                  (kwargs.get("property_predicates") or "").strip() or DEFAULT_PROPERTY_PREDICATES)
+
   def get_configuration_parameters(self) -> List[DataSourceConfigParam]:
     return [
       DataSourceConfigParam(
@@ -25,6 +36,19 @@ class RdfDataSource(DataSourcePlugin):
         value_type=DataSourceConfigParam.Type.STRING,
         display_name="File Name",
         required=True
+      ),
+      DataSourceConfigParam(
+        name="edge_predicates",
+        value_type=DataSourceConfigParam.Type.STRING,
+        display_name="Edge Predicates",
+        required=False,
+        default=DEFAULT_EDGE_PREDICATES
+      ),
+      DataSourceConfigParam(
+        name="property_predicates",
+        value_type=DataSourceConfigParam.Type.STRING,
+        display_name="Property Predicates",
+        required=False,
+        default=DEFAULT_PROPERTY_PREDICATES
       )
     ]
-    
\ No newline at end of file
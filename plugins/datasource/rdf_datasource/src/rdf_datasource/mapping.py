@@ -0,0 +1,144 @@
+import json
+import re
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Union
+
+from api.models.data import Value
+
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+PREFIXES = {
+  "ex": "http://example.org/",
+  "foaf": "http://xmlns.com/foaf/0.1/",
+  "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+  "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+  "owl": "http://www.w3.org/2002/07/owl#",
+  "xsd": XSD,
+  "schema": "http://schema.org/",
+  "dc": "http://purl.org/dc/elements/1.1/",
+  "dcterms": "http://purl.org/dc/terms/",
+  "skos": "http://www.w3.org/2004/02/skos/core#",
+}
+"""Prefixes that can be used in predicate mappings, e.g. "foaf:knows"."""
+
+DEFAULT_EDGE_PREDICATES = "ex:knows"
+DEFAULT_PROPERTY_PREDICATES = "ex:age, ex:gender"
+
+_INT_TYPES = {XSD + name for name in (
+  "integer", "int", "long", "short", "byte", "nonNegativeInteger", "positiveInteger",
+  "negativeInteger", "nonPositiveInteger", "unsignedLong", "unsignedInt", "unsignedShort",
+  "unsignedByte")}
+_FLOAT_TYPES = {XSD + "decimal", XSD + "double", XSD + "float"}
+_DATETIME_TYPES = {XSD + "dateTime", XSD + "dateTimeStamp"}
+
+_SEPARATOR = re.compile(r"[\s,]+")
+
+
+class Literal(NamedTuple):
+  """
+  An RDF literal as it appears in a file. IRIs and blank nodes are represented by strings.
+  """
+  lexical: str
+  datatype: Optional[str] = None
+  language: Optional[str] = None
+
+
+Term = Union[str, Literal]
+
+
+def literal_value(literal: Literal) -> Value:
+  """
+  Converts a literal to a node property value: numbers and date-times of XSD types are
+  converted, all other literals are kept as strings.
+  """
+  datatype = literal.datatype
+  try:
+    if datatype in _INT_TYPES:
+      return int(literal.lexical)
+    if datatype in _FLOAT_TYPES:
+      return float(literal.lexical)
+    if datatype in _DATETIME_TYPES:
+      return datetime.fromisoformat(literal.lexical)
+  except ValueError:
+    pass
+  return literal.lexical
+
+
+def local_name(iri: str) -> str:
+  return re.split(r"[/#]", iri.rstrip("/#"))[-1]
+
+
+def expand(name: str) -> str:
+  """
+  Returns the IRI of a predicate given as an IRI, optionally in angle brackets, or as a
+  prefixed name with one of the known `PREFIXES`.
+  """
+  if name.startswith("<") and name.endswith(">"):
+    return name[1:-1]
+  prefix, colon, rest = name.partition(":")
+  if colon and prefix in PREFIXES:
+    return PREFIXES[prefix] + rest
+  return name
+
+
+class PredicateMapping():
+  """
+  Tells which RDF predicates become edges and which become node properties.
+
+  Triples with an edge predicate become edges between their subject and object, with the
+  mapped name as the "connection" of the edge. Subjects of triples with a property predicate
+  get the object as a property under the mapped name. Nodes are created for the subjects
+  and objects of edges only.
+
+  :param edges: Mapping of edge predicate IRIs to connection names.
+  :type edges: Dict[str, str]
+  :param properties: Mapping of property predicate IRIs to property names.
+  :type properties: Dict[str, str]
+  """
+
+  def __init__(self, edges: Dict[str, str], properties: Dict[str, str]):
+    self.edges = edges
+    self.properties = properties
+
+  @classmethod
+  def parse(cls, edge_predicates: Optional[str] = None, property_predicates: Optional[str] = None) -> "PredicateMapping":
+    """
+    Parses a mapping from configuration values. Each is a list of predicates separated by
+    commas or whitespace, where every predicate is an IRI or a prefixed name, optionally
+    followed by "=name". Names default to the local names of the predicates, e.g.
+    "foaf:knows, ex:worksWith=colleague".
+
+    :param edge_predicates: Predicates mapped to edges.
+    :type edge_predicates: Optional[str]
+    :param property_predicates: Predicates mapped to node properties.
+    :type property_predicates: Optional[str]
+    :raises ValueError: If a predicate is mapped to both an edge and a property.
+    :return: The mapping.
+    :rtype: PredicateMapping
+    """
+    edges = _parse_predicates(edge_predicates if edge_predicates is not None else DEFAULT_EDGE_PREDICATES)
+    properties = _parse_predicates(
+      property_predicates if property_predicates is not None else DEFAULT_PROPERTY_PREDICATES)
+    both = edges.keys() & properties.keys()
+    if both:
+      raise ValueError(f"Predicates mapped to both edges and properties: {', '.join(sorted(both))}")
+    return cls(edges, properties)
+
+  def key(self) -> str:
+    """
+    Returns a string identifying the mapping, e.g. to tell apart conversions of the same file.
+    """
+    return json.dumps([self.edges, self.properties], sort_keys=True)
+
+
+def _parse_predicates(value: str) -> Dict[str, str]:
+  predicates = {}
+  for entry in _SEPARATOR.split(value.strip()):
+    if not entry:
+      continue
+    predicate, equals, name = entry.rpartition("=")
+    if not equals or not name.isidentifier():
+      predicate, name = entry, ""
+    iri = expand(predicate)
+    predicates[iri] = name or local_name(iri)
+  return predicates
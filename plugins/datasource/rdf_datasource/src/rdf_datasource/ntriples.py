@@ -0,0 +1,57 @@
+import re
+from typing import Iterable, Iterator, Tuple
+
+from .mapping import Literal, Term
+
+_IRI = r"<([^>]*)>"
+_BNODE = r"(_:[^\s<\"]+?)"
+_LITERAL = r"\"((?:[^\"\\]|\\.)*)\"(?:@([A-Za-z0-9-]+)|\^\^<([^>]*)>)?"
+_TRIPLE = re.compile(
+  rf"\s*(?:{_IRI}|{_BNODE})\s*{_IRI}\s*(?:{_IRI}|{_BNODE}|{_LITERAL})\s*\.\s*(?:#.*)?$")
+_ESCAPE = re.compile(r"\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))")
+_ESCAPED_CHARS = {"t": "\t", "b": "\b", "n": "\n", "r": "\r", "f": "\f", "\"": "\"", "'": "'", "\\": "\\"}
+
+
+def _replace_escape(match: "re.Match") -> str:
+  code = match.group(1) or match.group(2)
+  if code:
+    return chr(int(code, 16))
+  char = match.group(3)
+  if char not in _ESCAPED_CHARS:
+    raise ValueError(f"Invalid escape sequence \\{char}")
+  return _ESCAPED_CHARS[char]
+
+
+def _unescape(text: str) -> str:
+  return _ESCAPE.sub(_replace_escape, text) if "\\" in text else text
+
+
+def iter_ntriples(lines: Iterable[str]) -> Iterator[Tuple[str, str, Term]]:
+  """
+  Parses N-Triples line by line, without building a triple store.
+
+  IRIs are yielded as strings without angle brackets, blank nodes as "_:" labels and literals
+  as `Literal` tuples.
+
+  :param lines: Lines of an N-Triples document, e.g. an open file.
+  :type lines: Iterable[str]
+  :raises ValueError: If a line is not a valid triple.
+  :return: The subject, predicate and object of every triple.
+  :rtype: Iterator[Tuple[str, str, Term]]
+  """
+  for number, line in enumerate(lines, start=1):
+    stripped = line.strip()
+    if not stripped or stripped.startswith("#"):
+      continue
+    match = _TRIPLE.match(stripped)
+    if match is None:
+      raise ValueError(f"Invalid N-Triples line {number}: {stripped[:200]}")
+    s_iri, s_bnode, predicate, o_iri, o_bnode, lexical, language, datatype = match.groups()
+    subject = _unescape(s_iri) if s_iri is not None else s_bnode
+    if o_iri is not None:
+      obj: Term = _unescape(o_iri)
+    elif o_bnode is not None:
+      obj = o_bnode
+    else:
+      obj = Literal(_unescape(lexical), _unescape(datatype) if datatype else None, language)
+    yield subject, _unescape(predicate), obj
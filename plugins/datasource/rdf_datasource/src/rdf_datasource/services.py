@@ -1,84 +1,262 @@
-
+import os
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from api.components.progress import report_progress
+from api.models.columnar_graph import ColumnarGraph
+from api.models.data import Value
 from api.models.edge import Edge
-from api.models.graph import Graph
+from api.models.graph_stream import GraphStream
 from api.models.node import Node
-from rdflib import Graph as RdfGraph
+from rdflib import BNode, Dataset, Literal as RdfLiteral, URIRef
+from rdflib.store import Store
+from rdflib.util import guess_format
 from abc import abstractmethod
 from rdflib.namespace import Namespace
+from .mapping import Literal, PredicateMapping, Term, literal_value
+from .ntriples import iter_ntriples
+from .snapshot import SnapshotStore, fingerprint
 
 EX = Namespace("http://example.org/")
 FOAF = Namespace("http://xmlns.com/foaf/0.1/")
 
+DATA_DIR = "./plugins/datasource/rdf_datasource/data/"
+DEFAULT_EXTENSION = ".ttl"
+
+BATCH_SIZE = 1000
+PROGRESS_INTERVAL = 10000
+"""Number of parsed triples between two progress reports."""
+
+TripleHandler = Callable[[str, str, Term], None]
+
+Columns = Tuple[List[str], List[str], List[List[Optional[Value]]], List[str], array, array, array]
+"""
+Node IDs, property names, a column of values per property, connection names, and the source
+node, target node and connection indices of the edges.
+"""
+
+
+def _term(term: Any) -> Term:
+  if isinstance(term, RdfLiteral):
+    return Literal(str(term), str(term.datatype) if term.datatype else None, term.language)
+  if isinstance(term, BNode):
+    return "_:" + str(term)
+  return str(term)
+
+
+class TripleSink(Store):
+  """
+  An rdflib store that hands every parsed triple to a callback instead of storing it, so that
+  files are converted while they are parsed and no triple store is built.
+
+  Parsers write through the store, whichever graph they parse into, so the sink receives the
+  triples of every format, also of all named graphs of datasets. Statements about N3 formulas
+  are skipped.
+  """
+
+  context_aware = True
+  formula_aware = True
+  graph_aware = True
+
+  def __init__(self, on_triple: TripleHandler):
+    super().__init__()
+    self._on_triple = on_triple
+    self.count = 0
+
+  def add(self, triple: Tuple[Any, Any, Any], context: Any, quoted: bool = False):
+    s, p, o = triple
+    if quoted or not all(isinstance(term, (URIRef, BNode, RdfLiteral)) for term in triple):
+      return
+    self._on_triple(_term(s), str(p), _term(o))
+    self.count += 1
+    if self.count % PROGRESS_INTERVAL == 0:
+      report_progress(self.count, message="Parsing RDF triples")
+
+  def addN(self, quads: Iterable[Tuple[Any, Any, Any, Any]]):
+    for s, p, o, context in quads:
+      self.add((s, p, o), context)
+
+  def add_graph(self, graph: Any):
+    pass
+
+  def remove_graph(self, graph: Any):
+    pass
+
+
+class RdfPropertyTable():
+  """
+  The graph of an RDF file, built in a single pass over its triples.
+
+  Triples are mapped to edges and node properties by a `PredicateMapping`. Properties are
+  grouped per subject and edges are kept between subject IRIs. Once all triples were added,
+  nodes and edges are emitted in bulk; only subjects and objects of edges become nodes.
+
+  :param mapping: The predicate mapping, `EX.knows` edges with `EX.age` and `EX.gender`
+                  properties by default.
+  :type mapping: Optional[PredicateMapping]
+  """
+
+  def __init__(self, mapping: Optional[PredicateMapping] = None):
+    self.mapping = mapping if mapping is not None else PredicateMapping.parse()
+    self.property_names = list(dict.fromkeys(self.mapping.properties.values()))
+    self.properties: Dict[str, Dict[str, Value]] = {}
+    # insertion ordered sets
+    self.linked: Dict[str, None] = {}
+    self.links: Dict[Tuple[str, str, str], None] = {}
+
+  def add(self, subject: str, predicate: str, obj: Term):
+    connection = self.mapping.edges.get(predicate)
+    if connection is not None:
+      if isinstance(obj, Literal):
+        return
+      self.linked[subject] = None
+      self.linked[obj] = None
+      self.links[(subject, obj, connection)] = None
+      return
+    name = self.mapping.properties.get(predicate)
+    if name is not None:
+      row = self.properties.get(subject)
+      if row is None:
+        row = self.properties[subject] = {}
+      row[name] = literal_value(obj) if isinstance(obj, Literal) else obj
+
+  def iter_nodes(self) -> Iterator[Node]:
+    for subject in self.linked:
+      row = self.properties.get(subject, {})
+      data: Dict[str, Any] = {"name": subject.split("/")[-1]}
+      for name in self.property_names:
+        data[name] = row.get(name)
+      yield Node(subject, data)
+
+  def iter_edges(self) -> Iterator[Edge]:
+    for src, target, connection in self.links:
+      yield Edge({"connection": connection}, Node(src, {}), Node(target, {}))
+
+  def to_columns(self) -> Columns:
+    """
+    Returns the nodes and edges of the table as compact columns, e.g. for a snapshot.
+    """
+    index = {subject: i for i, subject in enumerate(self.linked)}
+    connections = list(dict.fromkeys(self.mapping.edges.values()))
+    connection_index = {connection: i for i, connection in enumerate(connections)}
+    values: Dict[Value, Value] = {}
+    columns: List[List[Optional[Value]]] = [[] for _ in self.property_names]
+    for subject in self.linked:
+      row = self.properties.get(subject, {})
+      for name, column in zip(self.property_names, columns):
+        value = row.get(name)
+        # repeated values are pickled once
+        column.append(values.setdefault(value, value) if isinstance(value, str) else value)
+    src = array("L", (index[link[0]] for link in self.links))
+    target = array("L", (index[link[1]] for link in self.links))
+    kind = array("H", (connection_index[link[2]] for link in self.links))
+    return list(self.linked), self.property_names, columns, connections, src, target, kind
+
+  @classmethod
+  def from_columns(cls, columns: Columns, mapping: Optional[PredicateMapping] = None) -> "RdfPropertyTable":
+    ids, property_names, property_columns, connections, src, target, kind = columns
+    table = cls(mapping)
+    table.property_names = property_names
+    table.linked = dict.fromkeys(ids)
+    table.properties = {subject: dict(zip(property_names, row))
+                        for subject, *row in zip(ids, *property_columns)}
+    table.links = dict.fromkeys((ids[s], ids[t], connections[k]) for s, t, k in zip(src, target, kind))
+    return table
+
+  def stream(self) -> GraphStream:
+    return GraphStream.from_iterables(self.iter_nodes(), self.iter_edges(), BATCH_SIZE,
+                                      directed=True, root_id=None)
+
+
+def resolve_path(filename: str) -> str:
+  """
+  Returns the path of a file in the data directory. Names without an extension refer to
+  Turtle files.
+  """
+  path = os.path.join(DATA_DIR, filename)
+  if not os.path.splitext(filename)[1]:
+    path += DEFAULT_EXTENSION
+  return path
+
+
+def parse_triples(path: str, on_triple: TripleHandler, rdf_format: Optional[str] = None) -> int:
+  """
+  Parses an RDF file, handing every triple to `on_triple` as soon as it is parsed.
+
+  N-Triples files are read line by line by `iter_ntriples`, other formats are parsed by rdflib.
+
+  :param path: Path of the file.
+  :type path: str
+  :param on_triple: Called with the subject, predicate and object of every parsed triple.
+  :type on_triple: TripleHandler
+  :param rdf_format: rdflib format name, guessed from the file extension if not given.
+  :type rdf_format: Optional[str]
+  :return: The number of parsed triples.
+  :rtype: int
+  """
+  rdf_format = rdf_format or guess_format(path) or "turtle"
+  if rdf_format in ("nt", "ntriples", "nt11"):
+    count = 0
+    with open(path, encoding="utf-8") as file:
+      for s, p, o in iter_ntriples(file):
+        on_triple(s, p, o)
+        count += 1
+        if count % PROGRESS_INTERVAL == 0:
+          report_progress(count, message="Parsing RDF triples")
+    return count
+
+  sink = TripleSink(on_triple)
+  Dataset(store=sink).parse(path, format=rdf_format)
+  return sink.count
+
+
 class RdfGraphAbstract(): # Abstract interface
   @abstractmethod
   def load(self):
     pass
-  
-class RealRdfGraph(RdfGraphAbstract): # Concrete implementation 
-  def __init__(self, filename: str):
-    self.filename = "./plugins/datasource/rdf_datasource/data/"+filename+".ttl"
-    print("FILE NAME: ", 	self.filename)
-    self.graph = RdfGraph()
-    
-  def load(self) -> RdfGraph:
-    print("FILE NAME: ", 	self.filename)
-    self.graph.parse(self.filename, format='turtle')
-    return self.graph
-  
+
+class RealRdfGraph(RdfGraphAbstract): # Concrete implementation
+  def __init__(self, filename: str, mapping: Optional[PredicateMapping] = None):
+    self.filename = resolve_path(filename)
+    self.mapping = mapping
+
+  def load(self) -> RdfPropertyTable:
+    table = RdfPropertyTable(self.mapping)
+    parse_triples(self.filename, table.add)
+    return table
+
 class ProxyRdfGraph(RdfGraphAbstract): # Proxy
-  def __init__(self):
-    self.rdf_graph = None
-    self.graph = None
-    
-  def load(self, filename: str) -> RdfGraph:
+  """
+  Loads RDF files through snapshots of their converted graphs, parsing a file only when it
+  has no valid snapshot for the predicate mapping.
+  """
+
+  def __init__(self, snapshots: Optional[SnapshotStore] = None):
+    self.table = None
+    self.snapshots = snapshots if snapshots is not None else SnapshotStore()
+
+  def load(self, filename: str, mapping: Optional[PredicateMapping] = None) -> RdfPropertyTable:
+    mapping = mapping if mapping is not None else PredicateMapping.parse()
     if not filename:
-      self.rdf_graph = RdfGraph()
-    else:
-      self.rdf_graph = RealRdfGraph(filename).load()
-    return self.rdf_graph
-    
-  def create_graph(self, filename: str) -> Graph:
-    self.load(filename)
-    graph = Graph(directed=True, root_id=None)
-    node_map = {}
-    
-    for s, _, o in self.rdf_graph.triples((None, EX.knows, None)):
-      if s not in node_map:
-        age = None
-        gender = None
-        for s, _, obj in self.rdf_graph.triples((s, EX.age, None)):
-          age = int(obj) if obj else None
-        for s, _, obj in self.rdf_graph.triples((s, EX.gender, None)):
-          gender = obj
-        data = {
-          "name": s.split("/")[-1],
-          "age": age,
-          "gender": gender
-        }
-        node = Node(s, data)
-        graph.add_node(node)
-        node_map[s] = node
-        
-      if o not in node_map:
-        age = None
-        gender = None
-        for o, _, obj in self.rdf_graph.triples((o, EX.age, None)):
-          age = int(obj) if obj else None
-        for o, _, obj in self.rdf_graph.triples((o, EX.gender, None)):
-          gender = obj
-        data = {
-          "name": o.split("/")[-1],
-          "age": age,
-          "gender": gender
-        }
-        node = Node(o, data)
-        graph.add_node(node)
-        node_map[o] = node
-        
-      if (s, o) not in graph.edges:
-        graph.add_edge(Edge({"connection": "knows"}, node_map[s], node_map[o]))
-    return graph
-  
-  
-
- 
+      self.table = RdfPropertyTable(mapping)
+      return self.table
+
+    real_graph = RealRdfGraph(filename, mapping)
+    columns = self.snapshots.load(real_graph.filename, mapping.key())
+    if columns is not None:
+      self.table = RdfPropertyTable.from_columns(columns, mapping)
+      return self.table
+
+    file_fingerprint = fingerprint(real_graph.filename)
+    self.table = real_graph.load()
+    try:
+      self.snapshots.save(real_graph.filename, self.table.to_columns(), file_fingerprint, mapping.key())
+    except OSError:
+      # the graph is still usable without a snapshot
+      pass
+    return self.table
+
+  def stream_graph(self, filename: str, mapping: Optional[PredicateMapping] = None) -> GraphStream:
+    return self.load(filename, mapping).stream()
+
+  def create_graph(self, filename: str, mapping: Optional[PredicateMapping] = None) -> ColumnarGraph:
+    return self.stream_graph(filename, mapping).to_columnar_graph()
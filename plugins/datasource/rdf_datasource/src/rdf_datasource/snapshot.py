@@ -0,0 +1,119 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Optional, Tuple, Union
+
+import appdirs
+
+SNAPSHOT_VERSION = 2
+"""Bumped whenever the snapshot contents change, invalidating older snapshots."""
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+Fingerprint = Tuple[int, int, str]
+"""Size, modification time in nanoseconds and SHA-256 digest of a file."""
+
+
+def default_snapshot_dir() -> Path:
+  return Path(appdirs.user_cache_dir("graph_explorer")) / "rdf_snapshots"
+
+
+def file_digest(path: Union[str, Path]) -> str:
+  digest = hashlib.sha256()
+  with open(path, "rb") as file:
+    for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+      digest.update(chunk)
+  return digest.hexdigest()
+
+
+def fingerprint(path: Union[str, Path]) -> Fingerprint:
+  stat = os.stat(path)
+  return stat.st_size, stat.st_mtime_ns, file_digest(path)
+
+
+class SnapshotStore():
+  """
+  Keeps binary snapshots of data converted from files, so that unchanged files need not be
+  parsed again.
+
+  A snapshot is stored per file path together with the size, modification time and content
+  hash of the file it was converted from. It is valid while the size and modification time
+  match; when only the modification time changed (e.g. the file was touched or copied) the
+  content hash decides, and a matching snapshot is kept for the new modification time.
+
+  :param directory: Directory of the snapshot files.
+  :type directory: Union[str, Path]
+  """
+
+  def __init__(self, directory: Union[str, Path, None] = None):
+    self.directory = Path(directory) if directory is not None else default_snapshot_dir()
+
+  def load(self, path: Union[str, Path], variant: str = "") -> Optional[Any]:
+    """
+    Returns the data saved for a file, or None if there is no valid snapshot of it.
+
+    :param path: Path of the converted file.
+    :type path: Union[str, Path]
+    :param variant: Identifies how the file was converted, e.g. with which settings.
+    :type variant: str
+    :return: The data passed to `save`, or None
+    :rtype: Optional[Any]
+    """
+    snapshot_path = self._snapshot_path(path, variant)
+    try:
+      stat = os.stat(path)
+      with open(snapshot_path, "rb") as snapshot:
+        version, size, mtime_ns, digest = pickle.load(snapshot)
+        if version != SNAPSHOT_VERSION or size != stat.st_size:
+          return None
+        if mtime_ns != stat.st_mtime_ns and file_digest(path) != digest:
+          return None
+        data = pickle.load(snapshot)
+    except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+      # missing, unreadable or written by an incompatible version
+      return None
+
+    if mtime_ns != stat.st_mtime_ns:
+      try:
+        self._write(snapshot_path, (SNAPSHOT_VERSION, size, stat.st_mtime_ns, digest), data)
+      except OSError:
+        pass
+    return data
+
+  def save(self, path: Union[str, Path], data: Any, file_fingerprint: Optional[Fingerprint] = None,
+           variant: str = ""):
+    """
+    Saves the data converted from a file.
+
+    :param path: Path of the converted file.
+    :type path: Union[str, Path]
+    :param data: The converted data, which must be picklable.
+    :type data: Any
+    :param file_fingerprint: Fingerprint of the file taken before it was read, so that changes
+                             made while converting it invalidate the snapshot. Taken now if
+                             not given.
+    :type file_fingerprint: Optional[Fingerprint]
+    :param variant: Identifies how the file was converted, e.g. with which settings.
+    :type variant: str
+    """
+    size, mtime_ns, digest = file_fingerprint or fingerprint(path)
+    self._write(self._snapshot_path(path, variant), (SNAPSHOT_VERSION, size, mtime_ns, digest), data)
+
+  def _write(self, snapshot_path: Path, header: Tuple, data: Any):
+    self.directory.mkdir(parents=True, exist_ok=True)
+    # written to a temporary file first, so that readers never see a partial snapshot
+    fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+    try:
+      with os.fdopen(fd, "wb") as snapshot:
+        pickle.dump(header, snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(data, snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+      os.replace(temp_path, snapshot_path)
+    except BaseException:
+      os.unlink(temp_path)
+      raise
+
+  def _snapshot_path(self, path: Union[str, Path], variant: str) -> Path:
+    key = hashlib.sha1(f"{os.path.abspath(path)}\0{variant}".encode("utf-8")).hexdigest()
+    return self.directory / f"{key}.snapshot"
@@ -0,0 +1,148 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import appdirs
+
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def default_cache_path() -> Path:
+    return Path(appdirs.user_cache_dir("graph_explorer")) / "spotify_responses.sqlite3"
+
+
+class ResponseCache(object):
+    """
+    An on-disk cache of API responses in SQLite, shared between loads and processes.
+
+    Responses are keyed by request URL and parameters. They expire `ttl` seconds after they
+    were stored, and the least recently used ones are evicted once the stored bodies exceed
+    `max_bytes`. Safe to use from several threads.
+
+    The size of the stored bodies is summed once when the cache is opened and kept up to date
+    by the writes of this instance; it is summed again before evicting, as other processes may
+    have changed the database since.
+
+    :param path: Path of the database file, ":memory:" for a cache that is not persisted.
+    :type path: Union[str, Path]
+    :param ttl: Seconds a response stays valid.
+    :type ttl: float
+    :param max_bytes: Bound of the total size of the stored response bodies.
+    :type max_bytes: int
+    """
+
+    def __init__(self,
+                 path: Union[str, Path, None] = None,
+                 ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        path = path if path is not None else default_cache_path()
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                used_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at)")
+        self._db.commit()
+        self._total = self._size()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def key(url: str, params: Dict[str, Any]) -> str:
+        """
+        Returns the key of a request, independent of the order of its parameters.
+        """
+        return url + "?" + json.dumps(params, sort_keys=True, default=str)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the stored response of a request, or None if it is missing or expired.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT body, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] < now - self.ttl:
+                self._misses += 1
+                return None
+            self._db.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self._hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, response: Dict[str, Any]):
+        """
+        Stores the response of a request, evicting expired and least recently used responses
+        to stay within the size bound. Responses larger than the bound are not stored.
+        """
+        body = json.dumps(response)
+        size = len(body.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            replaced = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                             (key, body, size, now, now))
+            self._total += size - (replaced[0] if replaced else 0)
+            expired_size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses WHERE stored_at < ?",
+                                            (now - self.ttl,)).fetchone()[0]
+            if expired_size:
+                self._evictions += self._db.execute("DELETE FROM responses WHERE stored_at < ?",
+                                                    (now - self.ttl,)).rowcount
+                self._total -= expired_size
+            if self._total > self.max_bytes:
+                self._total = self._size()
+            while self._total > self.max_bytes:
+                key_to_evict, evicted_size = self._db.execute(
+                    "SELECT key, size FROM responses ORDER BY used_at LIMIT 1").fetchone()
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key_to_evict,))
+                self._evictions += 1
+                self._total -= evicted_size
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+            self._total = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the cache counters of this instance and the size of the stored responses.
+
+        :return: hits, misses, evictions, number of entries, total size and size bound
+        :rtype: Dict[str, int]
+        """
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "entries": entries,
+                "bytes": self._size(),
+                "max_bytes": self.max_bytes,
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _size(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
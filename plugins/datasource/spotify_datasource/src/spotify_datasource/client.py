@@ -0,0 +1,177 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from spotify_datasource.cache import ResponseCache
+from spotify_datasource.utils import TOKEN_URL, get_auth_token
+
+API_URL = "https://api.spotify.com/v1"
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+
+MAX_RETRIES = 5
+"""Number of times a rate limited request is retried before giving up."""
+
+DEFAULT_RETRY_AFTER = 1.0
+"""Seconds to wait after a rate limited response without a usable Retry-After header."""
+
+REQUEST_TIMEOUT = 30
+
+
+class TokenBucket(object):
+    """
+    Limits the rate of requests shared by several threads. Tokens are added at `rate` per
+    second up to `capacity`, and every request takes one, waiting until one is available.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("The rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes a token, waiting until one is available.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._updated:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                else:
+                    # paused
+                    wait = self._updated - now
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """
+        Withholds all tokens for the given number of seconds, e.g. when the server asks
+        clients to retry later.
+        """
+        with self._lock:
+            self._tokens = 0
+            self._updated = max(self._updated, time.monotonic() + seconds)
+
+
+class SpotifyClient(object):
+    """
+    A client of the Spotify Web API, safe to use from several threads.
+
+    Requests share a pooled `requests.Session` and a token bucket limiting their rate. Rate
+    limited responses pause all requests for the time given by their Retry-After header and
+    are retried. The access token is requested when missing and renewed once it is rejected.
+
+    :param auth_token: Access token, requested with the client credentials from the
+                       environment when missing or expired.
+    :type auth_token: Optional[str]
+    :param concurrency: Maximum number of requests sent at the same time.
+    :type concurrency: int
+    :param requests_per_second: Maximum average number of requests per second.
+    :type requests_per_second: float
+    :param api_url: Base URL of the API, e.g. of a local stub server in tests.
+    :type api_url: str
+    :param token_url: URL of the token endpoint.
+    :type token_url: str
+    :param cache: Cache of successful responses, checked before sending a request. The
+                  client owns it and closes it when closed.
+    :type cache: Optional[ResponseCache]
+    """
+
+    def __init__(self,
+                 auth_token: Optional[str] = None,
+                 concurrency: int = DEFAULT_CONCURRENCY,
+                 requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                 api_url: str = API_URL,
+                 token_url: str = TOKEN_URL,
+                 cache: Optional[ResponseCache] = None):
+        self.cache = cache
+        self.concurrency = max(1, concurrency)
+        self.api_url = api_url.rstrip("/")
+        self.token_url = token_url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._bucket = TokenBucket(requests_per_second)
+        self._token = auth_token or None
+        self._token_lock = threading.Lock()
+
+    def get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Sends a GET request to an API endpoint and returns the decoded response.
+
+        :param path: Path of the endpoint relative to the API URL, e.g. "search".
+        :type path: str
+        :param params: Query parameters.
+        :type params: Dict[str, Any]
+        :raises Exception: If the request fails or keeps being rate limited.
+        :return: The JSON response body.
+        :rtype: Dict[str, Any]
+        """
+        url = f"{self.api_url}/{path}"
+        key = ResponseCache.key(url, params) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        token = self._token or self._renew_token(None)
+        renewed = False
+        for _ in range(MAX_RETRIES + 1):
+            self._bucket.acquire()
+            try:
+                response = self.session.get(url,
+                                            headers={"Authorization": f"Bearer {token}"},
+                                            params=params,
+                                            timeout=REQUEST_TIMEOUT)
+            except requests.RequestException as e:
+                raise Exception("Error: cannot fetch Spotify data!", e)
+
+            if response.status_code == 429:
+                self._bucket.pause(_retry_after(response))
+                continue
+            if response.status_code in (400, 401) and not renewed:
+                token = self._renew_token(token)
+                renewed = True
+                continue
+            if not response.ok:
+                raise Exception("Something went wrong!", response.reason, response.status_code)
+            body = response.json()
+            if key is not None:
+                self.cache.put(key, body)
+            return body
+
+        raise Exception("Spotify keeps limiting the request rate, try again later")
+
+    def close(self):
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def _renew_token(self, rejected: Optional[str]) -> str:
+        with self._token_lock:
+            # another thread may have renewed the token already
+            if self._token is None or self._token == rejected:
+                self._token = get_auth_token(self.session, self.token_url)
+            return self._token
+
+
+def _retry_after(response: requests.Response) -> float:
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", DEFAULT_RETRY_AFTER)))
+    except ValueError:
+        # an HTTP date, which Spotify does not send
+        return DEFAULT_RETRY_AFTER
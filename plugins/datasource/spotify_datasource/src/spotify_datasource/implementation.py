@@ -1,15 +1,14 @@
-from api.models.node import Node
 from api.models.graph import Graph
-from api.models.edge import Edge
-from api.components.data_source import DataSourcePlugin
 from api.components.data_source import DataSourceConfigParam, DataSourcePlugin
-from typing import List, Type
+from typing import List
+from .cache import DEFAULT_TTL, ResponseCache
+from .client import DEFAULT_CONCURRENCY, DEFAULT_REQUESTS_PER_SECOND, SpotifyClient
 from .services import create_graph
 
 
 class SpotifyDataSource(DataSourcePlugin):
     """
-    A data source that always returns an empty graph. Used for testing.
+    A data source that builds a graph of related artists from the Spotify Web API.
     """
 
     def name(self) -> str:
@@ -19,11 +18,22 @@ class SpotifyDataSource(DataSourcePlugin):
         return "spotify_data_source"
 
     def load(self, **kwargs) -> Graph:
-        auth_token = kwargs["auth_token"]
+        auth_token = kwargs.get("auth_token")
         artist_name = kwargs["artist_name"]
         max_neighbours = int(kwargs["max_neighbours"])
         recursion_depth = int(kwargs["recursion_depth"])
-        return create_graph(auth_token, artist_name, max_neighbours, recursion_depth)
+        concurrency = int(kwargs.get("concurrency") or DEFAULT_CONCURRENCY)
+        requests_per_second = float(kwargs.get("requests_per_second") or DEFAULT_REQUESTS_PER_SECOND)
+
+        cache_ttl = int(kwargs.get("cache_ttl") if kwargs.get("cache_ttl") not in (None, "") else DEFAULT_TTL)
+        cache = ResponseCache(ttl=cache_ttl) if cache_ttl > 0 else None
+
+        client = SpotifyClient(auth_token, concurrency=concurrency, requests_per_second=requests_per_second,
+                               cache=cache)
+        try:
+            return create_graph(client, artist_name, max_neighbours, recursion_depth)
+        finally:
+            client.close()
 
     def get_configuration_parameters(self) -> List[DataSourceConfigParam]:
         return [
@@ -35,4 +45,13 @@ class SpotifyDataSource(DataSourcePlugin):
                 name="max_neighbours", value_type=DataSourceConfigParam.Type.INT, display_name="Max Neighbours"),
             DataSourceConfigParam(
                 name="recursion_depth", value_type=DataSourceConfigParam.Type.INT, display_name="Recursion Depth"),
+            DataSourceConfigParam(
+                name="concurrency", value_type=DataSourceConfigParam.Type.INT, display_name="Parallel Requests",
+                required=False, default=DEFAULT_CONCURRENCY),
+            DataSourceConfigParam(
+                name="requests_per_second", value_type=DataSourceConfigParam.Type.FLOAT,
+                display_name="Requests per Second", required=False, default=DEFAULT_REQUESTS_PER_SECOND),
+            DataSourceConfigParam(
+                name="cache_ttl", value_type=DataSourceConfigParam.Type.INT,
+                display_name="Response Cache TTL (seconds, 0 disables)", required=False, default=DEFAULT_TTL),
         ]
@@ -1,71 +1,68 @@
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Set
+from spotify_datasource.client import SpotifyClient
 from spotify_datasource.models import Artist
-from spotify_datasource.utils import get_auth_token
+from api.components.progress import report_progress, report_stats
 from api.models.edge import Edge
 from api.models.graph import Graph
-import requests
-
 from api.models.node import Node
 
 
-def create_graph(auth_token: str, artist_name: str, max_neighbours: int, recursion_depth: int) -> Graph:
-    artist, auth_token = find_artist_by_name(artist_name, auth_token)
-    processed_artist = set()
-    graph = Graph(directed=False, root_id=artist.id)
-    process_artists(auth_token, artist, max_neighbours,
-                    recursion_depth, processed_artist, graph)
+def create_graph(client: SpotifyClient, artist_name: str, max_neighbours: int, recursion_depth: int) -> Graph:
+    artist = find_artist_by_name(client, artist_name)
+    graph = Graph(directed=False, root_id=artist.name)
+    graph.add_node(Node(artist.name, vars(artist)))
+    crawl_artists(client, artist, max_neighbours, recursion_depth, graph)
+    if client.cache is not None:
+        report_stats("http_cache", client.cache.stats())
 
     return graph
 
 
-def process_artists(auth_token: str, artist: Artist, max_neighbours: int,
-                    recursion_depth: int, processed_artists: set, graph: Graph):
-    """Searching for the related artists with DFS search going for recursion depth iterations
-        and adding them to the graph"""
-    if recursion_depth == 0:
-        return
-    if artist.id in processed_artists:
-        return
-
-    processed_artists.add(artist.id)
-    related_artists: List[Artist] = find_related_artists(
-        artist, auth_token, max_neighbours)
-
-    related_artists = [
-        artist for artist in related_artists if artist.id not in processed_artists]
-
-    if len(related_artists) > max_neighbours:
-        related_artists = related_artists[:max_neighbours]
-
-    for related_artist in related_artists:
-        src_node = Node(artist.name, vars(artist))
-        target_node = Node(related_artist.name, vars(related_artist))
-        edge = Edge({"connection": "related"}, src_node, target_node)
-        graph.add_edge(edge)
-        process_artists(auth_token, related_artist, max_neighbours,
-                        recursion_depth-1, processed_artists, graph)
-
-
-def find_artist_by_name(artist_name: str, auth_token: str) -> Tuple[Artist, str]:
-    """Fetching the artist by name and returning it with the auth token if new was generated"""
+def crawl_artists(client: SpotifyClient, artist: Artist, max_neighbours: int,
+                  recursion_depth: int, graph: Graph):
+    """Searching for the related artists with BFS search going for recursion depth levels
+        and adding them to the graph. The related artists of a whole level are fetched
+        concurrently, at most `client.concurrency` at a time."""
+    processed_artists: Set[str] = set()
+    frontier = [artist]
+    executor = ThreadPoolExecutor(max_workers=client.concurrency, thread_name_prefix="spotify")
     try:
-        response = requests.get("https://api.spotify.com/v1/search",
-                                headers={
-                                    "Authorization": f"Bearer {auth_token}"},
-                                params={"q": artist_name, "type": "artist"})
-    except Exception:
-        raise Exception("Error: cannot fetch Spotify data!")
-
-    if not response.ok:
-        if response.status_code == 401 or response.status_code == 400:
-            new_auth_token = get_auth_token()
-            print(new_auth_token)
-            return find_artist_by_name(artist_name, new_auth_token)
-        else:
-            raise Exception("Something went wrong!",
-                            response.reason, response.status_code)
-
-    body = response.json()
+        for level in range(recursion_depth):
+            if not frontier:
+                break
+            processed_artists.update(a.id for a in frontier)
+
+            futures = {executor.submit(find_related_artists, a, client, max_neighbours): i
+                       for i, a in enumerate(frontier)}
+            related: Dict[int, List[Artist]] = {}
+            for future in as_completed(futures):
+                related[futures[future]] = future.result()
+                # reported from this thread, the one the load runs in
+                report_progress(len(processed_artists) - len(frontier) + len(related),
+                                message=f"Fetching related artists, level {level + 1} of {recursion_depth}")
+
+            next_frontier: List[Artist] = []
+            queued: Set[str] = set()
+            for i, src in enumerate(frontier):
+                related_artists = [
+                    a for a in related[i] if a.id not in processed_artists][:max_neighbours]
+                src_node = Node(src.name, vars(src))
+                for related_artist in related_artists:
+                    target_node = Node(related_artist.name, vars(related_artist))
+                    graph.add_edge(Edge({"connection": "related"}, src_node, target_node))
+                    if related_artist.id not in queued:
+                        queued.add(related_artist.id)
+                        next_frontier.append(related_artist)
+            frontier = next_frontier
+    finally:
+        # requests of an interrupted crawl are dropped
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def find_artist_by_name(client: SpotifyClient, artist_name: str) -> Artist:
+    """Fetching the artist by name"""
+    body = client.get("search", {"q": artist_name, "type": "artist"})
 
     try:
         artists = body['artists']['items']
@@ -73,29 +70,17 @@ def find_artist_by_name(artist_name: str, auth_token: str) -> Tuple[Artist, str]
         raise Exception("Invalid response format!")
 
     if len(artists) > 0:
-        return Artist(artists[0]), auth_token
+        return Artist(artists[0])
     else:
         raise Exception("Invalid query no artist found!")
 
 
-def find_related_artists(artist: Artist, auth_token: str, max_neighbours: int) -> List[Artist]:
+def find_related_artists(artist: Artist, client: SpotifyClient, max_neighbours: int) -> List[Artist]:
     """Find related artists for the given artist's genre if there is none set hip hop as a default"""
-    try:
-        response = requests.get(url="https://api.spotify.com/v1/search",
-                                headers={
-                                    "Authorization": f"Bearer {auth_token}"},
-                                params={"q": f"genre:{artist.genres[0] if artist.genres else 'hip hop'}",
-                                        "type": "artist",
-                                        "limit": max_neighbours*2
-                                        })
-    except Exception as e:
-        raise Exception("Error: cannot fetch Spotify data!", e)
-
-    if not response.ok:
-        raise Exception("Something went wrong!",
-                        response.reason, response.status_code, artist.id)
-
-    body = response.json()
+    body = client.get("search", {"q": f"genre:{artist.genres[0] if artist.genres else 'hip hop'}",
+                                 "type": "artist",
+                                 "limit": max_neighbours*2
+                                 })
 
     try:
         artists = body['artists']['items']
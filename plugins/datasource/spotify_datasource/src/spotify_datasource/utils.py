@@ -1,11 +1,14 @@
 import base64
 import os
-from pathlib import Path
+from typing import Optional
+
 import requests
 from dotenv import load_dotenv
 
+TOKEN_URL = "https://accounts.spotify.com/api/token"
+
 
-def get_auth_token() -> str:
+def get_auth_token(session: Optional[requests.Session] = None, token_url: str = TOKEN_URL) -> str:
 
     load_dotenv()
 
@@ -23,8 +26,7 @@ def get_auth_token() -> str:
         "grant_type": "client_credentials"
     }
 
-    response = requests.post(
-        "https://accounts.spotify.com/api/token", headers=headers, data=data)
+    response = (session or requests).post(token_url, headers=headers, data=data)
     auth_token = response.json().get("access_token")
 
     return auth_token
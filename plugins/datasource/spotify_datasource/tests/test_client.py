@@ -0,0 +1,146 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from spotify_datasource.client import SpotifyClient
+from spotify_datasource.services import create_graph
+
+
+class _StubApi(object):
+    """
+    A local stand-in for the Spotify API and token endpoint. `respond(path, params, token)`
+    returns the status, body and headers of every GET request; POST requests issue `new_token`.
+    """
+
+    def __init__(self, respond, new_token="new"):
+        self.respond = respond
+        self.new_token = new_token
+        self.requests = []
+        self.token_requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stub.token_requests += 1
+                self._send(200, {"access_token": stub.new_token}, {})
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+                stub.requests.append((time.monotonic(), params))
+                self._send(*stub.respond(url.path, params, token))
+
+            def _send(self, status, body, headers):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def client(self, auth_token="new"):
+        return SpotifyClient(auth_token, api_url=self.url + "/v1", token_url=self.url + "/token",
+                             requests_per_second=1000)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_api():
+    stubs = []
+
+    def start(respond, **kwargs):
+        stubs.append(_StubApi(respond, **kwargs))
+        return stubs[-1]
+
+    yield start
+    for stub in stubs:
+        stub.close()
+
+
+def _artist(artist_id, genre):
+    return {"id": artist_id, "name": artist_id, "popularity": 0, "genres": [genre], "followers": {"total": 0}}
+
+
+def test_rate_limited_request_waits_for_retry_after(stub_api):
+    def respond(path, params, token):
+        if len(stub.requests) == 1:
+            return 429, {}, {"Retry-After": "0.3"}
+        return 200, {"artists": {"items": []}}, {}
+
+    stub = stub_api(respond)
+    client = stub.client()
+    assert client.get("search", {"q": "x"}) == {"artists": {"items": []}}
+    client.close()
+
+    assert len(stub.requests) == 2
+    assert stub.requests[1][0] - stub.requests[0][0] >= 0.3
+
+
+def test_rejected_token_is_renewed_once(stub_api):
+    def respond(path, params, token):
+        if token != "new":
+            return 401, {"error": "expired"}, {}
+        return 200, {"ok": True}, {}
+
+    stub = stub_api(respond)
+    client = stub.client(auth_token="expired")
+    assert client.get("search", {"q": "x"}) == {"ok": True}
+    assert client.get("search", {"q": "y"}) == {"ok": True}
+    client.close()
+    assert stub.token_requests == 1
+
+    # a renewed token that is rejected again is not renewed a second time
+    stub = stub_api(respond, new_token="rejected")
+    client = stub.client(auth_token="expired")
+    with pytest.raises(Exception):
+        client.get("search", {"q": "x"})
+    client.close()
+    assert stub.token_requests == 1
+    assert len(stub.requests) == 2
+
+
+def test_crawl_fetches_two_levels_breadth_first(stub_api):
+    # related artists are those of the genre of an artist, the root is "root" of genre "g0"
+    genres = {
+        "g0": [_artist("root", "g0"), _artist("a1", "g1"), _artist("a2", "g2"), _artist("a3", "g3")],
+        "g1": [_artist("root", "g0"), _artist("b1", "g4"), _artist("b2", "g4")],
+        "g2": [_artist("a1", "g1"), _artist("b3", "g4"), _artist("b4", "g4"), _artist("b5", "g4")],
+        "g4": [_artist("c1", "g4")],
+    }
+
+    def respond(path, params, token):
+        query = params["q"]
+        if query.startswith("genre:"):
+            return 200, {"artists": {"items": genres[query[len("genre:"):]]}}, {}
+        return 200, {"artists": {"items": [_artist(query, "g0")]}}, {}
+
+    stub = stub_api(respond)
+    client = stub.client()
+    graph = create_graph(client, "root", max_neighbours=2, recursion_depth=2)
+    client.close()
+
+    assert {node.id for node in graph.get_nodes()} == {"root", "a1", "a2", "b1", "b2", "b3", "b4"}
+    assert {frozenset((edge.src.id, edge.target.id)) for edge in graph.get_edges()} == {
+        frozenset(pair) for pair in
+        [("root", "a1"), ("root", "a2"), ("a1", "b1"), ("a1", "b2"), ("a2", "b3"), ("a2", "b4")]
+    }
+    # the artist search and one request per crawled artist; the third level is not fetched
+    assert len(stub.requests) == 4
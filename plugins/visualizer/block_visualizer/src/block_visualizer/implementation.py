@@ -1,10 +1,12 @@
 import os
+from typing import Iterator
 
 from block_visualizer.json_serializer import serialize_json
 from jinja2 import Environment, FileSystemLoader
 
 from api.components.visualizer import VisualizerPlugin
-from api.models.graph import Graph
+from api.models.columnar_graph import AnyGraph
+from api.models.graph_stream import GraphStream
 
 
 class BlockVisualizer(VisualizerPlugin):
@@ -41,14 +43,38 @@ class BlockVisualizer(VisualizerPlugin):
         """
         return "block_visualizer"
 
-    def display(self, graph: Graph, **kwargs) -> str:
+    def supports_columnar_graph(self) -> bool:
+        """
+        The template only reads nodes, edges and the directed flag, so a ColumnarGraph is accepted.
+
+        :return: True
+        :rtype: bool
+        """
+        return True
+
+    def display(self, graph: AnyGraph, **kwargs) -> str:
         """
         Renders the graph into an HTML string using the template.
 
         :param graph: The graph to be visualized.
-        :type graph: Graph
+        :type graph: AnyGraph
         :param kwargs: Additional optional keyword arguments for customization.
+                       `positions` maps node IDs to precomputed (x, y) coordinates.
         :return: The rendered HTML string with graph visualization.
         :rtype: str
         """
-        return self.template.render(nodes=graph.get_nodes(), edges=graph.get_edges(), directed=graph.directed, name=self.identifier())
\ No newline at end of file
+        return self.template.render(nodes=graph.get_nodes(), edges=graph.get_edges(), directed=graph.directed, name=self.identifier(), positions=kwargs.get("positions") or {})
+
+    def display_stream(self, stream: GraphStream, **kwargs) -> Iterator[str]:
+        """
+        Renders a streamed graph, reading nodes and edges from the stream while the
+        template is generated.
+
+        :param stream: The graph stream to be visualized.
+        :type stream: GraphStream
+        :param kwargs: Additional optional keyword arguments for customization.
+                       `positions` maps node IDs to precomputed (x, y) coordinates.
+        :return: An iterator of HTML fragments.
+        :rtype: Iterator[str]
+        """
+        return self.template.generate(nodes=stream.iter_nodes(), edges=stream.iter_edges(), directed=stream.directed, name=self.identifier(), positions=kwargs.get("positions") or {})